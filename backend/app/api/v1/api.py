@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, workouts, food, measurements, goals, social, notifications, search, admin
+from app.api.v1.endpoints import auth, users, workouts, food, measurements, goals, social, notifications, search, admin, realtime
 
 api_router = APIRouter()
 
@@ -14,4 +14,5 @@ api_router.include_router(goals.router, prefix="/goals", tags=["goals"])
 api_router.include_router(social.router, prefix="/social", tags=["social"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(search.router, prefix="/search", tags=["search"])
-api_router.include_router(admin.router, prefix="/admin", tags=["admin"]) 
\ No newline at end of file
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(realtime.router, tags=["realtime"]) 
\ No newline at end of file
@@ -1,10 +1,12 @@
 from typing import Any, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.db.elasticsearch.indices import create_indices, delete_indices
 from app.db.elasticsearch.sync import sync_all_data
+from app.db.mongodb.goals import MAINTENANCE_BATCH_SIZE, refresh_goal_status
+from app.services.notification import get_push_metrics
 
 
 router = APIRouter()
@@ -102,4 +104,62 @@ async def delete_elasticsearch_indices(
     return {
         "success": True,
         "message": "Elasticsearch indices deleted"
-    } 
\ No newline at end of file
+    }
+
+
+@router.post("/goals/refresh", response_model=Dict[str, Any])
+async def refresh_goals(
+    batch_size: int = Query(MAINTENANCE_BATCH_SIZE, ge=1, le=10000),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Recompute days remaining, progress and expiry of all active goals.
+    Admin only endpoint; normally run on a schedule with
+    scripts/maintenance.py refresh-goals.
+    
+    Args:
+        batch_size: Goal updates per bulk write
+        current_user: Current authenticated user
+        
+    Returns:
+        Dictionary with counts of processed, changed and expired goals
+    """
+    # Check if user is admin
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can perform this operation",
+        )
+    
+    counts = await refresh_goal_status(batch_size=batch_size)
+    
+    return {
+        "success": True,
+        "message": "Goals refreshed",
+        "goal_counts": counts
+    }
+
+
+@router.get("/notifications/push-metrics", response_model=Dict[str, Any])
+async def read_push_metrics(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get throughput and queue depth of this process's push delivery worker.
+    Admin only endpoint.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Whether the worker runs in this process, with its counters,
+        pushes_per_second and queue_depth if so
+    """
+    # Check if user is admin
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can perform this operation",
+        )
+    
+    return get_push_metrics()
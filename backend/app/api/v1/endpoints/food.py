@@ -12,7 +12,7 @@ from datetime import datetime, date
 
 from app.core.security import get_current_active_user
 from app.models.user import User
-from app.models.food import FoodLog, FoodLogCreate, FoodLogUpdate, MealBase
+from app.models.food import FoodLog, FoodLogCreate, FoodLogUpdate, MealBase, CatalogFood
 from app.agents.meal_planner import MealPlanRequest, MealPlan, generate_meal_plan
 from app.db.mongodb.food import (
     create_food_log,
@@ -23,6 +23,8 @@ from app.db.mongodb.food import (
     add_meal_to_food_log,
     get_nutrition_summary
 )
+from app.db.mongodb.nutrition import get_nutrition_rollups
+from app.db.mongodb.food_catalog import get_catalog_food_by_id, search_catalog_foods
 
 
 router = APIRouter()
@@ -46,6 +48,95 @@ async def create_food_log_endpoint(
     return await create_food_log(food_log, str(current_user.id))
 
 
+@router.get("/nutrition-summary", response_model=Dict[str, Any])
+async def get_nutrition_summary_endpoint(
+    start_date: date,
+    end_date: date,
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get nutrition summary for a date range.
+    
+    Args:
+        start_date: Start date for summary
+        end_date: End date for summary
+        current_user: Current authenticated user
+        
+    Returns:
+        Nutrition summary
+    """
+    return await get_nutrition_summary(str(current_user.id), start_date, end_date)
+
+
+@router.get("/nutrition-rollups", response_model=List[Dict[str, Any]])
+async def get_nutrition_rollups_endpoint(
+    start_date: date,
+    end_date: date,
+    period: str = Query("day", pattern="^(day|week|month)$"),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get nutrition rollups per day, week or month for a date range.
+    
+    Args:
+        start_date: Start date
+        end_date: End date
+        period: Rollup period ("day", "week" or "month")
+        current_user: Current authenticated user
+        
+    Returns:
+        List of rollups ordered by period start
+    """
+    return await get_nutrition_rollups(str(current_user.id), start_date, end_date, period)
+
+
+@router.get("/catalog", response_model=List[CatalogFood])
+async def search_catalog_foods_endpoint(
+    q: str,
+    skip: int = 0,
+    limit: int = Query(20, le=100),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Search the food catalog by name prefix.
+    
+    Args:
+        q: Name prefix
+        skip: Number of foods to skip
+        limit: Maximum number of foods to return
+        current_user: Current authenticated user
+        
+    Returns:
+        List of catalog foods
+    """
+    return await search_catalog_foods(q, skip=skip, limit=limit)
+
+
+@router.get("/catalog/{food_id}", response_model=CatalogFood)
+async def read_catalog_food(
+    food_id: str,
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get a catalog food by ID.
+    
+    Args:
+        food_id: Catalog food ID
+        current_user: Current authenticated user
+        
+    Returns:
+        Catalog food
+    """
+    food = await get_catalog_food_by_id(food_id)
+    if not food:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Catalog food not found",
+        )
+    
+    return food
+
+
 @router.get("/{food_log_id}", response_model=FoodLog)
 async def read_food_log(
     food_log_id: str,
@@ -167,7 +258,9 @@ async def read_user_food_logs(
     Returns:
         List of food logs
     """
-    return await get_user_food_logs(str(current_user.id), start_date, end_date, skip=skip, limit=limit)
+    return await get_user_food_logs(
+        str(current_user.id), start_date, end_date, skip=skip, limit=limit, trusted=True
+    )
 
 
 @router.post("/meal-plan", response_model=MealPlan)
@@ -234,31 +327,3 @@ async def add_meal_to_food_log_endpoint(
 
     updated_food_log = await add_meal_to_food_log(food_log_id, meal)
     return updated_food_log
-
-
-@router.get("/nutrition-summary", response_model=Dict[str, Any])
-async def get_nutrition_summary_endpoint(
-    start_date: date,
-    end_date: date,
-    current_user: User = Depends(get_current_active_user)
-) -> Any:
-    """
-    Get nutrition summary for a date range.
-    
-    Args:
-        start_date: Start date for summary
-        end_date: End date for summary
-        current_user: Current authenticated user
-        
-    Returns:
-        Nutrition summary
-    """
-    return await get_nutrition_summary(str(current_user.id), start_date, end_date)
-
-    update_data = FoodLogUpdate(
-        meals=[*food_log.meals, meal]
-    )
-    
-    updated_food_log = await update_food_log_db(food_log_id, update_data)
-    return updated_food_log
-
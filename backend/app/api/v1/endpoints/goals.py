@@ -17,6 +17,9 @@ from app.db.mongodb.goals import (
     update_goal_progress,
     get_user_goal_summary
 )
+from app.db.mongodb.goal_history import get_goal_progress_history
+from app.services.recommendations import get_goal_recommendations
+from app.services.timeseries import DEFAULT_CHART_POINTS, downsample_series
 
 
 router = APIRouter()
@@ -40,6 +43,22 @@ async def create_goal_endpoint(
     return await create_goal(goal, str(current_user.id))
 
 
+@router.get("/summary", response_model=Dict[str, Any])
+async def get_user_goal_summary_endpoint(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get a summary of the user's goals.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Goal summary with counts by status
+    """
+    return await get_user_goal_summary(str(current_user.id))
+
+
 @router.get("/{goal_id}", response_model=Goal)
 async def read_goal(
     goal_id: str,
@@ -161,7 +180,9 @@ async def read_user_goals(
     Returns:
         List of goals
     """
-    return await get_user_goals(str(current_user.id), status, goal_type, skip=skip, limit=limit)
+    return await get_user_goals(
+        str(current_user.id), status, goal_type, skip=skip, limit=limit, trusted=True
+    )
 
 
 @router.put("/{goal_id}/progress", response_model=Goal)
@@ -200,27 +221,64 @@ async def update_goal_progress_endpoint(
     return updated_goal
 
 
-@router.get("/summary", response_model=Dict[str, Any])
-async def get_user_goal_summary_endpoint(
+@router.get("/{goal_id}/history", response_model=Dict[str, Any])
+async def read_goal_history(
+    goal_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    resolution: str = Query("auto", pattern="^(auto|raw|daily|weekly|lttb)$"),
+    points: int = Query(DEFAULT_CHART_POINTS, ge=3, le=2000),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_CHART_POINTS, ge=1, le=2000),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
-    Get a summary of the user's goals.
+    Get a goal's progress history, downsampled and paged.
     
     Args:
+        goal_id: Goal ID
+        start_date: Optional start date for filtering
+        end_date: Optional end date for filtering
+        resolution: "raw", "daily" or "weekly" means, "lttb" for charts, or
+            "auto" (raw when it fits in points, LTTB otherwise)
+        points: Maximum number of points for "auto" and "lttb"
+        skip: Number of (downsampled) points to skip
+        limit: Maximum number of points to return
         current_user: Current authenticated user
         
     Returns:
-        Goal summary with counts by status and type
+        Dictionary with the total number of points and the requested page
     """
-    return await get_user_goal_summary(str(current_user.id))
-
-    updated_goal = await update_goal_progress_db(goal_id, current_value)
-    return updated_goal
+    goal = await get_goal_by_id(goal_id)
+    if not goal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Goal not found",
+        )
+    
+    # Check if the goal belongs to the current user
+    if str(goal.user_id) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    
+    history = downsample_series(
+        await get_goal_progress_history(goal_id, start_date, end_date),
+        resolution,
+        points
+    )
+    
+    return {
+        "goal_id": goal_id,
+        "total": len(history),
+        "points": history[skip:skip + limit],
+        "stats": goal.progress_stats
+    }
 
 
 @router.get("/{goal_id}/recommendations", response_model=GoalWithRecommendations)
-async def get_goal_recommendations(
+async def read_goal_recommendations(
     goal_id: str,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -234,7 +292,7 @@ async def get_goal_recommendations(
     Returns:
         Goal with recommendations
     """
-    goal = await get_goal_by_id_db(goal_id)
+    goal = await get_goal_by_id(goal_id)
     if not goal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -242,18 +300,15 @@ async def get_goal_recommendations(
         )
     
     # Check if the goal belongs to the current user
-    if goal.user_id != str(current_user.id):
+    if str(goal.user_id) != str(current_user.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
     
-    goal_with_recommendations = await get_goal_recommendations_db(goal_id)
-    if not goal_with_recommendations:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate recommendations for this goal",
-        )
-    
-    return goal_with_recommendations
-
+    return GoalWithRecommendations(
+        **goal.dict(exclude={"id", "user_id"}),
+        id=str(goal.id),
+        user_id=str(goal.user_id),
+        recommendations=await get_goal_recommendations(goal)
+    )
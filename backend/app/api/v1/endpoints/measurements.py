@@ -17,6 +17,9 @@ from app.db.mongodb.measurements import (
     get_measurement_history,
     get_latest_measurements
 )
+from app.db.mongodb.measurement_series import MEASUREMENT_METRICS
+from app.services.measurement import get_measurement_trends
+from app.services.timeseries import DEFAULT_CHART_POINTS
 
 
 router = APIRouter()
@@ -40,6 +43,53 @@ async def create_measurement_endpoint(
     return await create_measurement(measurement, str(current_user.id))
 
 
+@router.get("/latest", response_model=Dict[str, Dict[str, Any]])
+async def read_latest_measurements(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get current user's latest measurement of each type.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Dictionary of metrics with their latest value, date and measurement_id
+    """
+    return await get_latest_measurements(str(current_user.id))
+
+
+@router.get("/trends", response_model=Dict[str, Dict[str, Any]])
+async def read_measurement_trends(
+    metrics: Optional[List[str]] = Query(None),
+    days: int = Query(90, ge=7, le=3650),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get trend analytics for current user's measurements.
+    
+    For each metric: the samples with their smoothed trend value and outlier
+    flag, the weekly rate of change, a linear regression and the projected
+    date of each unfinished goal tracking the metric.
+    
+    Args:
+        metrics: Metrics to analyze (all metrics with samples by default)
+        days: Number of days of history to analyze
+        current_user: Current authenticated user
+        
+    Returns:
+        Trend analytics keyed by metric
+    """
+    unknown = [metric for metric in metrics or [] if metric not in MEASUREMENT_METRICS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown measurement types: {', '.join(unknown)}",
+        )
+    
+    return await get_measurement_trends(str(current_user.id), metrics, days)
+
+
 @router.get("/{measurement_id}", response_model=Measurement)
 async def read_measurement(
     measurement_id: str,
@@ -178,56 +228,36 @@ async def read_measurement_history_endpoint(
     measurement_type: str,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    limit: int = 50,
+    resolution: str = Query("auto", pattern="^(auto|raw|daily|weekly|lttb)$"),
+    points: int = Query(DEFAULT_CHART_POINTS, ge=3, le=2000),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
     Get history of a specific measurement type.
     
     Args:
-        measurement_type: Type of measurement to track
+        measurement_type: Metric to track (e.g. weight, body_fat, arms_left)
         start_date: Optional start date for filtering
         end_date: Optional end date for filtering
-        limit: Maximum number of records to return
+        resolution: "raw", "daily" or "weekly" means, "lttb" for charts, or
+            "auto" (raw when it fits in points, LTTB otherwise)
+        points: Maximum number of points for "auto" and "lttb"
         current_user: Current authenticated user
         
     Returns:
-        List of measurement history entries
+        List of {"date", "value"} history points
     """
+    if measurement_type not in MEASUREMENT_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown measurement type. Expected one of: {', '.join(MEASUREMENT_METRICS)}",
+        )
+    
     return await get_measurement_history(
         str(current_user.id),
         measurement_type,
         start_date,
         end_date,
-        limit
+        resolution=resolution,
+        points=points
     )
-
-
-@router.get("/latest", response_model=Dict[str, Dict[str, Any]])
-async def read_latest_measurements(
-    current_user: User = Depends(get_current_active_user)
-) -> Any:
-    """
-    Get current user's latest measurement of each type.
-    
-    Args:
-        current_user: Current authenticated user
-        
-    Returns:
-
-        Dictionary of measurement types with latest values
-    """
-    return await get_latest_measurements(str(current_user.id))
-
-    
-    # Get the latest measurement
-    measurements = await get_user_measurements_db(str(current_user.id), limit=1)
-    
-    if not measurements:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No measurements found",
-        )
-    
-    return measurements[0]
-
@@ -1,73 +1,35 @@
 from typing import Any, List, Optional, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, Body, Query, status
-from bson import ObjectId
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Body, status
 
 from app.core.security import get_current_active_user
 from app.models.user import User
+from app.models.notification import (
+    Notification,
+    NotificationType,
+    NotificationSettings,
+    NotificationSettingsUpdate
+)
+from app.db.mongodb.notifications import (
+    get_user_notifications,
+    get_unread_notification_count,
+    mark_notification_read,
+    mark_all_notifications_read,
+    delete_notification,
+    register_device_token,
+    unregister_device_token,
+    get_user_notification_settings,
+    update_user_notification_settings
+)
 
 
 router = APIRouter()
 
 
-# Simple notification model
-class Notification:
-    id: str
-    user_id: str
-    type: str  # e.g., "follow", "like", "comment", "goal_achieved", "reminder"
-    title: str
-    message: str
-    is_read: bool
-    created_at: datetime
-    metadata: Optional[Dict]  # Additional data specific to notification type
-
-
-# Mock database functions
-async def get_user_notifications_db(
-    user_id: str,
-    is_read: Optional[bool] = None,
-    skip: int = 0,
-    limit: int = 50
-) -> List[Dict]:
-    """Get user's notifications."""
-    # This would be replaced with actual DB call
-    return []
-
-
-async def mark_notification_read_db(notification_id: str, user_id: str) -> bool:
-    """Mark a notification as read."""
-    # This would be replaced with actual DB call
-    return True
-
-
-async def mark_all_notifications_read_db(user_id: str) -> bool:
-    """Mark all notifications as read for a user."""
-    # This would be replaced with actual DB call
-    return True
-
-
-async def delete_notification_db(notification_id: str, user_id: str) -> bool:
-    """Delete a notification."""
-    # This would be replaced with actual DB call
-    return True
-
-
-async def register_device_token_db(user_id: str, device_token: str, device_type: str) -> bool:
-    """Register a device token for push notifications."""
-    # This would be replaced with actual DB call
-    return True
-
-
-async def unregister_device_token_db(user_id: str, device_token: str) -> bool:
-    """Unregister a device token."""
-    # This would be replaced with actual DB call
-    return True
-
-
-@router.get("/", response_model=List[Dict])
+@router.get("/", response_model=List[Notification])
 async def get_notifications(
     is_read: Optional[bool] = None,
+    notification_type: Optional[NotificationType] = None,
     skip: int = 0,
     limit: int = 50,
     current_user: User = Depends(get_current_active_user)
@@ -77,6 +39,7 @@ async def get_notifications(
     
     Args:
         is_read: Filter by read status
+        notification_type: Filter by notification type
         skip: Number of notifications to skip
         limit: Maximum number of notifications to return
         current_user: Current authenticated user
@@ -84,11 +47,29 @@ async def get_notifications(
     Returns:
         List of notifications
     """
-    return await get_user_notifications_db(str(current_user.id), is_read, skip, limit)
+    return await get_user_notifications(
+        str(current_user.id), is_read, notification_type, skip=skip, limit=limit, trusted=True
+    )
+
+
+@router.get("/unread-count", response_model=Dict[str, int])
+async def get_unread_count(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get the number of unread notifications, for the badge.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Dictionary with the unread count
+    """
+    return {"count": await get_unread_notification_count(str(current_user.id))}
 
 
 @router.put("/{notification_id}/read", response_model=bool)
-async def mark_notification_read(
+async def mark_notification_read_endpoint(
     notification_id: str,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -102,17 +83,17 @@ async def mark_notification_read(
     Returns:
         True if successful
     """
-    result = await mark_notification_read_db(notification_id, str(current_user.id))
-    if not result:
+    notification = await mark_notification_read(notification_id, str(current_user.id))
+    if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found",
         )
-    return result
+    return True
 
 
 @router.put("/read-all", response_model=bool)
-async def mark_all_notifications_read(
+async def mark_all_notifications_read_endpoint(
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -124,11 +105,12 @@ async def mark_all_notifications_read(
     Returns:
         True if successful
     """
-    return await mark_all_notifications_read_db(str(current_user.id))
+    await mark_all_notifications_read(str(current_user.id))
+    return True
 
 
 @router.delete("/{notification_id}", response_model=bool)
-async def delete_notification(
+async def delete_notification_endpoint(
     notification_id: str,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -142,7 +124,7 @@ async def delete_notification(
     Returns:
         True if successful
     """
-    result = await delete_notification_db(notification_id, str(current_user.id))
+    result = await delete_notification(notification_id, str(current_user.id))
     if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -168,7 +150,7 @@ async def register_device(
     Returns:
         True if successful
     """
-    return await register_device_token_db(str(current_user.id), device_token, device_type)
+    return await register_device_token(str(current_user.id), device_token, device_type)
 
 
 @router.delete("/devices/{device_token}", response_model=bool)
@@ -186,10 +168,10 @@ async def unregister_device(
     Returns:
         True if successful
     """
-    return await unregister_device_token_db(str(current_user.id), device_token)
+    return await unregister_device_token(str(current_user.id), device_token)
 
 
-@router.get("/settings", response_model=Dict)
+@router.get("/settings", response_model=NotificationSettings)
 async def get_notification_settings(
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -202,22 +184,12 @@ async def get_notification_settings(
     Returns:
         Notification settings
     """
-    # This would be replaced with actual DB call
-    return {
-        "push_enabled": True,
-        "email_enabled": True,
-        "categories": {
-            "social": True,
-            "workout_reminders": True,
-            "goal_updates": True,
-            "achievements": True
-        }
-    }
+    return await get_user_notification_settings(str(current_user.id))
 
 
-@router.put("/settings", response_model=Dict)
+@router.put("/settings", response_model=NotificationSettings)
 async def update_notification_settings(
-    settings: Dict = Body(...),
+    settings: NotificationSettingsUpdate,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -230,5 +202,4 @@ async def update_notification_settings(
     Returns:
         Updated notification settings
     """
-    # This would be replaced with actual DB call
-    return settings
+    return await update_user_notification_settings(str(current_user.id), settings)
@@ -0,0 +1,59 @@
+import asyncio
+import json
+from typing import Any
+
+from fastapi import APIRouter, Query, WebSocket, status
+
+from app.core.security import get_user_from_token
+from app.services.export import json_default
+from app.services.realtime import HEARTBEAT_INTERVAL, hub
+
+
+router = APIRouter()
+
+HEARTBEAT_EVENT = {"type": "heartbeat"}
+
+
+@router.websocket("/ws")
+async def realtime_updates(
+    websocket: WebSocket,
+    token: str = Query(...)
+) -> Any:
+    """
+    Push new notifications, likes, comments and feed posts to the user.
+    
+    Events are JSON objects with a "type". A "heartbeat" is sent after
+    HEARTBEAT_INTERVAL seconds without events; a "refresh" means events
+    were dropped because the client fell behind, and the client should
+    refetch notifications and the feed.
+    
+    Args:
+        websocket: WebSocket connection
+        token: JWT access token (browsers can't set headers on WebSockets)
+    """
+    user = await get_user_from_token(token)
+    if user is None or not user.is_active:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    connection = hub.connect(str(user.id))
+    
+    async def send_events() -> None:
+        while True:
+            event = await connection.next_event(HEARTBEAT_INTERVAL)
+            await websocket.send_text(json.dumps(event or HEARTBEAT_EVENT, default=json_default))
+    
+    async def receive_messages() -> None:
+        # Client messages are only heartbeats; reading them detects disconnects
+        while True:
+            await websocket.receive_text()
+    
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(receive_messages())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        hub.disconnect(connection)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,10 +1,11 @@
 from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from datetime import datetime
 
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.db.mongodb.search import MongoDBSearchService
+from app.db.vector.sync import search_similar_foods
 
 router = APIRouter()
 
@@ -12,10 +13,12 @@ router = APIRouter()
 @router.get("/workouts")
 async def search_workouts(
     q: str,
+    mode: str = Query("text", pattern="^(text|semantic|hybrid)$"),
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
     page: int = 0,
     page_size: int = 10,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -23,17 +26,40 @@ async def search_workouts(
     
     Args:
         q: Search query
+        mode: "text" for full-text, "semantic" for embedding similarity,
+            "hybrid" for both merged by reciprocal rank fusion
         date_from: Start date filter (ISO format)
         date_to: End date filter (ISO format)
         page: Page number
         page_size: Number of results per page
+        cursor: next_cursor of the previous page (text mode only; replaces page)
         current_user: Current authenticated user
         
     Returns:
-        Search results
+        Search results, with next_cursor in text mode
     """
+    if cursor and mode != "text":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor paging is only supported in text mode",
+        )
+    
     skip = page * page_size
-    return await MongoDBSearchService.search_workouts(
+    if mode == "text":
+        return await MongoDBSearchService.search_workouts(
+            query=q,
+            date_from=date_from,
+            date_to=date_to,
+            skip=skip,
+            limit=page_size,
+            cursor=cursor
+        )
+    
+    search = {
+        "semantic": MongoDBSearchService.search_workouts_semantic,
+        "hybrid": MongoDBSearchService.search_workouts_hybrid
+    }[mode]
+    return await search(
         query=q,
         date_from=date_from,
         date_to=date_to,
@@ -42,11 +68,57 @@ async def search_workouts(
     )
 
 
+@router.get("/workouts/facets")
+async def browse_workout_facets(
+    exercise: Optional[str] = None,
+    duration_min: Optional[int] = None,
+    duration_max: Optional[int] = None,
+    calories_min: Optional[int] = None,
+    calories_max: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    page: int = 0,
+    page_size: int = 10,
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Browse public workouts with facet counts.
+    
+    Args:
+        exercise: Exercise name filter
+        duration_min: Minimum duration in seconds
+        duration_max: Maximum duration in seconds
+        calories_min: Minimum calories burned
+        calories_max: Maximum calories burned
+        date_from: Start date filter (ISO format)
+        date_to: End date filter (ISO format)
+        page: Page number
+        page_size: Number of results per page
+        current_user: Current authenticated user
+        
+    Returns:
+        Filtered workouts with top exercise, duration and calories facet counts
+    """
+    skip = page * page_size
+    return await MongoDBSearchService.browse_workout_facets(
+        exercise=exercise,
+        duration_min=duration_min,
+        duration_max=duration_max,
+        calories_min=calories_min,
+        calories_max=calories_max,
+        date_from=date_from,
+        date_to=date_to,
+        skip=skip,
+        limit=page_size
+    )
+
+
 @router.get("/users")
 async def search_users(
     q: str,
     page: int = 0,
     page_size: int = 10,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -56,16 +128,18 @@ async def search_users(
         q: Search query
         page: Page number
         page_size: Number of results per page
+        cursor: next_cursor of the previous page (replaces page)
         current_user: Current authenticated user
         
     Returns:
-        Search results
+        Search results with the next page's cursor
     """
     skip = page * page_size
     return await MongoDBSearchService.search_users(
         query=q,
         skip=skip,
-        limit=page_size
+        limit=page_size,
+        cursor=cursor
     )
 
 
@@ -76,6 +150,7 @@ async def search_food_logs(
     date_to: Optional[str] = None,
     page: int = 0,
     page_size: int = 10,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -87,10 +162,11 @@ async def search_food_logs(
         date_to: End date filter (ISO format)
         page: Page number
         page_size: Number of results per page
+        cursor: next_cursor of the previous page (replaces page)
         current_user: Current authenticated user
         
     Returns:
-        Search results
+        Search results with the next page's cursor
     """
     skip = page * page_size
     return await MongoDBSearchService.search_food_logs(
@@ -99,13 +175,35 @@ async def search_food_logs(
         date_from=date_from,
         date_to=date_to,
         skip=skip,
-        limit=page_size
+        limit=page_size,
+        cursor=cursor
     )
 
 
+@router.get("/foods/similar")
+async def search_similar_foods_endpoint(
+    q: str,
+    limit: int = 10,
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Find logged foods with names semantically similar to a query.
+    
+    Args:
+        q: Search query
+        limit: Maximum number of foods to return
+        current_user: Current authenticated user
+        
+    Returns:
+        Similar food names with similarity scores
+    """
+    return await search_similar_foods(q, k=limit)
+
+
 @router.get("/")
 async def search_all(
     q: str,
+    mode: str = Query("grouped", pattern="^(grouped|blended)$"),
     page: int = 0,
     page_size: int = 10,
     current_user: User = Depends(get_current_active_user)
@@ -115,6 +213,7 @@ async def search_all(
     
     Args:
         q: Search query
+        mode: "grouped" for per-collection lists, "blended" for one ranked page
         page: Page number
         page_size: Number of results per page
         current_user: Current authenticated user
@@ -123,6 +222,14 @@ async def search_all(
         Combined search results
     """
     skip = page * page_size
+    if mode == "blended":
+        return await MongoDBSearchService.search_blended(
+            query=q,
+            user_id=str(current_user.id),
+            skip=skip,
+            limit=page_size
+        )
+    
     return await MongoDBSearchService.search_all(
         query=q,
         user_id=str(current_user.id),
@@ -1,6 +1,7 @@
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
 from app.core.security import get_current_active_user
 from app.db.mongodb.users import (
@@ -12,6 +13,9 @@ from app.db.mongodb.users import (
     remove_follower
 )
 from app.models.user import User, UserUpdate
+from app.db.mongodb.export import EXPORT_COLLECTIONS
+from app.db.mongodb.user_stats import get_user_stats
+from app.services.export import EXPORT_MEDIA_TYPES, stream_user_export
 
 
 router = APIRouter()
@@ -55,6 +59,72 @@ async def update_current_user(
     return user
 
 
+@router.get("/me/stats", response_model=Dict[str, Any])
+async def read_current_user_stats(current_user: User = Depends(get_current_active_user)) -> Any:
+    """
+    Get current user's goal, workout, post and food log counters.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Stats with goals (total and by status), workouts (count, duration and
+        calories burned), posts and food_logs counters
+    """
+    return await get_user_stats(str(current_user.id))
+
+
+@router.get("/me/export")
+async def export_current_user_data(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    collections: Optional[str] = None,
+    gzip: bool = False,
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Export the current user's history as a streamed download.
+    
+    Args:
+        format: "ndjson" (one JSON object per line) or "csv"
+        collections: Comma-separated collections to export (workouts, food_logs,
+            measurements, goals, posts); all for NDJSON when omitted
+        gzip: Compress the download with gzip
+        current_user: Current authenticated user
+        
+    Returns:
+        Streaming response with the exported rows
+    """
+    if collections:
+        selected = [name.strip() for name in collections.split(",") if name.strip()]
+    else:
+        selected = list(EXPORT_COLLECTIONS)
+    
+    unknown = [name for name in selected if name not in EXPORT_COLLECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown collections: {', '.join(unknown)}",
+        )
+    
+    if format == "csv" and len(selected) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV export requires exactly one collection",
+        )
+    
+    filename = f"dumbbell-diaries-{'-'.join(selected) if len(selected) == 1 else 'export'}.{format}"
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        stream_user_export(str(current_user.id), selected, format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/{user_id}", response_model=User)
 async def read_user(
     user_id: str,
@@ -160,7 +160,7 @@ async def read_user_workouts(
     Returns:
         List of workouts
     """
-    return await get_user_workouts(str(current_user.id), skip=skip, limit=limit)
+    return await get_user_workouts(str(current_user.id), skip=skip, limit=limit, trusted=True)
 
 
 @router.get("/user/{user_id}", response_model=List[Workout])
@@ -184,7 +184,7 @@ async def read_user_workouts_by_id(
     """
     # In a real implementation, we would check if the current user follows the requested user
     # or if the workouts are public
-    return await get_user_workouts(user_id, skip=skip, limit=limit)
+    return await get_user_workouts(user_id, skip=skip, limit=limit, trusted=True)
 
 
 @router.get("/public", response_model=List[WorkoutWithUserInfo])
@@ -0,0 +1,112 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache whose entries expire after a time-to-live.
+
+    The cache is local to one worker process, so it only holds data that is
+    cheap to recompute and safe to serve slightly stale.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 60.0):
+        """
+        Args:
+            maxsize: Maximum number of entries before the least recently used is evicted
+            ttl: Default time-to-live in seconds (None keeps entries until evicted)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Cached value or default if missing or expired
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live overriding the cache default
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove a value if present.
+
+        Args:
+            key: Cache key
+        """
+        self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        Remove all string keys starting with a prefix.
+
+        Args:
+            prefix: Key prefix
+
+        Returns:
+            Number of removed entries
+        """
+        keys = [key for key in self._data if isinstance(key, str) and key.startswith(prefix)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def make_cache_key(namespace: str, **params: Any) -> str:
+    """
+    Build a deterministic cache key from a namespace and parameters.
+
+    Parameters are sorted by name and None values are skipped, so equivalent
+    requests map to the same key.
+
+    Args:
+        namespace: Key namespace, e.g. "search:workouts"
+        **params: Parameters identifying the cached result
+
+    Returns:
+        Cache key string
+    """
+    parts = [f"{name}={params[name]}" for name in sorted(params) if params[name] is not None]
+    return f"{namespace}:{'&'.join(parts)}"
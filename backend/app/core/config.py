@@ -17,6 +17,12 @@ class Settings(BaseSettings):
     MONGODB_URI: str = Field(..., env="MONGODB_URI")
     MONGODB_DB_NAME: str = "dumbbell_diaries"
     
+    # Data Export Settings
+    EXPORT_MONGODB_POOL_SIZE: int = 2  # Separate small pool so exports can't starve the API
+    EXPORT_READ_PREFERENCE: str = "secondaryPreferred"
+    EXPORT_BATCH_SIZE: int = 500
+    ANALYTICS_EXPORT_DIR: str = "data/analytics"
+    
     # JWT Settings
     JWT_SECRET_KEY: str = Field(..., env="JWT_SECRET_KEY")
     JWT_ALGORITHM: str = "HS256"
@@ -25,9 +31,19 @@ class Settings(BaseSettings):
     # Elasticsearch Settings
     # ELASTICSEARCH_URI: str = Field(..., env="ELASTICSEARCH_URI")
     
+    # Vector Search Settings
+    VECTOR_INDEX_DIR: str = "data/vectors"
+    VECTOR_DIM: int = 512
+    
     # Firebase Settings
     FIREBASE_CREDENTIALS: str = Field(..., env="FIREBASE_CREDENTIALS")
     
+    # Push Notification Settings
+    PUSH_WORKER_ENABLED: bool = False  # Run the push delivery worker in this process
+    PUSH_SENDER: str = "firebase"  # "firebase", or "fake" to record pushes locally
+    PUSH_BATCH_SIZE: int = 500
+    PUSH_CONCURRENCY: int = 4
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
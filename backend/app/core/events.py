@@ -8,7 +8,19 @@ import os
 from pathlib import Path
 
 from app.core.config import settings
-from app.db.mongodb.mongodb import close_mongo_connection, connect_to_mongo
+from app.db.mongodb.mongodb import close_mongo_connection, connect_to_mongo, connect_to_export_mongo
+from app.db.mongodb.food_catalog import load_food_catalog
+from app.db.mongodb.goals import create_goal_indexes
+from app.db.mongodb.notifications import create_notification_indexes
+from app.services.goal_progress import register_goal_progress_receivers
+from app.services.recommendations import register_recommendation_receivers
+from app.services.notification import (
+    create_push_sender,
+    register_notification_receivers,
+    start_push_worker,
+    stop_push_worker
+)
+from app.services.realtime import register_realtime_receivers
 # from app.db.elasticsearch.elasticsearch import close_elasticsearch_connection, connect_to_elasticsearch
 # from app.db.elasticsearch.indices import create_indices
 
@@ -28,6 +40,41 @@ def create_start_app_handler(app: FastAPI) -> Callable:
         app.state.mongodb_client = await connect_to_mongo()
         app.state.mongodb = app.state.mongodb_client[settings.MONGODB_DB_NAME]
         
+        # Initialize the low-priority MongoDB connection used by data exports
+        app.state.export_mongodb_client = await connect_to_export_mongo()
+        app.state.export_mongodb = app.state.export_mongodb_client[settings.MONGODB_DB_NAME]
+        
+        # Load food catalog nutrients for in-memory lookups
+        try:
+            catalog_size = await load_food_catalog()
+            print(f"Loaded {catalog_size} catalog foods")
+        except Exception as e:
+            print(f"Food catalog loading error: {e}")
+        
+        # Derive goal progress from measurement, workout and food log writes
+        register_goal_progress_receivers()
+        
+        # Drop cached goal recommendations when the data behind them changes
+        register_recommendation_receivers()
+        
+        # Notify post authors of likes and comments, collapsed per post
+        register_notification_receivers()
+        
+        # Push new notifications and social activity to connected clients
+        register_realtime_receivers()
+        
+        # The unique index on aggregation windows keeps concurrent likes in one notification
+        try:
+            await create_notification_indexes()
+        except Exception as e:
+            print(f"Notification index creation error: {e}")
+        
+        # Goal indexes, including the ones history bucket appends look up open buckets with
+        try:
+            await create_goal_indexes()
+        except Exception as e:
+            print(f"Goal index creation error: {e}")
+        
         # Initialize Elasticsearch connection
         # app.state.elasticsearch_client = await connect_to_elasticsearch()
         
@@ -51,6 +98,14 @@ def create_start_app_handler(app: FastAPI) -> Callable:
         except Exception as e:
             print(f"Firebase initialization error: {e}")
             # Continue without Firebase for development purposes
+        
+        # Start delivering push notifications
+        if settings.PUSH_WORKER_ENABLED:
+            start_push_worker(
+                create_push_sender(settings.PUSH_SENDER),
+                batch_size=settings.PUSH_BATCH_SIZE,
+                concurrency=settings.PUSH_CONCURRENCY
+            )
     
     return start_app
 
@@ -66,8 +121,12 @@ def create_stop_app_handler(app: FastAPI) -> Callable:
         Stop app handler function
     """
     async def stop_app() -> None:
+        # Stop the push delivery worker before the connection it uses
+        await stop_push_worker()
+        
         # Close MongoDB connection
         await close_mongo_connection(app.state.mongodb_client)
+        await close_mongo_connection(app.state.export_mongodb_client)
         
         # Close Elasticsearch connection
         # await close_elasticsearch_connection(app.state.elasticsearch_client)
@@ -45,40 +45,51 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+async def get_user_from_token(token: str) -> Optional[User]:
     """
-    Get the current user from the JWT token.
+    Get the user a JWT token was issued to.
     
     Args:
         token: JWT token
         
     Returns:
-        User object
-        
-    Raises:
-        HTTPException: If token is invalid or user not found
+        User object, or None if the token is invalid or the user not found
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
         )
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            return None
     except (JWTError, ValidationError):
-        raise credentials_exception
+        return None
     
     # This would be replaced with an actual DB call
     from app.db.mongodb.users import get_user_by_id
-    user = await get_user_by_id(user_id)
+    return await get_user_by_id(user_id)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+    """
+    Get the current user from the JWT token.
+    
+    Args:
+        token: JWT token
+        
+    Returns:
+        User object
+        
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user = await get_user_from_token(token)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     return user
 
@@ -0,0 +1,81 @@
+from typing import Any, Awaitable, Callable, List
+
+Receiver = Callable[..., Awaitable[None]]
+
+
+class Signal:
+    """
+    In-process event that repository writes send to interested services.
+
+    Receivers are awaited in registration order in the request that sent the
+    signal. A failing receiver is reported and skipped, so derived data can
+    never fail the write that triggered it.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Signal name, used in error messages
+        """
+        self.name = name
+        self._receivers: List[Receiver] = []
+
+    def connect(self, receiver: Receiver) -> Receiver:
+        """
+        Register a receiver; usable as a decorator.
+
+        Args:
+            receiver: Async callable taking the signal's keyword arguments
+
+        Returns:
+            The receiver
+        """
+        if receiver not in self._receivers:
+            self._receivers.append(receiver)
+        return receiver
+
+    def disconnect(self, receiver: Receiver) -> None:
+        """
+        Unregister a receiver.
+
+        Args:
+            receiver: Previously connected receiver
+        """
+        if receiver in self._receivers:
+            self._receivers.remove(receiver)
+
+    async def send(self, **payload: Any) -> None:
+        """
+        Call every receiver with the payload.
+
+        Args:
+            **payload: Keyword arguments passed to each receiver
+        """
+        for receiver in list(self._receivers):
+            try:
+                await receiver(**payload)
+            except Exception as e:
+                print(f"Error in {self.name} receiver {getattr(receiver, '__name__', receiver)}: {e}")
+
+
+# Sent with user_id, previous and current documents (previous is None on
+# create, current is None on delete)
+measurement_saved = Signal("measurement_saved")
+workout_saved = Signal("workout_saved")
+food_log_saved = Signal("food_log_saved")
+
+# Sent with user_id and goal_id whenever a goal is created, edited or deleted
+goal_changed = Signal("goal_changed")
+
+# Sent with notifications, the created notification documents (each with
+# its recipient's user_id)
+notifications_created = Signal("notifications_created")
+
+# Sent with user_id (the author) and the created post
+post_created = Signal("post_created")
+
+# Sent with user_id (who liked) and the updated post
+post_liked = Signal("post_liked")
+
+# Sent with user_id (who commented), the post and the created comment
+comment_added = Signal("comment_added")
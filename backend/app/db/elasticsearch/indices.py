@@ -7,10 +7,14 @@ from app.core.config import settings
 WORKOUT_INDEX = "workouts"
 USER_INDEX = "users"
 FOOD_LOG_INDEX = "food_logs"
+FOOD_ITEM_INDEX = "food_items"
 MEASUREMENT_INDEX = "measurements"
 GOAL_INDEX = "goals"
 SOCIAL_POST_INDEX = "social_posts"
 
+# Nutrient fields carried on flattened food item documents
+FOOD_ITEM_NUTRIENTS = ("calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium")
+
 # Define mappings for each index
 INDEX_MAPPINGS = {
     WORKOUT_INDEX: {
@@ -91,6 +95,34 @@ INDEX_MAPPINGS = {
             }
         }
     },
+    # One flat document per consumed food, denormalized from food_logs.meals.foods.
+    # Nutrient fields hold the consumed amount (per-serving value x quantity).
+    FOOD_ITEM_INDEX: {
+        "mappings": {
+            "properties": {
+                "id": {"type": "keyword"},
+                "food_log_id": {"type": "keyword"},
+                "user_id": {"type": "keyword"},
+                "date": {"type": "date"},
+                "meal_type": {"type": "keyword"},
+                "meal_index": {"type": "integer"},
+                "food_index": {"type": "integer"},
+                "name": {"type": "text", "analyzer": "english", "fields": {"keyword": {"type": "keyword"}}},
+                "quantity": {"type": "float"},
+                "serving_size": {"type": "float"},
+                "serving_unit": {"type": "keyword"},
+                "notes": {"type": "text"},  # Meal notes
+                "log_notes": {"type": "text"},  # Food log notes
+                "calories": {"type": "float"},
+                "protein": {"type": "float"},
+                "carbs": {"type": "float"},
+                "fat": {"type": "float"},
+                "fiber": {"type": "float"},
+                "sugar": {"type": "float"},
+                "sodium": {"type": "float"}
+            }
+        }
+    },
     MEASUREMENT_INDEX: {
         "mappings": {
             "properties": {
@@ -209,6 +241,18 @@ async def update_document(index: str, doc_id: str, partial_document: Dict[str, A
     await client.update(index=index, id=doc_id, doc=partial_document, refresh=True)
 
 
+async def delete_documents_by_query(index: str, query: Dict[str, Any]) -> None:
+    """
+    Delete all documents matching a query from Elasticsearch.
+    
+    Args:
+        index: The index name
+        query: The query selecting documents to delete
+    """
+    client = await get_elasticsearch_client()
+    await client.delete_by_query(index=index, query=query, refresh=True, conflicts="proceed")
+
+
 async def bulk_index_documents(index: str, documents: List[Dict[str, Any]]) -> None:
     """
     Bulk index multiple documents in Elasticsearch.
@@ -1,19 +1,117 @@
 from typing import Dict, List, Optional, Any, Tuple, Union
+import base64
+import json
 from elasticsearch import AsyncElasticsearch
 from app.db.elasticsearch.elasticsearch import get_elasticsearch_client
 from app.db.elasticsearch.indices import (
     WORKOUT_INDEX,
     USER_INDEX,
-    FOOD_LOG_INDEX,
+    FOOD_ITEM_INDEX,
     MEASUREMENT_INDEX,
     GOAL_INDEX,
-    SOCIAL_POST_INDEX
+    SOCIAL_POST_INDEX,
+    FOOD_ITEM_NUTRIENTS
 )
 
+# How long a point-in-time reader stays open between two cursor pages
+PIT_KEEP_ALIVE = "2m"
+
+# Stable sort for cursor pagination; "id" breaks ties between equal scores
+CURSOR_SORT = ["_score", {"id": "asc"}]
+
+
+def encode_cursor(pit_id: str, sort_values: List[Any]) -> str:
+    """
+    Encode a point-in-time id and the sort values of the last hit into an opaque cursor.
+    
+    Args:
+        pit_id: Point-in-time id
+        sort_values: Sort values of the last hit on the page
+        
+    Returns:
+        URL-safe cursor token
+    """
+    payload = json.dumps({"pit": pit_id, "after": sort_values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor token created by encode_cursor.
+    
+    Args:
+        cursor: Cursor token
+        
+    Returns:
+        Dictionary with the point-in-time id ("pit") and search_after values ("after")
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {"pit": state["pit"], "after": state["after"]}
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid search cursor")
+
 
 class SearchService:
     """Service for handling search operations across different entities."""
 
+    @staticmethod
+    async def _execute_search(
+        client: AsyncElasticsearch,
+        index: str,
+        search_query: Dict[str, Any],
+        cursor: Optional[str] = None,
+        use_cursor: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Execute a search, paging with search_after over a point in time when a cursor is used.
+        
+        Offset paging gets slower with depth and stops at max_result_window, so cursor
+        paging drops "from" and continues after the sort values of the previous page.
+        
+        Args:
+            client: Elasticsearch client
+            index: Index to search
+            search_query: Search body
+            cursor: Cursor returned with the previous page
+            use_cursor: Start a new cursor-paged search
+            
+        Returns:
+            Search response, with "next_cursor" set when cursor paging is used
+        """
+        if not cursor and not use_cursor:
+            return await client.search(index=index, body=search_query)
+        
+        if cursor:
+            state = decode_cursor(cursor)
+            pit_id = state["pit"]
+            search_query["search_after"] = state["after"]
+        else:
+            pit = await client.open_point_in_time(index=index, keep_alive=PIT_KEEP_ALIVE)
+            pit_id = pit["id"]
+        
+        # A point-in-time search names its index through the PIT, not the request
+        search_query.pop("from", None)
+        search_query["pit"] = {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}
+        search_query["sort"] = CURSOR_SORT
+        
+        response = await client.search(body=search_query)
+        
+        # The PIT id may change between requests; always hand out the latest one
+        pit_id = response.get("pit_id", pit_id)
+        hits = response["hits"]["hits"]
+        
+        if len(hits) < search_query["size"]:
+            await client.close_point_in_time(id=pit_id)
+            response["next_cursor"] = None
+        else:
+            response["next_cursor"] = encode_cursor(pit_id, hits[-1]["sort"])
+        
+        return response
+
     @staticmethod
     async def search_workouts(
         query: str,
@@ -22,7 +120,9 @@ class SearchService:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         from_: int = 0,
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        use_cursor: bool = False
     ) -> Dict[str, Any]:
         """
         Search workouts based on the provided query and filters.
@@ -35,6 +135,8 @@ class SearchService:
             date_to: End date filter (YYYY-MM-DD)
             from_: Starting document offset
             size: Number of documents to return
+            cursor: Cursor from the previous page (replaces from_)
+            use_cursor: Start cursor pagination and return a next_cursor
             
         Returns:
             Search results with total count and workout documents
@@ -80,14 +182,18 @@ class SearchService:
             }
         }
         
-        response = await client.search(index=WORKOUT_INDEX, body=search_query)
+        response = await SearchService._execute_search(
+            client, WORKOUT_INDEX, search_query, cursor=cursor, use_cursor=use_cursor
+        )
         return response
 
     @staticmethod
     async def search_users(
         query: str,
         from_: int = 0,
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        use_cursor: bool = False
     ) -> Dict[str, Any]:
         """
         Search users based on the provided query.
@@ -96,6 +202,8 @@ class SearchService:
             query: Search query
             from_: Starting document offset
             size: Number of documents to return
+            cursor: Cursor from the previous page (replaces from_)
+            use_cursor: Start cursor pagination and return a next_cursor
             
         Returns:
             Search results with total count and user documents
@@ -121,7 +229,9 @@ class SearchService:
             }
         }
         
-        response = await client.search(index=USER_INDEX, body=search_query)
+        response = await SearchService._execute_search(
+            client, USER_INDEX, search_query, cursor=cursor, use_cursor=use_cursor
+        )
         return response
 
     @staticmethod
@@ -131,7 +241,9 @@ class SearchService:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         from_: int = 0,
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        use_cursor: bool = False
     ) -> Dict[str, Any]:
         """
         Search food logs based on the provided query and filters.
@@ -143,9 +255,11 @@ class SearchService:
             date_to: End date filter (YYYY-MM-DD)
             from_: Starting document offset
             size: Number of documents to return
+            cursor: Cursor from the previous page (replaces from_)
+            use_cursor: Start cursor pagination and return a next_cursor
             
         Returns:
-            Search results with total count and food log documents
+            Search results with total count and matching food item documents
         """
         client = await get_elasticsearch_client()
         
@@ -161,61 +275,101 @@ class SearchService:
                 date_range["lte"] = date_to
             filters.append({"range": {"date": date_range}})
             
-        # Build search query with nested query for meals and foods
+        # Food logs are searched through the flattened food_items index, which
+        # avoids nested-of-nested queries and two levels of inner_hits
         search_query = {
             "from": from_,
             "size": size,
             "query": {
                 "bool": {
-                    "must": [
-                        {
-                            "bool": {
-                                "should": [
-                                    {
-                                        "multi_match": {
-                                            "query": query,
-                                            "fields": ["notes"]
-                                        }
-                                    },
-                                    {
-                                        "nested": {
-                                            "path": "meals",
-                                            "query": {
-                                                "bool": {
-                                                    "should": [
-                                                        {
-                                                            "nested": {
-                                                                "path": "meals.foods",
-                                                                "query": {
-                                                                    "match": {
-                                                                        "meals.foods.name": query
-                                                                    }
-                                                                },
-                                                                "inner_hits": {}
-                                                            }
-                                                        }
-                                                    ]
-                                                }
-                                            },
-                                            "inner_hits": {}
-                                        }
-                                    }
-                                ]
-                            }
+                    "must": {
+                        "multi_match": {
+                            "query": query,
+                            "fields": ["name^2", "meal_type", "notes", "log_notes"]
                         }
-                    ],
+                    },
                     "filter": filters
                 }
             },
             "highlight": {
                 "fields": {
+                    "name": {},
                     "notes": {},
-                    "meals.foods.name": {}
+                    "log_notes": {}
                 }
             }
         }
         
-        response = await client.search(index=FOOD_LOG_INDEX, body=search_query)
+        response = await SearchService._execute_search(
+            client, FOOD_ITEM_INDEX, search_query, cursor=cursor, use_cursor=use_cursor
+        )
+        return response
+
+    @staticmethod
+    async def summarize_food_items(
+        user_id: str,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        meal_type: Optional[str] = None,
+        query: Optional[str] = None,
+        top_foods: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Summarize what a user ate over a date range with flat aggregations.
+        
+        Args:
+            user_id: User ID
+            date_from: Start date filter (YYYY-MM-DD)
+            date_to: End date filter (YYYY-MM-DD)
+            meal_type: Filter by meal type
+            query: Optional food name query
+            top_foods: Number of most frequent foods to return
+            
+        Returns:
+            Aggregation response with top foods, meal types and nutrient totals
+        """
+        client = await get_elasticsearch_client()
+        
+        filters = [{"term": {"user_id": user_id}}]
+        if meal_type:
+            filters.append({"term": {"meal_type": meal_type}})
+        if date_from or date_to:
+            date_range = {}
+            if date_from:
+                date_range["gte"] = date_from
+            if date_to:
+                date_range["lte"] = date_to
+            filters.append({"range": {"date": date_range}})
+        
+        bool_query = {"filter": filters}
+        if query:
+            bool_query["must"] = {"match": {"name": query}}
+        
+        nutrient_sums = {
+            nutrient: {"sum": {"field": nutrient}}
+            for nutrient in FOOD_ITEM_NUTRIENTS
+        }
+        
+        search_query = {
+            "size": 0,
+            "query": {"bool": bool_query},
+            "aggs": {
+                "foods": {
+                    "terms": {"field": "name.keyword", "size": top_foods},
+                    "aggs": {
+                        "quantity": {"sum": {"field": "quantity"}},
+                        "calories": {"sum": {"field": "calories"}}
+                    }
+                },
+                "meal_types": {
+                    "terms": {"field": "meal_type", "size": 10},
+                    "aggs": {"calories": {"sum": {"field": "calories"}}}
+                },
+                **nutrient_sums
+            }
+        }
+        
+        response = await client.search(index=FOOD_ITEM_INDEX, body=search_query)
         return response
 
     @staticmethod
@@ -225,7 +379,9 @@ class SearchService:
         status: Optional[str] = None,
         goal_type: Optional[str] = None,
         from_: int = 0,
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        use_cursor: bool = False
     ) -> Dict[str, Any]:
         """
         Search goals based on the provided query and filters.
@@ -237,6 +393,8 @@ class SearchService:
             goal_type: Filter by goal type
             from_: Starting document offset
             size: Number of documents to return
+            cursor: Cursor from the previous page (replaces from_)
+            use_cursor: Start cursor pagination and return a next_cursor
             
         Returns:
             Search results with total count and goal documents
@@ -275,7 +433,9 @@ class SearchService:
             }
         }
         
-        response = await client.search(index=GOAL_INDEX, body=search_query)
+        response = await SearchService._execute_search(
+            client, GOAL_INDEX, search_query, cursor=cursor, use_cursor=use_cursor
+        )
         return response
 
     @staticmethod
@@ -283,7 +443,9 @@ class SearchService:
         query: str,
         user_id: Optional[str] = None,
         from_: int = 0,
-        size: int = 10
+        size: int = 10,
+        cursor: Optional[str] = None,
+        use_cursor: bool = False
     ) -> Dict[str, Any]:
         """
         Search social posts based on the provided query and filters.
@@ -293,6 +455,8 @@ class SearchService:
             user_id: Filter by user ID
             from_: Starting document offset
             size: Number of documents to return
+            cursor: Cursor from the previous page (replaces from_)
+            use_cursor: Start cursor pagination and return a next_cursor
             
         Returns:
             Search results with total count and social post documents
@@ -325,7 +489,9 @@ class SearchService:
             }
         }
         
-        response = await client.search(index=SOCIAL_POST_INDEX, body=search_query)
+        response = await SearchService._execute_search(
+            client, SOCIAL_POST_INDEX, search_query, cursor=cursor, use_cursor=use_cursor
+        )
         return response
 
     @staticmethod
@@ -452,36 +618,72 @@ def format_user_search_results(es_response: Dict[str, Any]) -> Tuple[int, List[D
 
 
 def format_food_log_search_results(es_response: Dict[str, Any]) -> Tuple[int, List[Dict[str, Any]]]:
-    """Format food log search results from Elasticsearch response."""
+    """
+    Format food item search hits into food logs with their matched items.
+    
+    Paging is per food item, so the total counts matched items rather than
+    food logs; a log whose items span two pages appears on both.
+    """
     total = es_response["hits"]["total"]["value"]
     results = []
+    food_logs = {}
     
     for hit in es_response["hits"]["hits"]:
-        food_log = hit["_source"]
+        item = hit["_source"]
+        food_log_id = item["food_log_id"]
+        
+        food_log = food_logs.get(food_log_id)
+        if food_log is None:
+            food_log = {
+                "id": food_log_id,
+                "user_id": item.get("user_id"),
+                "date": item.get("date"),
+                "matched_items": []
+            }
+            food_logs[food_log_id] = food_log
+            results.append(food_log)
+        
+        matched_item = {
+            "meal_index": item["meal_index"],
+            "meal_type": item.get("meal_type"),
+            "food_index": item["food_index"],
+            "food_name": item.get("name")
+        }
         
         # Add highlights if available
         if "highlight" in hit:
-            food_log["highlights"] = hit["highlight"]
-            
-        # Add inner hits for nested fields if available
-        if "inner_hits" in hit:
-            food_log["matched_items"] = []
-            
-            if "meals" in hit["inner_hits"]:
-                for meal_hit in hit["inner_hits"]["meals"]["hits"]["hits"]:
-                    meal_idx = meal_hit["_nested"]["offset"]
-                    
-                    if "meals.foods" in meal_hit["inner_hits"]:
-                        for food_hit in meal_hit["inner_hits"]["meals.foods"]["hits"]["hits"]:
-                            food_idx = food_hit["_nested"]["offset"]
-                            food_name = food_hit["_source"]["name"]
-                            
-                            food_log["matched_items"].append({
-                                "meal_index": meal_idx,
-                                "food_index": food_idx,
-                                "food_name": food_name
-                            })
-            
-        results.append(food_log)
+            matched_item["highlights"] = hit["highlight"]
+        
+        food_log["matched_items"].append(matched_item)
         
-    return total, results 
\ No newline at end of file
+    return total, results
+
+
+def format_food_item_summary(es_response: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a food item summary aggregation response."""
+    aggregations = es_response["aggregations"]
+    
+    return {
+        "total_items": es_response["hits"]["total"]["value"],
+        "totals": {
+            nutrient: aggregations[nutrient]["value"]
+            for nutrient in FOOD_ITEM_NUTRIENTS
+        },
+        "top_foods": [
+            {
+                "name": bucket["key"],
+                "times_eaten": bucket["doc_count"],
+                "quantity": bucket["quantity"]["value"],
+                "calories": bucket["calories"]["value"]
+            }
+            for bucket in aggregations["foods"]["buckets"]
+        ],
+        "meal_types": [
+            {
+                "meal_type": bucket["key"],
+                "items": bucket["doc_count"],
+                "calories": bucket["calories"]["value"]
+            }
+            for bucket in aggregations["meal_types"]["buckets"]
+        ]
+    }
@@ -7,12 +7,15 @@ from app.db.elasticsearch.indices import (
     WORKOUT_INDEX,
     USER_INDEX,
     FOOD_LOG_INDEX,
+    FOOD_ITEM_INDEX,
     MEASUREMENT_INDEX,
     GOAL_INDEX,
     SOCIAL_POST_INDEX,
+    FOOD_ITEM_NUTRIENTS,
     index_document,
     update_document,
     delete_document,
+    delete_documents_by_query,
     bulk_index_documents
 )
 
@@ -118,6 +121,67 @@ async def sync_user(user: Dict[str, Any], operation: str = "index") -> None:
             await index_document(USER_INDEX, doc_id, es_doc)
 
 
+def build_food_item_documents(food_log: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten a food log into one document per consumed food.
+    
+    Args:
+        food_log: Food log document (MongoDB or Elasticsearch shape)
+        
+    Returns:
+        Food item documents with an "_id" field for bulk indexing
+    """
+    es_log = prepare_document(food_log)
+    food_log_id = str(es_log.get("id"))
+    items = []
+    
+    for meal_index, meal in enumerate(es_log.get("meals") or []):
+        for food_index, food in enumerate(meal.get("foods") or []):
+            # Same default as the food log totals: missing counts as 1, null as 0
+            quantity = food.get("quantity", 1) or 0
+            item_id = f"{food_log_id}:{meal_index}:{food_index}"
+            item = {
+                "_id": item_id,
+                "id": item_id,
+                "food_log_id": food_log_id,
+                "user_id": es_log.get("user_id"),
+                "date": es_log.get("date"),
+                "meal_type": meal.get("meal_type"),
+                "meal_index": meal_index,
+                "food_index": food_index,
+                "name": food.get("name"),
+                "quantity": quantity,
+                "serving_size": food.get("serving_size"),
+                "serving_unit": food.get("serving_unit"),
+                "notes": meal.get("notes"),
+                "log_notes": es_log.get("notes")
+            }
+            for nutrient in FOOD_ITEM_NUTRIENTS:
+                if food.get(nutrient) is not None:
+                    item[nutrient] = food[nutrient] * quantity
+            items.append(item)
+    
+    return items
+
+
+async def sync_food_items(food_log: Dict[str, Any], operation: str = "index") -> None:
+    """
+    Sync the flattened food items of a food log to Elasticsearch.
+    
+    Items are replaced wholesale because meals can be reordered or removed.
+    
+    Args:
+        food_log: Food log document
+        operation: Operation type (index, update, delete)
+    """
+    doc_id = str(food_log.get("_id", food_log.get("id")))
+    
+    await delete_documents_by_query(FOOD_ITEM_INDEX, {"term": {"food_log_id": doc_id}})
+    
+    if operation != "delete":
+        await bulk_index_documents(FOOD_ITEM_INDEX, build_food_item_documents(food_log))
+
+
 async def sync_food_log(food_log: Dict[str, Any], operation: str = "index") -> None:
     """
     Sync a food log document to Elasticsearch.
@@ -142,6 +206,8 @@ async def sync_food_log(food_log: Dict[str, Any], operation: str = "index") -> N
             await update_document(FOOD_LOG_INDEX, doc_id, es_doc)
         else:
             await index_document(FOOD_LOG_INDEX, doc_id, es_doc)
+    
+    await sync_food_items(food_log, operation)
 
 
 async def sync_measurement(measurement: Dict[str, Any], operation: str = "index") -> None:
@@ -268,16 +334,21 @@ async def sync_all_data() -> Dict[str, int]:
     await bulk_index_documents(WORKOUT_INDEX, workouts)
     counts["workouts"] = len(workouts)
     
-    # Sync food logs
+    # Sync food logs and their flattened food items
     food_logs = []
+    food_items = []
     async for food_log in db.food_logs.find():
         es_food_log = prepare_document(food_log)
         es_food_log["_id"] = str(food_log["_id"])
         food_logs.append(es_food_log)
+        food_items.extend(build_food_item_documents(food_log))
     
     await bulk_index_documents(FOOD_LOG_INDEX, food_logs)
     counts["food_logs"] = len(food_logs)
     
+    await bulk_index_documents(FOOD_ITEM_INDEX, food_items)
+    counts["food_items"] = len(food_items)
+    
     # Sync measurements
     measurements = []
     async for measurement in db.measurements.find():
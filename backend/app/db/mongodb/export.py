@@ -0,0 +1,108 @@
+from typing import List, Optional, Dict, Any, AsyncIterator
+from datetime import datetime
+from bson import ObjectId
+
+from app.core.config import settings
+from app.db.mongodb.mongodb import get_export_database
+
+# Exportable collections: export name -> (MongoDB collection, CSV columns)
+EXPORT_COLLECTIONS = {
+    "workouts": (
+        "workouts",
+        ("_id", "date", "title", "description", "duration", "calories_burned",
+         "exercises", "is_public", "created_at", "updated_at")
+    ),
+    "food_logs": (
+        "food_logs",
+        ("_id", "date", "meals", "total_calories", "total_protein", "total_carbs", "total_fat",
+         "total_fiber", "total_sugar", "total_sodium", "water_intake", "notes",
+         "created_at", "updated_at")
+    ),
+    "measurements": (
+        "measurements",
+        ("_id", "date", "weight", "height", "body_fat", "chest", "waist", "hips",
+         "arms", "legs", "notes", "created_at", "updated_at")
+    ),
+    "goals": (
+        "goals",
+        ("_id", "title", "description", "goal_type", "target_value", "target_date",
+         "start_value", "current_value", "status", "created_at", "updated_at")
+    ),
+    "posts": (
+        "social_posts",
+        ("_id", "content", "workout_id", "media_urls", "likes_count", "comments_count",
+         "created_at", "updated_at")
+    )
+}
+
+
+async def iter_user_documents(
+    export_name: str,
+    user_id: str,
+    batch_size: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream all of a user's documents in an exportable collection.
+    
+    Reads go through the export connection pool, and the cursor fetches at
+    most batch_size documents per round-trip, so memory stays bounded however
+    long the user's history is.
+    
+    Args:
+        export_name: Export collection name (a key of EXPORT_COLLECTIONS)
+        user_id: User ID
+        batch_size: Documents per cursor batch (defaults to EXPORT_BATCH_SIZE)
+        
+    Yields:
+        Documents ordered by _id
+    """
+    db = await get_export_database()
+    collection_name, _ = EXPORT_COLLECTIONS[export_name]
+    
+    cursor = db[collection_name].find(
+        {"user_id": ObjectId(user_id)},
+        {"user_id": 0}
+    ).sort("_id", 1).batch_size(batch_size or settings.EXPORT_BATCH_SIZE)
+    
+    async for document in cursor:
+        yield document
+
+
+async def iter_updated_document_batches(
+    collection_name: str,
+    updated_after: Optional[datetime],
+    updated_until: datetime,
+    batch_size: Optional[int] = None
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Stream batches of documents updated within a time window.
+    
+    Used by incremental snapshot jobs: documents with updated_after <
+    updated_at <= updated_until are read in updated_at order through the
+    export connection pool.
+    
+    Args:
+        collection_name: MongoDB collection name
+        updated_after: Exclusive lower bound (None reads from the beginning)
+        updated_until: Inclusive upper bound
+        batch_size: Documents per batch (defaults to EXPORT_BATCH_SIZE)
+        
+    Yields:
+        Lists of documents
+    """
+    db = await get_export_database()
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    
+    updated_at = {"$lte": updated_until}
+    if updated_after:
+        updated_at["$gt"] = updated_after
+    
+    cursor = db[collection_name].find(
+        {"updated_at": updated_at}
+    ).sort([("updated_at", 1), ("_id", 1)]).batch_size(batch_size)
+    
+    while True:
+        batch = await cursor.to_list(length=batch_size)
+        if not batch:
+            break
+        yield batch
@@ -1,10 +1,42 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime, date
 from bson import ObjectId
+from pymongo import UpdateOne, ReturnDocument
 
 from app.models.food import FoodLogCreate, FoodLogUpdate, FoodLogInDB, FoodLog, MealBase
 from app.db.mongodb.mongodb import get_database
+from app.core.signals import food_log_saved
+from app.db.mongodb.user_stats import increment_user_stats
+from app.models.mongodb import compile_document_decoder
 from app.db.elasticsearch.sync import sync_food_log
+from app.db.vector.sync import sync_food_vectors
+from app.services.food import compute_nutrition_totals, compute_nutrition_totals_batch, catalog_food_ids
+from app.db.mongodb.food_catalog import resolve_catalog_foods, ensure_catalog_foods
+from app.db.mongodb.nutrition import (
+    apply_food_log_to_rollups,
+    remove_food_log_from_rollups,
+    get_daily_rollups,
+    combine_rollups
+)
+
+# Fields of the FoodLog response model, projected by trusted list reads
+FOOD_LOG_RESPONSE_PROJECTION = {
+    "user_id": 1,
+    "date": 1,
+    "meals": 1,
+    "total_calories": 1,
+    "total_protein": 1,
+    "total_carbs": 1,
+    "total_fat": 1,
+    "total_fiber": 1,
+    "total_sugar": 1,
+    "total_sodium": 1,
+    "water_intake": 1,
+    "notes": 1,
+    "created_at": 1
+}
+
+decode_food_log = compile_document_decoder(("user_id",))
 
 
 async def create_food_log(food_log: FoodLogCreate, user_id: str) -> FoodLogInDB:
@@ -20,39 +52,30 @@ async def create_food_log(food_log: FoodLogCreate, user_id: str) -> FoodLogInDB:
     """
     db = await get_database()
     
-    # Calculate totals if not provided
-    total_calories = food_log.total_calories or 0
-    total_protein = food_log.total_protein or 0
-    total_carbs = food_log.total_carbs or 0
-    total_fat = food_log.total_fat or 0
+    await resolve_catalog_foods(food_log.meals)
     
+    # Calculate totals if not provided
+    totals = {}
     if not food_log.total_calories and food_log.meals:
-        for meal in food_log.meals:
-            for food_item in meal.foods:
-                if "calories" in food_item:
-                    total_calories += food_item["calories"] * food_item.get("quantity", 1)
-                if "protein" in food_item:
-                    total_protein += food_item["protein"] * food_item.get("quantity", 1)
-                if "carbs" in food_item:
-                    total_carbs += food_item["carbs"] * food_item.get("quantity", 1)
-                if "fat" in food_item:
-                    total_fat += food_item["fat"] * food_item.get("quantity", 1)
+        totals = compute_nutrition_totals(food_log.meals)
     
     food_log_in_db = FoodLogInDB(
-        **food_log.dict(),
+        **{**food_log.dict(), **totals},
         user_id=ObjectId(user_id),
         created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
-        total_calories=total_calories,
-        total_protein=total_protein,
-        total_carbs=total_carbs,
-        total_fat=total_fat
+        updated_at=datetime.utcnow()
     )
     
     result = await db.food_logs.insert_one(food_log_in_db.dict(by_alias=True))
     food_log_in_db.id = result.inserted_id
     
-    # Index in Elasticsearch
+    # Add to the daily nutrition rollup
+    await apply_food_log_to_rollups(food_log_in_db.dict(by_alias=True))
+    await increment_user_stats(user_id, {"food_logs.count": 1})
+    await food_log_saved.send(user_id=user_id, previous=None, current=food_log_in_db.dict(by_alias=True))
+    
+    # Index in the vector index and Elasticsearch
+    await sync_food_vectors(food_log_in_db.dict(by_alias=True))
     await sync_food_log(food_log_in_db.dict(by_alias=True))
     
     return food_log_in_db
@@ -93,45 +116,31 @@ async def update_food_log(food_log_id: str, food_log_update: FoodLogUpdate) -> O
     # Filter out None values
     update_data = {k: v for k, v in food_log_update.dict().items() if v is not None}
     
+    if "meals" in update_data:
+        await resolve_catalog_foods(update_data["meals"])
+    
     # Calculate totals if meals are updated but totals are not
     if "meals" in update_data and "total_calories" not in update_data:
-        total_calories = 0
-        total_protein = 0
-        total_carbs = 0
-        total_fat = 0
-        
-        for meal in update_data["meals"]:
-            for food_item in meal.foods:
-                if "calories" in food_item:
-                    total_calories += food_item["calories"] * food_item.get("quantity", 1)
-                if "protein" in food_item:
-                    total_protein += food_item["protein"] * food_item.get("quantity", 1)
-                if "carbs" in food_item:
-                    total_carbs += food_item["carbs"] * food_item.get("quantity", 1)
-                if "fat" in food_item:
-                    total_fat += food_item["fat"] * food_item.get("quantity", 1)
-        
-        update_data["total_calories"] = total_calories
-        update_data["total_protein"] = total_protein
-        update_data["total_carbs"] = total_carbs
-        update_data["total_fat"] = total_fat
+        update_data.update(compute_nutrition_totals(update_data["meals"]))
     
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Update the food log
-    result = await db.food_logs.update_one(
+    # Update the food log and get the updated document in one round-trip
+    food_log_data = await db.food_logs.find_one_and_update(
         {"_id": ObjectId(food_log_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
-        # Get the updated food log
-        updated_food_log = await get_food_log_by_id(food_log_id)
+    if food_log_data:
+        updated_food_log = FoodLogInDB(**food_log_data)
         
-        # Update in Elasticsearch
-        if updated_food_log:
-            await sync_food_log(updated_food_log.dict(by_alias=True), operation="update")
+        # Update the daily nutrition rollup, vector index and Elasticsearch
+        await apply_food_log_to_rollups(food_log_data)
+        await food_log_saved.send(user_id=str(food_log_data["user_id"]), previous=None, current=food_log_data)
+        await sync_food_vectors(food_log_data)
+        await sync_food_log(food_log_data, operation="update")
             
         return updated_food_log
     
@@ -150,13 +159,19 @@ async def delete_food_log(food_log_id: str) -> bool:
     """
     db = await get_database()
     
-    result = await db.food_logs.delete_one({"_id": ObjectId(food_log_id)})
+    deleted_food_log = await db.food_logs.find_one_and_delete(
+        {"_id": ObjectId(food_log_id)},
+        projection={"user_id": 1, "date": 1}
+    )
     
-    # Delete from Elasticsearch
-    if result.deleted_count:
+    # Remove from the daily nutrition rollup and Elasticsearch
+    if deleted_food_log:
+        await remove_food_log_from_rollups(deleted_food_log)
+        await increment_user_stats(str(deleted_food_log["user_id"]), {"food_logs.count": -1})
+        await food_log_saved.send(user_id=str(deleted_food_log["user_id"]), previous=deleted_food_log, current=None)
         await sync_food_log({"_id": food_log_id}, operation="delete")
         
-    return result.deleted_count > 0
+    return deleted_food_log is not None
 
 
 async def get_user_food_logs(
@@ -166,8 +181,9 @@ async def get_user_food_logs(
     skip: int = 0,
     limit: int = 100,
     sort_by: str = "date",
-    sort_direction: int = -1
-) -> List[FoodLogInDB]:
+    sort_direction: int = -1,
+    trusted: bool = False
+) -> Union[List[FoodLogInDB], List[Dict[str, Any]]]:
     """
     Get a user's food logs with pagination and date range filter.
     
@@ -179,12 +195,13 @@ async def get_user_food_logs(
         limit: Maximum number of food logs to return
         sort_by: Field to sort by
         sort_direction: Sort direction (1 for ascending, -1 for descending)
+        trusted: Skip model validation and return projected dicts shaped
+            like the FoodLog response model
         
     Returns:
         List of food logs
     """
     db = await get_database()
-    food_logs = []
     
     # Build query filters
     filters = {"user_id": ObjectId(user_id)}
@@ -199,8 +216,13 @@ async def get_user_food_logs(
             date_filter["$lte"] = end_datetime
         filters["date"] = date_filter
     
-    cursor = db.food_logs.find(filters).sort(sort_by, sort_direction).skip(skip).limit(limit)
+    projection = FOOD_LOG_RESPONSE_PROJECTION if trusted else None
+    cursor = db.food_logs.find(filters, projection).sort(sort_by, sort_direction).skip(skip).limit(limit)
     
+    if trusted:
+        return [decode_food_log(food_log_data) async for food_log_data in cursor]
+    
+    food_logs = []
     async for food_log_data in cursor:
         food_logs.append(FoodLogInDB(**food_log_data))
     
@@ -220,49 +242,39 @@ async def add_meal_to_food_log(food_log_id: str, meal: MealBase) -> Optional[Foo
     """
     db = await get_database()
     
-    # Get the current food log to calculate new totals
-    current_food_log = await get_food_log_by_id(food_log_id)
-    if not current_food_log:
-        return None
-    
     # Calculate additional nutrition from the meal
-    additional_calories = 0
-    additional_protein = 0
-    additional_carbs = 0
-    additional_fat = 0
-    
-    for food_item in meal.foods:
-        if "calories" in food_item:
-            additional_calories += food_item["calories"] * food_item.get("quantity", 1)
-        if "protein" in food_item:
-            additional_protein += food_item["protein"] * food_item.get("quantity", 1)
-        if "carbs" in food_item:
-            additional_carbs += food_item["carbs"] * food_item.get("quantity", 1)
-        if "fat" in food_item:
-            additional_fat += food_item["fat"] * food_item.get("quantity", 1)
-    
-    # Update the food log
-    result = await db.food_logs.update_one(
+    await resolve_catalog_foods([meal])
+    additional_totals = compute_nutrition_totals([meal])
+    
+    # Update the food log and get the updated document in one round-trip.
+    # Totals are optional and may be stored as null, which $inc rejects, so
+    # they are added in a pipeline update that treats null as 0; the meal is
+    # wrapped in $literal so "$"-prefixed strings are not read as field paths.
+    food_log_data = await db.food_logs.find_one_and_update(
         {"_id": ObjectId(food_log_id)},
-        {
-            "$push": {"meals": meal.dict()},
-            "$inc": {
-                "total_calories": additional_calories,
-                "total_protein": additional_protein,
-                "total_carbs": additional_carbs,
-                "total_fat": additional_fat
-            },
-            "$set": {"updated_at": datetime.utcnow()}
-        }
+        [
+            {
+                "$set": {
+                    "meals": {"$concatArrays": [{"$ifNull": ["$meals", []]}, [{"$literal": meal.dict()}]]},
+                    **{
+                        field: {"$add": [{"$ifNull": [f"${field}", 0]}, value]}
+                        for field, value in additional_totals.items()
+                    },
+                    "updated_at": datetime.utcnow()
+                }
+            }
+        ],
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
-        # Get the updated food log
-        updated_food_log = await get_food_log_by_id(food_log_id)
+    if food_log_data:
+        updated_food_log = FoodLogInDB(**food_log_data)
         
-        # Update in Elasticsearch
-        if updated_food_log:
-            await sync_food_log(updated_food_log.dict(by_alias=True), operation="update")
+        # Update the daily nutrition rollup, vector index and Elasticsearch
+        await apply_food_log_to_rollups(food_log_data)
+        await food_log_saved.send(user_id=str(food_log_data["user_id"]), previous=None, current=food_log_data)
+        await sync_food_vectors(food_log_data)
+        await sync_food_log(food_log_data, operation="update")
             
         return updated_food_log
     
@@ -277,6 +289,9 @@ async def get_nutrition_summary(
     """
     Get a summary of a user's nutrition over a date range.
     
+    Reads one pre-aggregated rollup document per logged day instead of
+    scanning the raw food logs.
+    
     Args:
         user_id: User ID
         start_date: Start date
@@ -285,67 +300,85 @@ async def get_nutrition_summary(
     Returns:
         Nutrition summary
     """
+    rollups = await get_daily_rollups(user_id, start_date, end_date)
+    combined = combine_rollups(rollups)
+    
+    summary = {}
+    for field in ("calories", "protein", "carbs", "fat"):
+        summary[f"avg_{field}"] = combined[f"avg_{field}"]
+        summary[f"max_{field}"] = combined[f"max_{field}"]
+        summary[f"min_{field}"] = combined[f"min_{field}"]
+    summary["total_logs"] = combined["total_logs"]
+    summary["avg_water_intake"] = combined["avg_water_intake"]
+    
+    return summary
+
+
+async def recompute_food_log_totals(
+    user_id: Optional[str] = None,
+    food_name: Optional[str] = None,
+    food_id: Optional[str] = None,
+    batch_size: int = 500
+) -> int:
+    """
+    Recompute stored nutrition totals from the meals of many food logs.
+    
+    Used after nutrient data changes, e.g. when a catalog entry is corrected.
+    Logs are processed in batches, each computed with one nutrient matrix and
+    written with one bulk_write call.
+    
+    Args:
+        user_id: Only recompute this user's food logs
+        food_name: Only recompute food logs containing a food with this name
+        food_id: Only recompute food logs referencing this catalog food
+        batch_size: Number of food logs per batch
+        
+    Returns:
+        Number of food logs recomputed
+    """
     db = await get_database()
     
-    # Convert dates to datetime
-    start_datetime = datetime.combine(start_date, datetime.min.time())
-    end_datetime = datetime.combine(end_date, datetime.max.time())
-    
-    # Aggregate to get summary
-    pipeline = [
-        {
-            "$match": {
-                "user_id": ObjectId(user_id),
-                "date": {
-                    "$gte": start_datetime,
-                    "$lte": end_datetime
-                }
-            }
-        },
-        {
-            "$group": {
-                "_id": None,
-                "avg_calories": {"$avg": "$total_calories"},
-                "avg_protein": {"$avg": "$total_protein"},
-                "avg_carbs": {"$avg": "$total_carbs"},
-                "avg_fat": {"$avg": "$total_fat"},
-                "max_calories": {"$max": "$total_calories"},
-                "max_protein": {"$max": "$total_protein"},
-                "max_carbs": {"$max": "$total_carbs"},
-                "max_fat": {"$max": "$total_fat"},
-                "min_calories": {"$min": "$total_calories"},
-                "min_protein": {"$min": "$total_protein"},
-                "min_carbs": {"$min": "$total_carbs"},
-                "min_fat": {"$min": "$total_fat"},
-                "total_logs": {"$sum": 1},
-                "avg_water_intake": {"$avg": "$water_intake"}
-            }
-        }
-    ]
-    
-    result = await db.food_logs.aggregate(pipeline).to_list(length=1)
-    
-    if result:
-        summary = result[0]
-        # Remove _id field
-        if "_id" in summary:
-            del summary["_id"]
-        return summary
-    
-    # Return empty summary if no logs found
-    return {
-        "avg_calories": 0,
-        "avg_protein": 0,
-        "avg_carbs": 0,
-        "avg_fat": 0,
-        "max_calories": 0,
-        "max_protein": 0,
-        "max_carbs": 0,
-        "max_fat": 0,
-        "min_calories": 0,
-        "min_protein": 0,
-        "min_carbs": 0,
-        "min_fat": 0,
-        "total_logs": 0,
-        "avg_water_intake": 0
-    } 
\ No newline at end of file
+    filters = {}
+    if user_id:
+        filters["user_id"] = ObjectId(user_id)
+    if food_name:
+        filters["meals.foods.name"] = food_name
+    if food_id:
+        filters["meals.foods.food_id"] = food_id
+    
+    projection = {"user_id": 1, "date": 1, "meals": 1, "water_intake": 1}
+    cursor = db.food_logs.find(filters, projection).batch_size(batch_size)
+    
+    recomputed = 0
+    batch = []
+    
+    async def flush_batch() -> None:
+        await ensure_catalog_foods(
+            catalog_food_ids(meal for food_log in batch for meal in food_log.get("meals") or [])
+        )
+        totals = compute_nutrition_totals_batch(batch)
+        now = datetime.utcnow()
+        await db.food_logs.bulk_write(
+            [
+                UpdateOne({"_id": food_log["_id"]}, {"$set": {**log_totals, "updated_at": now}})
+                for food_log, log_totals in zip(batch, totals)
+            ],
+            ordered=False
+        )
+        
+        # Keep the daily nutrition rollups in step with the new totals
+        for food_log, log_totals in zip(batch, totals):
+            await apply_food_log_to_rollups({**food_log, **log_totals})
+    
+    async for food_log in cursor:
+        batch.append(food_log)
+        if len(batch) >= batch_size:
+            await flush_batch()
+            recomputed += len(batch)
+            batch = []
+    
+    if batch:
+        await flush_batch()
+        recomputed += len(batch)
+    
+    return recomputed
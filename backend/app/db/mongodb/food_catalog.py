@@ -0,0 +1,164 @@
+import re
+from typing import List, Optional, Dict, Any, Iterable, Union
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+from app.models.food import CatalogFood, MealBase
+from app.db.mongodb.mongodb import get_database
+from app.services.food import NUTRIENTS, food_catalog, catalog_food_ids, meal_foods
+
+# Fields read when loading catalog nutrients into memory
+CATALOG_NUTRIENT_PROJECTION = {"name": 1, **{nutrient: 1 for nutrient in NUTRIENTS}}
+
+
+def _catalog_food(food_data: Dict[str, Any]) -> CatalogFood:
+    """Convert a catalog document into the client model."""
+    return CatalogFood(**{**food_data, "id": str(food_data["_id"])})
+
+
+async def create_catalog_indexes() -> None:
+    """
+    Create the indexes used by catalog ingest and lookups.
+    """
+    db = await get_database()
+
+    await db.foods.create_index([("source", 1), ("source_id", 1)], unique=True)
+    await db.foods.create_index("name_lower")
+
+
+async def bulk_upsert_catalog_foods(foods: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insert or update a chunk of catalog foods in one bulk_write call.
+
+    Entries are matched on (source, source_id), so re-ingesting a dump updates
+    existing entries in place and keeps their IDs stable.
+
+    Args:
+        foods: Catalog food documents with source and source_id
+
+    Returns:
+        Dictionary with inserted, updated and unchanged counts
+    """
+    db = await get_database()
+
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"source": food["source"], "source_id": food["source_id"]},
+            {"$set": {**food, "name_lower": food["name"].lower(), "updated_at": now}},
+            upsert=True
+        )
+        for food in foods
+    ]
+
+    result = await db.foods.bulk_write(operations, ordered=False)
+
+    return {
+        "inserted": result.upserted_count,
+        "updated": result.modified_count,
+        "unchanged": result.matched_count - result.modified_count
+    }
+
+
+async def get_catalog_food_by_id(food_id: str) -> Optional[CatalogFood]:
+    """
+    Get a catalog food by ID.
+
+    Args:
+        food_id: Catalog food ID
+
+    Returns:
+        Catalog food or None if not found
+    """
+    db = await get_database()
+
+    try:
+        food_data = await db.foods.find_one({"_id": ObjectId(food_id)})
+    except InvalidId:
+        return None
+
+    if food_data:
+        return _catalog_food(food_data)
+
+    return None
+
+
+async def search_catalog_foods(query: str, skip: int = 0, limit: int = 20) -> List[CatalogFood]:
+    """
+    Search catalog foods by name prefix.
+
+    Args:
+        query: Name prefix
+        skip: Number of foods to skip
+        limit: Maximum number of foods to return
+
+    Returns:
+        List of catalog foods ordered by name
+    """
+    db = await get_database()
+
+    # Anchored prefix match on the lowercase name can use the name_lower index
+    filters = {"name_lower": {"$regex": f"^{re.escape(query.lower())}"}}
+    cursor = db.foods.find(filters).sort("name_lower", 1).skip(skip).limit(limit)
+
+    return [_catalog_food(food_data) async for food_data in cursor]
+
+
+async def load_food_catalog() -> int:
+    """
+    Load the nutrients of all catalog foods into the in-memory catalog.
+
+    Returns:
+        Number of foods loaded
+    """
+    db = await get_database()
+
+    cursor = db.foods.find({}, CATALOG_NUTRIENT_PROJECTION).batch_size(10000)
+    food_catalog.load([food_data async for food_data in cursor])
+
+    return len(food_catalog)
+
+
+async def ensure_catalog_foods(food_ids: Iterable[str]) -> None:
+    """
+    Load catalog foods that are not yet in the in-memory catalog.
+
+    Covers entries ingested after this process loaded the catalog.
+
+    Args:
+        food_ids: Catalog food IDs
+    """
+    missing = []
+    for food_id in food_ids:
+        if food_id not in food_catalog and ObjectId.is_valid(food_id):
+            missing.append(ObjectId(food_id))
+
+    if not missing:
+        return
+
+    db = await get_database()
+    cursor = db.foods.find({"_id": {"$in": missing}}, CATALOG_NUTRIENT_PROJECTION)
+    food_catalog.add([food_data async for food_data in cursor])
+
+
+async def resolve_catalog_foods(meals: Iterable[Union[MealBase, Dict[str, Any]]]) -> None:
+    """
+    Prepare meals referencing catalog foods for nutrient computation.
+
+    Makes sure every referenced food is loaded and fills in missing names so
+    the food log stays searchable without repeating catalog nutrients.
+
+    Args:
+        meals: Meals as models or stored documents
+    """
+    meals = list(meals)
+    await ensure_catalog_foods(catalog_food_ids(meals))
+
+    for meal in meals:
+        for food in meal_foods(meal):
+            if food.get("food_id") and not food.get("name"):
+                name = food_catalog.name(food["food_id"])
+                if name:
+                    food["name"] = name
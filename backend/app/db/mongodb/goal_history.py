@@ -0,0 +1,204 @@
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, date
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+
+from app.db.mongodb.mongodb import get_database
+
+# Progress points stored per goal_progress bucket document
+PROGRESS_BUCKET_SIZE = 200
+
+# Progress points kept embedded in the goal document
+RECENT_PROGRESS_POINTS = 10
+
+# Goals migrated per bulk_write call
+MIGRATION_BATCH_SIZE = 200
+
+
+async def create_goal_history_indexes() -> None:
+    """Create the index used to find a goal's open bucket and read its history."""
+    db = await get_database()
+
+    await db.goal_progress.create_index([("goal_id", 1), ("first_date", 1)])
+    await db.goal_progress.create_index([("goal_id", 1), ("count", 1)])
+
+
+async def append_progress_point(goal_id: str, user_id: str, value: float, at: datetime) -> None:
+    """
+    Append a progress point to the goal's open history bucket.
+
+    Buckets are filled up to PROGRESS_BUCKET_SIZE points; when no bucket of
+    the goal has room, the upsert starts a new one.
+
+    Args:
+        goal_id: Goal ID
+        user_id: Owner of the goal
+        value: Goal value
+        at: Time of the point
+    """
+    db = await get_database()
+
+    await db.goal_progress.update_one(
+        {"goal_id": ObjectId(goal_id), "count": {"$lt": PROGRESS_BUCKET_SIZE}},
+        {
+            "$push": {"points": {"date": at, "value": value}},
+            "$inc": {"count": 1},
+            "$min": {"first_date": at},
+            "$max": {"last_date": at},
+            "$setOnInsert": {"user_id": ObjectId(user_id)}
+        },
+        upsert=True
+    )
+
+
+async def get_goal_progress_history(
+    goal_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> List[Tuple[datetime, float]]:
+    """
+    Get a goal's progress points, oldest first.
+
+    Only buckets overlapping the date range are read.
+
+    Args:
+        goal_id: Goal ID
+        start_date: Optional first day (inclusive)
+        end_date: Optional last day (inclusive)
+
+    Returns:
+        List of (date, value) points
+    """
+    db = await get_database()
+
+    start = datetime.combine(start_date, datetime.min.time()) if start_date else None
+    end = datetime.combine(end_date, datetime.max.time()) if end_date else None
+
+    filters: Dict[str, Any] = {"goal_id": ObjectId(goal_id)}
+    if start:
+        filters["last_date"] = {"$gte": start}
+    if end:
+        filters["first_date"] = {"$lte": end}
+
+    cursor = db.goal_progress.find(filters, {"points": 1}).sort("first_date", 1)
+
+    points: List[Tuple[datetime, float]] = []
+    async for bucket in cursor:
+        points.extend(
+            (point["date"], point["value"])
+            for point in bucket["points"]
+            if (start is None or point["date"] >= start) and (end is None or point["date"] <= end)
+        )
+
+    points.sort(key=lambda point: point[0])
+    return points
+
+
+async def delete_goal_history(goal_id: str) -> None:
+    """
+    Delete all history buckets of a goal.
+
+    Args:
+        goal_id: Goal ID
+    """
+    db = await get_database()
+
+    await db.goal_progress.delete_many({"goal_id": ObjectId(goal_id)})
+
+
+def progress_stats(points: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Compute the aggregates kept on the goal document from its points.
+
+    Mirrors the incremental update in the goal progress pipeline.
+
+    Args:
+        points: Progress points with date and value
+
+    Returns:
+        Dictionary with count, min, max, first_date and last_date, or None
+        without points
+    """
+    if not points:
+        return None
+
+    values = [point["value"] for point in points if point.get("value") is not None]
+    return {
+        "count": len(points),
+        "min": min(values) if values else None,
+        "max": max(values) if values else None,
+        "first_date": points[0]["date"],
+        "last_date": points[-1]["date"]
+    }
+
+
+async def migrate_embedded_progress_history() -> Dict[str, int]:
+    """
+    Move embedded progress_history arrays into history buckets.
+
+    Goals without progress_stats still carry their full history. Each one has
+    its points written to buckets and its embedded history trimmed to the
+    last RECENT_PROGRESS_POINTS points, with the aggregates computed. Safe
+    to re-run: migrated goals have progress_stats and are skipped.
+
+    Returns:
+        Dictionary with the number of goals migrated and buckets written
+    """
+    db = await get_database()
+
+    await create_goal_history_indexes()
+
+    counts = {"goals": 0, "buckets": 0}
+    bucket_operations: List[InsertOne] = []
+    goal_operations: List[UpdateOne] = []
+
+    async def flush() -> None:
+        nonlocal bucket_operations, goal_operations
+        # Buckets first, so a failed run never leaves a trimmed goal without its history
+        if bucket_operations:
+            await db.goal_progress.bulk_write(bucket_operations, ordered=False)
+            bucket_operations = []
+        if goal_operations:
+            await db.goals.bulk_write(goal_operations, ordered=False)
+            goal_operations = []
+
+    cursor = db.goals.find(
+        {"progress_stats": {"$exists": False}},
+        {"user_id": 1, "progress_history": 1}
+    )
+
+    async for goal in cursor:
+        points = sorted(goal.get("progress_history") or [], key=lambda point: point["date"])
+
+        # Drop buckets left behind by an interrupted run before rewriting them
+        await db.goal_progress.delete_many({"goal_id": goal["_id"]})
+
+        for offset in range(0, len(points), PROGRESS_BUCKET_SIZE):
+            chunk = points[offset:offset + PROGRESS_BUCKET_SIZE]
+            bucket_operations.append(InsertOne({
+                "goal_id": goal["_id"],
+                "user_id": goal["user_id"],
+                "points": chunk,
+                "count": len(chunk),
+                "first_date": chunk[0]["date"],
+                "last_date": chunk[-1]["date"]
+            }))
+            counts["buckets"] += 1
+
+        goal_operations.append(UpdateOne(
+            {"_id": goal["_id"]},
+            {
+                "$set": {
+                    "progress_history": points[-RECENT_PROGRESS_POINTS:],
+                    "progress_stats": progress_stats(points) or {"count": 0}
+                }
+            }
+        ))
+        counts["goals"] += 1
+
+        if len(goal_operations) >= MIGRATION_BATCH_SIZE:
+            await flush()
+
+    await flush()
+
+    return counts
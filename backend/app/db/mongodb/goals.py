@@ -1,10 +1,184 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple, Union
+from datetime import datetime, date, timedelta
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 
 from app.models.goal import GoalCreate, GoalUpdate, GoalInDB, Goal, GoalStatus, GoalType
 from app.db.mongodb.mongodb import get_database
+from app.models.mongodb import compile_document_decoder
 from app.db.elasticsearch.sync import sync_goal
+from app.core.signals import goal_changed
+from app.db.mongodb.goal_history import (
+    RECENT_PROGRESS_POINTS,
+    append_progress_point,
+    delete_goal_history,
+    create_goal_history_indexes
+)
+from app.db.mongodb.user_stats import (
+    GOALS_VERSION,
+    goal_status_increments,
+    increment_user_stats,
+    bulk_increment_user_stats,
+    get_user_stats
+)
+
+# Fields of the Goal response model, projected by trusted list reads
+GOAL_RESPONSE_PROJECTION = {
+    "user_id": 1,
+    "title": 1,
+    "description": 1,
+    "goal_type": 1,
+    "target_value": 1,
+    "target_date": 1,
+    "start_value": 1,
+    "status": 1,
+    "custom_data": 1,
+    "created_at": 1,
+    "current_value": 1,
+    "progress_percentage": 1,
+    "days_remaining": 1
+}
+
+decode_goal = compile_document_decoder(("user_id",))
+
+# Statuses the maintenance job keeps up to date
+ACTIVE_GOAL_STATUSES = [GoalStatus.NOT_STARTED.value, GoalStatus.IN_PROGRESS.value]
+
+# Goal updates sent per bulk_write call by the maintenance job
+MAINTENANCE_BATCH_SIZE = 1000
+
+# Fields read before a progress write to derive the user stats changes
+PROGRESS_BEFORE_PROJECTION = {
+    "user_id": 1,
+    "status": 1,
+    "start_value": 1,
+    "current_value": 1,
+    "target_value": 1,
+    "target_date": 1,
+    "progress_percentage": 1
+}
+
+
+def goal_date_to_datetime(value: Union[date, datetime]) -> datetime:
+    """
+    Convert a goal date to the datetime stored in MongoDB (BSON has no date type).
+    
+    Args:
+        value: Date or datetime
+        
+    Returns:
+        Datetime at midnight of the date
+    """
+    if isinstance(value, datetime):
+        return datetime.combine(value.date(), datetime.min.time())
+    return datetime.combine(value, datetime.min.time())
+
+
+def calculate_goal_progress(
+    start_value: Optional[float],
+    current_value: Optional[float],
+    target_value: Optional[float]
+) -> float:
+    """
+    Calculate how far a numeric goal has moved from its start to its target.
+    
+    Works for both increasing and decreasing targets.
+    
+    Args:
+        start_value: Starting value
+        current_value: Current value
+        target_value: Target value
+        
+    Returns:
+        Progress percentage between 0 and 100
+    """
+    if start_value is None or current_value is None or target_value is None:
+        return 0.0
+    
+    initial_diff = target_value - start_value
+    if initial_diff == 0:
+        return 100.0 if current_value == target_value else 0.0
+    
+    progress = (current_value - start_value) / initial_diff * 100
+    return max(0.0, min(100.0, progress))
+
+
+def calculate_days_remaining(target_date: Union[date, datetime], today: date) -> int:
+    """
+    Calculate the number of days left until a goal's target date.
+    
+    Args:
+        target_date: Target date
+        today: Current date
+        
+    Returns:
+        Days remaining, 0 once the target date has passed
+    """
+    if isinstance(target_date, datetime):
+        target_date = target_date.date()
+    return max(0, (target_date - today).days)
+
+
+def derive_goal_status(
+    status: Union[GoalStatus, str],
+    progress_percentage: float,
+    target_date: Union[date, datetime],
+    today: date
+) -> GoalStatus:
+    """
+    Derive a goal's status from its progress and target date.
+    
+    Completed and failed goals are final. Expired goals go back in progress
+    if their target date is moved out.
+    
+    Args:
+        status: Current status
+        progress_percentage: Current progress
+        target_date: Target date
+        today: Current date
+        
+    Returns:
+        New status
+    """
+    status = GoalStatus(status)
+    if isinstance(target_date, datetime):
+        target_date = target_date.date()
+    
+    if status in (GoalStatus.COMPLETED, GoalStatus.FAILED):
+        return status
+    if progress_percentage >= 100:
+        return GoalStatus.COMPLETED
+    if target_date < today:
+        return GoalStatus.EXPIRED
+    if status == GoalStatus.NOT_STARTED and progress_percentage <= 0:
+        return GoalStatus.NOT_STARTED
+    return GoalStatus.IN_PROGRESS
+
+
+def goal_write_increments(
+    previous_status: Optional[str],
+    status: Optional[str],
+    previous_progress: Optional[float] = None,
+    progress: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    User stats changes for a goal write: the status and progress counters
+    plus the goals write counter, which tells every worker its cached goal
+    index is stale.
+    
+    Args:
+        previous_status: Status before the write (None on create)
+        status: Status after the write (None on delete)
+        previous_progress: Progress percentage before the write
+        progress: Progress percentage after the write
+        
+    Returns:
+        $inc document
+    """
+    return {
+        **goal_status_increments(previous_status, status, previous_progress, progress),
+        f"versions.{GOALS_VERSION}": 1
+    }
 
 
 async def create_goal(goal: GoalCreate, user_id: str) -> GoalInDB:
@@ -20,48 +194,29 @@ async def create_goal(goal: GoalCreate, user_id: str) -> GoalInDB:
     """
     db = await get_database()
     
-    # Calculate days remaining and progress percentage
-    days_remaining = None
-    progress_percentage = 0.0
-    
-    if goal.end_date:
-        days_remaining = (goal.end_date - datetime.utcnow()).days
-        if days_remaining < 0:
-            days_remaining = 0
-    
-    if goal.current_value is not None and goal.target_value is not None:
-        if goal.goal_type == GoalType.DECREASE:
-            initial_diff = goal.start_value - goal.target_value
-            current_diff = goal.start_value - goal.current_value
-            if initial_diff > 0:
-                progress_percentage = min(100.0, (current_diff / initial_diff) * 100)
-        else:  # INCREASE or MAINTAIN
-            initial_diff = goal.target_value - goal.start_value
-            current_diff = goal.current_value - goal.start_value
-            if initial_diff > 0:
-                progress_percentage = min(100.0, (current_diff / initial_diff) * 100)
-    
-    # Set status
-    status = GoalStatus.IN_PROGRESS
-    if progress_percentage >= 100:
-        status = GoalStatus.COMPLETED
-    elif goal.end_date and goal.end_date < datetime.utcnow():
-        status = GoalStatus.EXPIRED
+    today = datetime.utcnow().date()
+    progress_percentage = calculate_goal_progress(goal.start_value, goal.start_value, goal.target_value)
     
     goal_in_db = GoalInDB(
-        **goal.dict(),
+        **goal.dict(exclude={"status"}),
         user_id=ObjectId(user_id),
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
-        current_value=goal.current_value or goal.start_value,
+        current_value=goal.start_value,
         progress_percentage=progress_percentage,
-        days_remaining=days_remaining,
-        status=status
+        days_remaining=calculate_days_remaining(goal.target_date, today),
+        status=derive_goal_status(goal.status, progress_percentage, goal.target_date, today)
     )
     
-    result = await db.goals.insert_one(goal_in_db.dict(by_alias=True))
+    goal_data = goal_in_db.dict(by_alias=True)
+    goal_data["target_date"] = goal_date_to_datetime(goal.target_date)
+    
+    result = await db.goals.insert_one(goal_data)
     goal_in_db.id = result.inserted_id
     
+    await increment_user_stats(user_id, goal_write_increments(None, goal_in_db.status, progress=progress_percentage))
+    await goal_changed.send(user_id=user_id, goal_id=str(result.inserted_id))
+    
     # Index in Elasticsearch
     # await sync_goal(goal_in_db.dict(by_alias=True))
     
@@ -108,65 +263,53 @@ async def update_goal(goal_id: str, goal_update: GoalUpdate) -> Optional[GoalInD
     # Filter out None values
     update_data = {k: v for k, v in goal_update.dict().items() if v is not None}
     
-    # Recalculate days_remaining if end_date is updated
-    if "end_date" in update_data:
-        end_date = update_data["end_date"]
-        days_remaining = (end_date - datetime.utcnow()).days
-        if days_remaining < 0:
-            days_remaining = 0
-        update_data["days_remaining"] = days_remaining
+    today = datetime.utcnow().date()
+    target_date = update_data.get("target_date", current_goal.target_date)
+    
+    if "target_date" in update_data:
+        update_data["target_date"] = goal_date_to_datetime(target_date)
+        update_data["days_remaining"] = calculate_days_remaining(target_date, today)
     
     # Recalculate progress_percentage if current_value, target_value, or start_value is updated
+    progress_percentage = current_goal.progress_percentage or 0.0
     if any(field in update_data for field in ["current_value", "target_value", "start_value"]):
-        # Get values, using updated values where available and current values otherwise
-        current_value = update_data.get("current_value", current_goal.current_value)
-        target_value = update_data.get("target_value", current_goal.target_value)
-        start_value = update_data.get("start_value", current_goal.start_value)
-        goal_type = update_data.get("goal_type", current_goal.goal_type)
-        
-        progress_percentage = 0.0
-        if current_value is not None and target_value is not None:
-            if goal_type == GoalType.DECREASE:
-                initial_diff = start_value - target_value
-                current_diff = start_value - current_value
-                if initial_diff > 0:
-                    progress_percentage = min(100.0, (current_diff / initial_diff) * 100)
-            else:  # INCREASE or MAINTAIN
-                initial_diff = target_value - start_value
-                current_diff = current_value - start_value
-                if initial_diff > 0:
-                    progress_percentage = min(100.0, (current_diff / initial_diff) * 100)
-        
+        progress_percentage = calculate_goal_progress(
+            update_data.get("start_value", current_goal.start_value),
+            update_data.get("current_value", current_goal.current_value),
+            update_data.get("target_value", current_goal.target_value)
+        )
         update_data["progress_percentage"] = progress_percentage
     
-    # Update status if needed
-    if ("progress_percentage" in update_data) or ("end_date" in update_data):
-        progress = update_data.get("progress_percentage", current_goal.progress_percentage)
-        end_date = update_data.get("end_date", current_goal.end_date)
-        
-        if progress >= 100:
-            update_data["status"] = GoalStatus.COMPLETED
-        elif end_date and end_date < datetime.utcnow():
-            update_data["status"] = GoalStatus.EXPIRED
-        else:
-            update_data["status"] = GoalStatus.IN_PROGRESS
+    # Derive the status unless it is set explicitly
+    if "status" not in update_data and ("progress_percentage" in update_data or "target_date" in update_data):
+        update_data["status"] = derive_goal_status(current_goal.status, progress_percentage, target_date, today)
     
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Update the goal
-    result = await db.goals.update_one(
+    # Update the goal and get the updated document in one round-trip
+    goal_data = await db.goals.find_one_and_update(
         {"_id": ObjectId(goal_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
-        # Get the updated goal
-        updated_goal = await get_goal_by_id(goal_id)
+    if goal_data:
+        updated_goal = GoalInDB(**goal_data)
+        
+        await increment_user_stats(
+            str(goal_data["user_id"]),
+            goal_write_increments(
+                current_goal.status,
+                goal_data["status"],
+                current_goal.progress_percentage,
+                goal_data.get("progress_percentage")
+            )
+        )
+        await goal_changed.send(user_id=str(goal_data["user_id"]), goal_id=goal_id)
         
         # Update in Elasticsearch
-        # if updated_goal:
-        #     await sync_goal(updated_goal.dict(by_alias=True), operation="update")
+        # await sync_goal(goal_data, operation="update")
             
         return updated_goal
     
@@ -185,13 +328,24 @@ async def delete_goal(goal_id: str) -> bool:
     """
     db = await get_database()
     
-    result = await db.goals.delete_one({"_id": ObjectId(goal_id)})
+    deleted_goal = await db.goals.find_one_and_delete(
+        {"_id": ObjectId(goal_id)},
+        projection={"user_id": 1, "status": 1, "progress_percentage": 1}
+    )
+    
+    if deleted_goal:
+        await delete_goal_history(goal_id)
+        await increment_user_stats(
+            str(deleted_goal["user_id"]),
+            goal_write_increments(deleted_goal["status"], None, deleted_goal.get("progress_percentage"))
+        )
+        await goal_changed.send(user_id=str(deleted_goal["user_id"]), goal_id=goal_id)
     
     # Delete from Elasticsearch
-    # if result.deleted_count:
+    # if deleted_goal:
     #     await sync_goal({"_id": goal_id}, operation="delete")
         
-    return result.deleted_count > 0
+    return deleted_goal is not None
 
 
 async def get_user_goals(
@@ -201,8 +355,9 @@ async def get_user_goals(
     skip: int = 0,
     limit: int = 100,
     sort_by: str = "created_at",
-    sort_direction: int = -1
-) -> List[GoalInDB]:
+    sort_direction: int = -1,
+    trusted: bool = False
+) -> Union[List[GoalInDB], List[Dict[str, Any]]]:
     """
     Get a user's goals with pagination and filters.
     
@@ -214,12 +369,13 @@ async def get_user_goals(
         limit: Maximum number of goals to return
         sort_by: Field to sort by
         sort_direction: Sort direction (1 for ascending, -1 for descending)
+        trusted: Skip model validation and return projected dicts shaped
+            like the Goal response model
         
     Returns:
         List of goals
     """
     db = await get_database()
-    goals = []
     
     # Build query filters
     filters = {"user_id": ObjectId(user_id)}
@@ -230,75 +386,255 @@ async def get_user_goals(
     if goal_type:
         filters["goal_type"] = goal_type
     
-    cursor = db.goals.find(filters).sort(sort_by, sort_direction).skip(skip).limit(limit)
+    projection = GOAL_RESPONSE_PROJECTION if trusted else None
+    cursor = db.goals.find(filters, projection).sort(sort_by, sort_direction).skip(skip).limit(limit)
     
+    if trusted:
+        return [decode_goal(goal_data) async for goal_data in cursor]
+    
+    goals = []
     async for goal_data in cursor:
         goals.append(GoalInDB(**goal_data))
     
     return goals
 
 
-async def update_goal_progress(goal_id: str, current_value: float) -> Optional[GoalInDB]:
+async def get_active_target_goals(user_id: str, goal_types: List[GoalType]) -> List[Dict[str, Any]]:
     """
-    Update the progress of a goal based on current value.
+    Get a user's unfinished goals of the given types that have a target value.
     
     Args:
-        goal_id: Goal ID
-        current_value: Current value
+        user_id: User ID
+        goal_types: Goal types to include
         
     Returns:
-        Updated goal or None if not found
+        List of goal documents with their type, status, values, dates and custom data
     """
     db = await get_database()
     
-    # Get current goal
-    current_goal = await get_goal_by_id(goal_id)
-    if not current_goal:
-        return None
+    cursor = db.goals.find(
+        {
+            "user_id": ObjectId(user_id),
+            "goal_type": {"$in": [goal_type.value for goal_type in goal_types]},
+            "status": {"$in": [GoalStatus.NOT_STARTED.value, GoalStatus.IN_PROGRESS.value]},
+            "target_value": {"$ne": None}
+        },
+        {
+            "title": 1,
+            "goal_type": 1,
+            "status": 1,
+            "start_value": 1,
+            "current_value": 1,
+            "target_value": 1,
+            "target_date": 1,
+            "custom_data": 1,
+            "created_at": 1
+        }
+    )
     
-    # Calculate new progress percentage
-    progress_percentage = 0.0
-    if current_goal.target_value is not None:
-        if current_goal.goal_type == GoalType.DECREASE:
-            initial_diff = current_goal.start_value - current_goal.target_value
-            current_diff = current_goal.start_value - current_value
-            if initial_diff > 0:
-                progress_percentage = min(100.0, (current_diff / initial_diff) * 100)
-        else:  # INCREASE or MAINTAIN
-            initial_diff = current_goal.target_value - current_goal.start_value
-            current_diff = current_value - current_goal.start_value
-            if initial_diff > 0:
-                progress_percentage = min(100.0, (current_diff / initial_diff) * 100)
-    
-    # Determine status
-    status = current_goal.status
-    if progress_percentage >= 100:
-        status = GoalStatus.COMPLETED
-    elif current_goal.end_date and current_goal.end_date < datetime.utcnow():
-        status = GoalStatus.EXPIRED
+    return await cursor.to_list(length=None)
+
+
+def _progress_update_pipeline(value_expression: Any, at: datetime) -> List[Dict[str, Any]]:
+    """
+    Update pipeline setting a goal's current value and deriving the rest.
+    
+    Mirrors calculate_goal_progress, calculate_days_remaining and
+    derive_goal_status, so the whole progress write is one atomic update
+    that doesn't need the goal to be read first.
+    
+    Args:
+        value_expression: Aggregation expression for the new current value
+        at: Time of the progress point
+        
+    Returns:
+        Update pipeline stages
+    """
+    today = datetime.combine(at.date(), datetime.min.time())
+    missing_value = {
+        "$or": [
+            {"$eq": [{"$ifNull": [f"${field}", None]}, None]}
+            for field in ("start_value", "current_value", "target_value")
+        ]
+    }
+    
+    return [
+        {"$set": {"current_value": value_expression}},
+        {
+            "$set": {
+                "progress_percentage": {
+                    "$switch": {
+                        "branches": [
+                            {"case": missing_value, "then": 0.0},
+                            {
+                                "case": {"$eq": ["$target_value", "$start_value"]},
+                                "then": {"$cond": [{"$eq": ["$current_value", "$target_value"]}, 100.0, 0.0]}
+                            }
+                        ],
+                        "default": {
+                            "$max": [0.0, {"$min": [100.0, {
+                                "$multiply": [100, {
+                                    "$divide": [
+                                        {"$subtract": ["$current_value", "$start_value"]},
+                                        {"$subtract": ["$target_value", "$start_value"]}
+                                    ]
+                                }]
+                            }]}]
+                        }
+                    }
+                },
+                "days_remaining": {
+                    "$max": [0, {"$toInt": {"$floor": {
+                        "$divide": [{"$subtract": ["$target_date", today]}, 24 * 60 * 60 * 1000]
+                    }}}]
+                }
+            }
+        },
+        {
+            "$set": {
+                "status": {
+                    "$switch": {
+                        "branches": [
+                            {
+                                "case": {"$in": ["$status", [GoalStatus.COMPLETED.value, GoalStatus.FAILED.value]]},
+                                "then": "$status"
+                            },
+                            {"case": {"$gte": ["$progress_percentage", 100]}, "then": GoalStatus.COMPLETED.value},
+                            {"case": {"$lt": ["$target_date", today]}, "then": GoalStatus.EXPIRED.value},
+                            {
+                                "case": {
+                                    "$and": [
+                                        {"$eq": ["$status", GoalStatus.NOT_STARTED.value]},
+                                        {"$lte": ["$progress_percentage", 0]}
+                                    ]
+                                },
+                                "then": GoalStatus.NOT_STARTED.value
+                            }
+                        ],
+                        "default": GoalStatus.IN_PROGRESS.value
+                    }
+                },
+                # Full history lives in goal_progress buckets; the goal keeps
+                # the latest points and running aggregates
+                "progress_history": {
+                    "$slice": [
+                        {
+                            "$concatArrays": [
+                                {"$ifNull": ["$progress_history", []]},
+                                [{"date": at, "value": "$current_value"}]
+                            ]
+                        },
+                        -RECENT_PROGRESS_POINTS
+                    ]
+                },
+                "progress_stats": {
+                    "count": {"$add": [{"$ifNull": ["$progress_stats.count", 0]}, 1]},
+                    "min": {"$min": ["$progress_stats.min", "$current_value"]},
+                    "max": {"$max": ["$progress_stats.max", "$current_value"]},
+                    "first_date": {"$ifNull": ["$progress_stats.first_date", at]},
+                    "last_date": at
+                },
+                "updated_at": at
+            }
+        }
+    ]
+
+
+async def record_goal_progress(
+    goal_id: str,
+    value: Optional[float] = None,
+    delta: Optional[float] = None,
+    projection: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Set or increment a goal's current value and append it to its history.
+    
+    Progress, days remaining and status are derived in the same atomic
+    update, so concurrent increments from different writes can't be lost.
+    The update returns the goal as it was before the write, and the new
+    values are derived from it with the same rules as the pipeline, so the
+    user stats counters see the true status change without any helper
+    field stored on the goal. The point is then appended to the goal's
+    history buckets.
+    
+    Args:
+        goal_id: Goal ID
+        value: New current value
+        delta: Amount to add to the current value (used when value is None;
+            a goal without a current value starts from its start value)
+        projection: Fields of the goal to return (all when None)
+        
+    Returns:
+        Updated goal document (progress_history and progress_stats as
+        before the write) or None if not found
+    """
+    db = await get_database()
+    
+    if value is not None:
+        value_expression = {"$literal": value}
     else:
-        status = GoalStatus.IN_PROGRESS
+        value_expression = {
+            "$add": [{"$ifNull": ["$current_value", {"$ifNull": ["$start_value", 0]}]}, delta or 0]
+        }
+    
+    at = datetime.utcnow()
+    previous = await db.goals.find_one_and_update(
+        {"_id": ObjectId(goal_id)},
+        _progress_update_pipeline(value_expression, at),
+        projection={**projection, **PROGRESS_BEFORE_PROJECTION} if projection else None,
+        return_document=ReturnDocument.BEFORE
+    )
     
-    # Update the goal
-    update_data = {
-        "current_value": current_value,
+    if previous is None:
+        return None
+    
+    if value is None:
+        base = previous.get("current_value")
+        if base is None:
+            base = previous.get("start_value")
+        value = (base or 0) + (delta or 0)
+    
+    today = at.date()
+    progress_percentage = calculate_goal_progress(previous.get("start_value"), value, previous.get("target_value"))
+    status = derive_goal_status(previous["status"], progress_percentage, previous["target_date"], today).value
+    goal_data = {
+        **previous,
+        "current_value": value,
         "progress_percentage": progress_percentage,
+        "days_remaining": calculate_days_remaining(previous["target_date"], today),
         "status": status,
-        "updated_at": datetime.utcnow()
+        "updated_at": at
     }
     
-    result = await db.goals.update_one(
-        {"_id": ObjectId(goal_id)},
-        {"$set": update_data}
+    await append_progress_point(goal_id, str(goal_data["user_id"]), value, at)
+    await increment_user_stats(
+        str(goal_data["user_id"]),
+        goal_write_increments(previous["status"], status, previous.get("progress_percentage"), progress_percentage)
     )
     
-    if result.modified_count:
-        # Get the updated goal
-        updated_goal = await get_goal_by_id(goal_id)
+    return goal_data
+
+
+async def update_goal_progress(goal_id: str, current_value: float) -> Optional[GoalInDB]:
+    """
+    Update the progress of a goal based on current value.
+    
+    Args:
+        goal_id: Goal ID
+        current_value: Current value
+        
+    Returns:
+        Updated goal or None if not found
+    """
+    goal_data = await record_goal_progress(goal_id, value=current_value)
+    
+    if goal_data:
+        updated_goal = GoalInDB(**goal_data)
+        
+        await goal_changed.send(user_id=str(goal_data["user_id"]), goal_id=goal_id)
         
         # Update in Elasticsearch
-        # if updated_goal:
-        #     await sync_goal(updated_goal.dict(by_alias=True), operation="update")
+        # await sync_goal(goal_data, operation="update")
             
         return updated_goal
     
@@ -309,57 +645,181 @@ async def get_user_goal_summary(user_id: str) -> Dict[str, Any]:
     """
     Get a summary of a user's goals.
     
+    Reads the counters of the user's stats document.
+    
     Args:
         user_id: User ID
         
     Returns:
         Goal summary with statistics
     """
-    db = await get_database()
-    
-    # Aggregate to get summary
-    pipeline = [
-        {
-            "$match": {
-                "user_id": ObjectId(user_id)
-            }
-        },
-        {
-            "$group": {
-                "_id": "$status",
-                "count": {"$sum": 1},
-                "avg_progress": {"$avg": "$progress_percentage"}
-            }
-        }
-    ]
-    
-    result = await db.goals.aggregate(pipeline).to_list(length=None)
+    goals = (await get_user_stats(user_id))["goals"]
+    by_status = goals["by_status"]
     
-    # Format the summary
     summary = {
-        "total_goals": 0,
-        "completed_goals": 0,
-        "in_progress_goals": 0,
-        "expired_goals": 0,
+        "total_goals": goals["total"],
+        "completed_goals": by_status.get(GoalStatus.COMPLETED.value, 0),
+        "in_progress_goals": by_status.get(GoalStatus.IN_PROGRESS.value, 0),
+        "expired_goals": by_status.get(GoalStatus.EXPIRED.value, 0),
+        "goals_by_status": by_status,
         "avg_completion_rate": 0
     }
     
-    for status_group in result:
-        status_name = status_group["_id"]
-        count = status_group["count"]
-        
-        summary["total_goals"] += count
-        
-        if status_name == GoalStatus.COMPLETED:
-            summary["completed_goals"] = count
-        elif status_name == GoalStatus.IN_PROGRESS:
-            summary["in_progress_goals"] = count
-            summary["avg_progress_for_in_progress"] = status_group["avg_progress"]
-        elif status_name == GoalStatus.EXPIRED:
-            summary["expired_goals"] = count
+    # Average progress of in-progress goals, from their running progress sum
+    if summary["in_progress_goals"] > 0:
+        summary["avg_progress_for_in_progress"] = goals["progress_sum"] / summary["in_progress_goals"]
     
     # Calculate completion rate
     if summary["total_goals"] > 0:
         summary["avg_completion_rate"] = (summary["completed_goals"] / summary["total_goals"]) * 100
     
-    return summary 
\ No newline at end of file
+    return summary
+
+
+async def create_goal_indexes() -> None:
+    """Create the indexes used by goal reads and the maintenance jobs."""
+    db = await get_database()
+    
+    await db.goals.create_index([("user_id", 1), ("created_at", -1)])
+    await db.goals.create_index([("status", 1), ("target_date", 1)])
+    await create_goal_history_indexes()
+
+
+async def drop_goal_previous_status() -> int:
+    """
+    Remove the previous_status helper field that earlier progress writes
+    stored on goals.
+    
+    Returns:
+        Number of goals updated
+    """
+    db = await get_database()
+    
+    result = await db.goals.update_many(
+        {"previous_status": {"$exists": True}},
+        {"$unset": {"previous_status": ""}}
+    )
+    return result.modified_count
+
+
+async def refresh_goal_status(
+    batch_size: int = MAINTENANCE_BATCH_SIZE,
+    today: Optional[date] = None
+) -> Dict[str, int]:
+    """
+    Recompute days_remaining, progress_percentage and status of active goals.
+    
+    Active goals are streamed through the (status, target_date) index with a
+    small projection, and only goals whose stored values changed are
+    written, in unordered bulk_write calls of batch_size updates. Each update
+    is conditional on the status and current value that were read, so a
+    goal changed concurrently by its owner is left for the next run.
+    
+    Updates also stamp the run's ID in refresh_run_id. When a batch had
+    skipped updates, the goals carrying the stamp are re-read so user stats
+    and the expired count only reflect the updates that applied; the
+    concurrent writer has already accounted for the others.
+    
+    Args:
+        batch_size: Updates per bulk_write call
+        today: Date to compute against (defaults to today, UTC)
+        
+    Returns:
+        Dictionary with the number of goals processed, changed and expired
+    """
+    db = await get_database()
+    today = today or datetime.utcnow().date()
+    now = datetime.utcnow()
+    run_id = ObjectId()
+    
+    await create_goal_indexes()
+    
+    counts = {"processed": 0, "changed": 0, "expired": 0}
+    operations: List[UpdateOne] = []
+    # (goal ID, user ID, stats increments, expires) of each queued update
+    pending: List[Tuple[ObjectId, str, Dict[str, float], bool]] = []
+    
+    async def flush() -> None:
+        nonlocal operations, pending
+        if not operations:
+            return
+        
+        result = await db.goals.bulk_write(operations, ordered=False)
+        counts["changed"] += result.modified_count
+        
+        applied = pending
+        if result.matched_count < len(operations):
+            stamped = db.goals.find(
+                {"_id": {"$in": [goal_id for goal_id, _, _, _ in pending]}, "refresh_run_id": run_id},
+                {"_id": 1}
+            )
+            applied_ids = {goal["_id"] async for goal in stamped}
+            applied = [update for update in pending if update[0] in applied_ids]
+        
+        stats_increments: Dict[str, Dict[str, float]] = {}
+        for _, user_id, increments, expires in applied:
+            user_increments = stats_increments.setdefault(user_id, {})
+            for field, delta in increments.items():
+                user_increments[field] = user_increments.get(field, 0) + delta
+            if expires:
+                counts["expired"] += 1
+        await bulk_increment_user_stats(stats_increments)
+        
+        operations = []
+        pending = []
+    
+    cursor = db.goals.find(
+        {"status": {"$in": ACTIVE_GOAL_STATUSES}},
+        {
+            "user_id": 1,
+            "status": 1,
+            "target_date": 1,
+            "start_value": 1,
+            "current_value": 1,
+            "target_value": 1,
+            "progress_percentage": 1,
+            "days_remaining": 1
+        },
+        batch_size=batch_size
+    ).hint([("status", 1), ("target_date", 1)])
+    
+    async for goal in cursor:
+        counts["processed"] += 1
+        
+        progress_percentage = calculate_goal_progress(
+            goal.get("start_value"), goal.get("current_value"), goal.get("target_value")
+        )
+        days_remaining = calculate_days_remaining(goal["target_date"], today)
+        status = derive_goal_status(goal["status"], progress_percentage, goal["target_date"], today)
+        
+        changes: Dict[str, Any] = {}
+        if goal.get("progress_percentage") != progress_percentage:
+            changes["progress_percentage"] = progress_percentage
+        if goal.get("days_remaining") != days_remaining:
+            changes["days_remaining"] = days_remaining
+        if status.value != goal["status"]:
+            changes["status"] = status.value
+            changes["updated_at"] = now
+        
+        if not changes:
+            continue
+        
+        # Status changes also drop cached goal indexes; progress-only
+        # changes just move the progress counter
+        increments_for = goal_write_increments if "status" in changes else goal_status_increments
+        pending.append((
+            goal["_id"],
+            str(goal["user_id"]),
+            increments_for(goal["status"], status.value, goal.get("progress_percentage"), progress_percentage),
+            status == GoalStatus.EXPIRED and "status" in changes
+        ))
+        operations.append(UpdateOne(
+            {"_id": goal["_id"], "status": goal["status"], "current_value": goal.get("current_value")},
+            {"$set": {**changes, "refresh_run_id": run_id}}
+        ))
+        if len(operations) >= batch_size:
+            await flush()
+    
+    await flush()
+    
+    return counts
@@ -0,0 +1,274 @@
+from typing import List, Optional, Dict, Any, Iterable
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReplaceOne, ReturnDocument
+
+from app.db.mongodb.mongodb import get_database
+from app.db.mongodb.measurement_series import MEASUREMENT_METRICS, measurement_metric_values
+
+# Snapshot documents written per bulk_write call when rebuilding
+REBUILD_BATCH_SIZE = 500
+
+
+def latest_entries(measurement: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the snapshot entries of a measurement.
+
+    Args:
+        measurement: Measurement document
+
+    Returns:
+        Entries with value, date and measurement_id keyed by metric
+    """
+    return {
+        metric: {
+            "value": value,
+            "date": measurement["date"],
+            "measurement_id": str(measurement["_id"])
+        }
+        for metric, value in measurement_metric_values(measurement).items()
+    }
+
+
+async def apply_measurement_to_latest(measurement: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Record a measurement's values in the user's latest snapshot.
+
+    Each metric entry is replaced only if the measurement is at least as
+    recent as the current entry, or is the measurement the entry came from.
+    The comparison runs inside one pipeline update, so concurrent writes for
+    the same user can't overwrite a newer value.
+
+    Args:
+        measurement: Measurement document with _id, user_id, date and values
+
+    Returns:
+        Snapshot metrics as they were before the update
+    """
+    db = await get_database()
+
+    entries = latest_entries(measurement)
+    measurement_id = str(measurement["_id"])
+
+    stage = {"updated_at": datetime.utcnow()}
+    for metric, entry in entries.items():
+        current = f"$metrics.{metric}"
+        stage[f"metrics.{metric}"] = {
+            "$cond": [
+                {
+                    "$or": [
+                        {"$eq": [f"{current}.measurement_id", measurement_id]},
+                        {"$lte": [{"$ifNull": [f"{current}.date", None]}, entry["date"]]}
+                    ]
+                },
+                {"$literal": entry},
+                current
+            ]
+        }
+
+    previous = await db.latest_measurements.find_one_and_update(
+        {"_id": ObjectId(str(measurement["user_id"]))},
+        [{"$set": stage}],
+        projection={"metrics": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    return (previous or {}).get("metrics", {})
+
+
+async def recompute_latest_metrics(user_id: str, metrics: Iterable[str], stale_measurement_id: str) -> None:
+    """
+    Recompute snapshot entries from the newest sample of each metric.
+
+    Reads the last monthly bucket of each metric, so it only costs one point
+    read per metric. Metrics without any samples are removed.
+
+    The write is conditional, like apply_measurement_to_latest: an entry is
+    only replaced if it still comes from the stale measurement or is not
+    newer than the recomputed sample, so a concurrent write of a newer
+    measurement between the bucket reads and the update is kept.
+
+    Args:
+        user_id: User ID
+        metrics: Metric names to recompute
+        stale_measurement_id: Measurement the stale entries came from
+    """
+    db = await get_database()
+
+    stage: Dict[str, Any] = {"updated_at": datetime.utcnow()}
+
+    for metric in metrics:
+        key_prefix = f"{user_id}:{metric}:"
+        bucket = await db.measurement_buckets.find_one(
+            {"_id": {"$gte": key_prefix, "$lt": key_prefix + "~"}},
+            {"samples": 1},
+            sort=[("_id", -1)]
+        )
+
+        current = f"$metrics.{metric}"
+        from_stale = {"$eq": [f"{current}.measurement_id", stale_measurement_id]}
+
+        if not bucket or not bucket["samples"]:
+            stage[f"metrics.{metric}"] = {
+                "$cond": [
+                    {"$or": [from_stale, {"$eq": [{"$ifNull": [current, None]}, None]}]},
+                    "$$REMOVE",
+                    current
+                ]
+            }
+            continue
+
+        measurement_id, sample = max(bucket["samples"].items(), key=lambda item: item[1]["date"])
+        entry = {
+            "value": sample["value"],
+            "date": sample["date"],
+            "measurement_id": measurement_id
+        }
+        stage[f"metrics.{metric}"] = {
+            "$cond": [
+                {"$or": [from_stale, {"$lte": [{"$ifNull": [f"{current}.date", None]}, entry["date"]]}]},
+                {"$literal": entry},
+                current
+            ]
+        }
+
+    await db.latest_measurements.update_one({"_id": ObjectId(user_id)}, [{"$set": stage}])
+
+
+def stale_latest_metrics(
+    snapshot_metrics: Dict[str, Dict[str, Any]],
+    previous: Dict[str, Any],
+    current: Optional[Dict[str, Any]]
+) -> List[str]:
+    """
+    Find metrics whose snapshot entry came from a measurement that was
+    deleted, moved to an earlier date or stopped recording the metric.
+
+    Args:
+        snapshot_metrics: Snapshot metrics before the write
+        previous: Measurement document before the write
+        current: Measurement document after the write (None on delete)
+
+    Returns:
+        Metric names that need a recompute
+    """
+    measurement_id = str(previous["_id"])
+    current_values = measurement_metric_values(current) if current else {}
+
+    stale = []
+    for metric in measurement_metric_values(previous):
+        entry = snapshot_metrics.get(metric)
+        if not entry or entry["measurement_id"] != measurement_id:
+            continue
+        if metric not in current_values or current["date"] < entry["date"]:
+            stale.append(metric)
+
+    return stale
+
+
+async def sync_latest_measurements(
+    previous: Optional[Dict[str, Any]],
+    current: Optional[Dict[str, Any]]
+) -> None:
+    """
+    Apply a measurement write to the user's latest snapshot.
+
+    Must run after the metric buckets have been updated, since recomputes
+    read them.
+
+    Args:
+        previous: Measurement document before the write (None on create)
+        current: Measurement document after the write (None on delete)
+    """
+    measurement = current or previous
+    if measurement is None:
+        return
+
+    db = await get_database()
+    user_id = str(measurement["user_id"])
+
+    if current:
+        snapshot_metrics = await apply_measurement_to_latest(current)
+    else:
+        snapshot = await db.latest_measurements.find_one({"_id": ObjectId(user_id)}, {"metrics": 1})
+        snapshot_metrics = (snapshot or {}).get("metrics", {})
+
+    if previous:
+        stale = stale_latest_metrics(snapshot_metrics, previous, current)
+        if stale:
+            await recompute_latest_metrics(user_id, stale, str(previous["_id"]))
+
+
+async def get_latest_snapshot(user_id: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the user's latest value of each metric.
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        Entries with value, date and measurement_id keyed by metric
+    """
+    db = await get_database()
+
+    snapshot = await db.latest_measurements.find_one({"_id": ObjectId(user_id)}, {"metrics": 1})
+    return (snapshot or {}).get("metrics", {})
+
+
+async def rebuild_latest_measurements(user_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Rebuild latest snapshots from the raw measurements.
+
+    Measurements are streamed in (user, date) order, so later values replace
+    earlier ones and only one user's snapshot is held in memory at a time.
+
+    Args:
+        user_id: Only rebuild this user's snapshot (all users when None)
+
+    Returns:
+        Dictionary with the number of measurements read and snapshots written
+    """
+    db = await get_database()
+
+    filters = {"user_id": ObjectId(user_id)} if user_id else {}
+    snapshot_filters = {"_id": ObjectId(user_id)} if user_id else {}
+    projection = {"user_id": 1, "date": 1, **{field: 1 for field in MEASUREMENT_METRICS.values()}}
+
+    await db.latest_measurements.delete_many(snapshot_filters)
+
+    counts = {"measurements": 0, "snapshots": 0}
+    operations: List[ReplaceOne] = []
+    current_user_id = None
+    metrics: Dict[str, Dict[str, Any]] = {}
+
+    def flush_user() -> None:
+        if current_user_id is None:
+            return
+        operations.append(ReplaceOne(
+            {"_id": current_user_id},
+            {"_id": current_user_id, "metrics": metrics, "updated_at": datetime.utcnow()},
+            upsert=True
+        ))
+        counts["snapshots"] += 1
+
+    cursor = db.measurements.find(filters, projection).sort([("user_id", 1), ("date", 1)])
+
+    async for measurement in cursor:
+        if measurement["user_id"] != current_user_id:
+            flush_user()
+            current_user_id = measurement["user_id"]
+            metrics = {}
+
+            if len(operations) >= REBUILD_BATCH_SIZE:
+                await db.latest_measurements.bulk_write(operations, ordered=False)
+                operations = []
+
+        metrics.update(latest_entries(measurement))
+        counts["measurements"] += 1
+
+    flush_user()
+    if operations:
+        await db.latest_measurements.bulk_write(operations, ordered=False)
+
+    return counts
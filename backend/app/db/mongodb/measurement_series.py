@@ -0,0 +1,243 @@
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, date
+from bson import ObjectId
+from pymongo import UpdateOne, ReplaceOne
+
+from app.db.mongodb.mongodb import get_database
+
+# Tracked metrics and the measurement field each one is read from
+MEASUREMENT_METRICS = {
+    "weight": "weight",
+    "height": "height",
+    "body_fat": "body_fat",
+    "chest": "chest",
+    "waist": "waist",
+    "hips": "hips",
+    "arms_left": "arms.left",
+    "arms_right": "arms.right",
+    "legs_left": "legs.left",
+    "legs_right": "legs.right"
+}
+
+# Bucket documents written per bulk_write call when rebuilding
+REBUILD_BATCH_SIZE = 500
+
+
+def series_bucket_key(user_id: str, metric: str, month: date) -> str:
+    """
+    Build the _id of a monthly measurement bucket.
+
+    Keys sort by user, metric and then month, so a date range of one metric
+    is an _id range scan.
+
+    Args:
+        user_id: User ID
+        metric: Metric name
+        month: Any day of the bucket's month
+
+    Returns:
+        Bucket document ID
+    """
+    return f"{user_id}:{metric}:{month.strftime('%Y-%m')}"
+
+
+def measurement_metric_values(measurement: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Extract the metric values recorded in a measurement.
+
+    Args:
+        measurement: Measurement document
+
+    Returns:
+        Values keyed by metric name (metrics without a value are left out)
+    """
+    values = {}
+    for metric, field in MEASUREMENT_METRICS.items():
+        value = measurement
+        for part in field.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if value is not None:
+            values[metric] = float(value)
+    return values
+
+
+def _measurement_samples(measurement: Dict[str, Any]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """Samples of a measurement keyed by metric, as (bucket key, sample) pairs."""
+    user_id = str(measurement["user_id"])
+    measured_at = measurement["date"]
+
+    return {
+        metric: (
+            series_bucket_key(user_id, metric, measured_at),
+            {"date": measured_at, "value": value}
+        )
+        for metric, value in measurement_metric_values(measurement).items()
+    }
+
+
+async def sync_measurement_series(
+    previous: Optional[Dict[str, Any]],
+    current: Optional[Dict[str, Any]]
+) -> None:
+    """
+    Apply a measurement write to its monthly buckets.
+
+    Samples are stored under the measurement ID, so creates, edits (including
+    a changed date or removed metric) and deletes are single-key $set/$unset
+    updates, sent together in one bulk_write.
+
+    Args:
+        previous: Measurement document before the write (None on create)
+        current: Measurement document after the write (None on delete)
+    """
+    measurement = current or previous
+    if measurement is None:
+        return
+
+    db = await get_database()
+
+    measurement_id = str(measurement["_id"])
+    old_samples = _measurement_samples(previous) if previous else {}
+    new_samples = _measurement_samples(current) if current else {}
+    now = datetime.utcnow()
+
+    operations: List[UpdateOne] = []
+    emptied: List[str] = []
+
+    for metric, (key, _) in old_samples.items():
+        if metric not in new_samples or new_samples[metric][0] != key:
+            operations.append(UpdateOne(
+                {"_id": key},
+                {"$unset": {f"samples.{measurement_id}": ""}, "$set": {"updated_at": now}}
+            ))
+            emptied.append(key)
+
+    for metric, (key, sample) in new_samples.items():
+        month = sample["date"].replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        operations.append(UpdateOne(
+            {"_id": key},
+            {
+                "$set": {f"samples.{measurement_id}": sample, "updated_at": now},
+                "$setOnInsert": {
+                    "user_id": ObjectId(str(measurement["user_id"])),
+                    "metric": metric,
+                    "month": month
+                }
+            },
+            upsert=True
+        ))
+
+    if operations:
+        await db.measurement_buckets.bulk_write(operations, ordered=False)
+
+    # Drop buckets that no longer have any samples
+    if emptied:
+        await db.measurement_buckets.delete_many({"_id": {"$in": emptied}, "samples": {}})
+
+
+async def get_metric_series(
+    user_id: str,
+    metric: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> List[Tuple[datetime, float]]:
+    """
+    Get the samples of one metric for a user, oldest first.
+
+    Args:
+        user_id: User ID
+        metric: Metric name
+        start_date: Optional first day (inclusive)
+        end_date: Optional last day (inclusive)
+
+    Returns:
+        List of (date, value) points
+    """
+    db = await get_database()
+
+    # Bucket keys sort by month within a user's metric, so bound the _id range
+    key_prefix = f"{user_id}:{metric}:"
+    key_range = {
+        "$gte": series_bucket_key(user_id, metric, start_date) if start_date else key_prefix,
+        "$lte": series_bucket_key(user_id, metric, end_date) if end_date else key_prefix + "~"
+    }
+
+    cursor = db.measurement_buckets.find({"_id": key_range}, {"samples": 1}).sort("_id", 1)
+
+    start = datetime.combine(start_date, datetime.min.time()) if start_date else None
+    end = datetime.combine(end_date, datetime.max.time()) if end_date else None
+
+    points: List[Tuple[datetime, float]] = []
+    async for bucket in cursor:
+        samples = sorted(bucket["samples"].values(), key=lambda sample: sample["date"])
+        points.extend(
+            (sample["date"], sample["value"])
+            for sample in samples
+            if (start is None or sample["date"] >= start) and (end is None or sample["date"] <= end)
+        )
+
+    return points
+
+
+async def rebuild_measurement_series(user_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Rebuild monthly measurement buckets from the raw measurements.
+
+    Measurements are streamed in user order, so only one user's buckets are
+    held in memory at a time, and buckets are written with chunked
+    bulk_write calls.
+
+    Args:
+        user_id: Only rebuild this user's buckets (all users when None)
+
+    Returns:
+        Dictionary with the number of measurements read and buckets written
+    """
+    db = await get_database()
+
+    filters = {"user_id": ObjectId(user_id)} if user_id else {}
+    projection = {"user_id": 1, "date": 1, **{field: 1 for field in MEASUREMENT_METRICS.values()}}
+
+    await db.measurement_buckets.delete_many(filters)
+
+    counts = {"measurements": 0, "buckets": 0}
+    operations: List[ReplaceOne] = []
+    current_user_id = None
+    buckets: Dict[str, Dict[str, Any]] = {}
+
+    async def flush_user() -> None:
+        nonlocal operations
+        for key, bucket in buckets.items():
+            operations.append(ReplaceOne({"_id": key}, {"_id": key, **bucket}, upsert=True))
+            counts["buckets"] += 1
+
+            if len(operations) >= REBUILD_BATCH_SIZE:
+                await db.measurement_buckets.bulk_write(operations, ordered=False)
+                operations = []
+
+    cursor = db.measurements.find(filters, projection).sort([("user_id", 1), ("date", 1)])
+
+    async for measurement in cursor:
+        if measurement["user_id"] != current_user_id:
+            await flush_user()
+            current_user_id = measurement["user_id"]
+            buckets = {}
+
+        measurement_id = str(measurement["_id"])
+        for metric, (key, sample) in _measurement_samples(measurement).items():
+            bucket = buckets.setdefault(key, {
+                "user_id": current_user_id,
+                "metric": metric,
+                "month": sample["date"].replace(day=1, hour=0, minute=0, second=0, microsecond=0),
+                "samples": {},
+                "updated_at": datetime.utcnow()
+            })
+            bucket["samples"][measurement_id] = sample
+
+        counts["measurements"] += 1
+
+    await flush_user()
+    if operations:
+        await db.measurement_buckets.bulk_write(operations, ordered=False)
+
+    return counts
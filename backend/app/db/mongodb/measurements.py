@@ -1,10 +1,16 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.models.measurement import MeasurementCreate, MeasurementUpdate, MeasurementInDB, Measurement
 from app.db.mongodb.mongodb import get_database
+from app.db.mongodb.measurement_series import MEASUREMENT_METRICS, sync_measurement_series, get_metric_series
+from app.db.mongodb.latest_measurements import sync_latest_measurements, get_latest_snapshot
 from app.db.elasticsearch.sync import sync_measurement
+from app.core.signals import measurement_saved
+from app.services.measurement import invalidate_measurement_trends
+from app.services.timeseries import DEFAULT_CHART_POINTS, downsample_series
 
 
 async def create_measurement(measurement: MeasurementCreate, user_id: str) -> MeasurementInDB:
@@ -31,8 +37,15 @@ async def create_measurement(measurement: MeasurementCreate, user_id: str) -> Me
     result = await db.measurements.insert_one(measurement_in_db.dict(by_alias=True))
     measurement_in_db.id = result.inserted_id
     
+    # Add the samples to the metric time series and latest snapshot
+    measurement_data = measurement_in_db.dict(by_alias=True)
+    await sync_measurement_series(None, measurement_data)
+    await sync_latest_measurements(None, measurement_data)
+    await invalidate_measurement_trends(user_id)
+    await measurement_saved.send(user_id=user_id, previous=None, current=measurement_data)
+    
     # Index in Elasticsearch
-    await sync_measurement(measurement_in_db.dict(by_alias=True))
+    await sync_measurement(measurement_data)
     
     return measurement_in_db
 
@@ -75,19 +88,28 @@ async def update_measurement(measurement_id: str, measurement_update: Measuremen
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Update the measurement
-    result = await db.measurements.update_one(
+    # Update the measurement and get the previous document in one round-trip;
+    # the series sync needs both versions and $set makes the new one exact
+    previous_data = await db.measurements.find_one_and_update(
         {"_id": ObjectId(measurement_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count:
-        # Get the updated measurement
-        updated_measurement = await get_measurement_by_id(measurement_id)
+    if previous_data:
+        measurement_data = {**previous_data, **update_data}
+        updated_measurement = MeasurementInDB(**measurement_data)
+        
+        # Move the samples in the metric time series and latest snapshot
+        await sync_measurement_series(previous_data, measurement_data)
+        await sync_latest_measurements(previous_data, measurement_data)
+        await invalidate_measurement_trends(str(previous_data["user_id"]))
+        await measurement_saved.send(
+            user_id=str(previous_data["user_id"]), previous=previous_data, current=measurement_data
+        )
         
         # Update in Elasticsearch
-        if updated_measurement:
-            await sync_measurement(updated_measurement.dict(by_alias=True), operation="update")
+        await sync_measurement(measurement_data, operation="update")
             
         return updated_measurement
     
@@ -106,13 +128,23 @@ async def delete_measurement(measurement_id: str) -> bool:
     """
     db = await get_database()
     
-    result = await db.measurements.delete_one({"_id": ObjectId(measurement_id)})
+    # Delete and get the fields the series sync needs in one round-trip
+    deleted = await db.measurements.find_one_and_delete(
+        {"_id": ObjectId(measurement_id)},
+        projection={"user_id": 1, "date": 1, **{field: 1 for field in MEASUREMENT_METRICS.values()}}
+    )
     
-    # Delete from Elasticsearch
-    if result.deleted_count:
+    if deleted:
+        # Remove the samples from the metric time series and latest snapshot
+        await sync_measurement_series(deleted, None)
+        await sync_latest_measurements(deleted, None)
+        await invalidate_measurement_trends(str(deleted["user_id"]))
+        await measurement_saved.send(user_id=str(deleted["user_id"]), previous=deleted, current=None)
+        
+        # Delete from Elasticsearch
         await sync_measurement({"_id": measurement_id}, operation="delete")
         
-    return result.deleted_count > 0
+    return deleted is not None
 
 
 async def get_user_measurements(
@@ -132,7 +164,7 @@ async def get_user_measurements(
         user_id: User ID
         start_date: Optional start date for filtering
         end_date: Optional end date for filtering
-        measurement_type: Optional measurement type for filtering
+        measurement_type: Optional metric name; only measurements recording it are returned
         skip: Number of measurements to skip
         limit: Maximum number of measurements to return
         sort_by: Field to sort by
@@ -157,8 +189,8 @@ async def get_user_measurements(
             date_filter["$lte"] = end_datetime
         filters["date"] = date_filter
     
-    if measurement_type:
-        filters["measurement_type"] = measurement_type
+    if measurement_type in MEASUREMENT_METRICS:
+        filters[MEASUREMENT_METRICS[measurement_type]] = {"$ne": None}
     
     cursor = db.measurements.find(filters).sort(sort_by, sort_direction).skip(skip).limit(limit)
     
@@ -173,96 +205,41 @@ async def get_measurement_history(
     measurement_type: str,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    limit: int = 50
+    resolution: str = "auto",
+    points: int = DEFAULT_CHART_POINTS
 ) -> List[Dict[str, Any]]:
     """
-    Get a history of a specific measurement type for a user.
+    Get a history of a specific metric for a user, downsampled for charts.
+    
+    Reads the monthly metric buckets rather than the raw measurements.
     
     Args:
         user_id: User ID
-        measurement_type: Measurement type
+        measurement_type: Metric name (see MEASUREMENT_METRICS)
         start_date: Optional start date for filtering
         end_date: Optional end date for filtering
-        limit: Maximum number of measurements to return
+        resolution: "auto", "raw", "daily", "weekly" or "lttb"
+        points: Maximum number of points for "auto" and "lttb"
         
     Returns:
-        List of measurement history records
+        List of {"date", "value"} points, oldest first
     """
-    db = await get_database()
-    
-    # Build query filters
-    filters = {
-        "user_id": ObjectId(user_id),
-        "measurement_type": measurement_type
-    }
-    
-    if start_date or end_date:
-        date_filter = {}
-        if start_date:
-            start_datetime = datetime.combine(start_date, datetime.min.time())
-            date_filter["$gte"] = start_datetime
-        if end_date:
-            end_datetime = datetime.combine(end_date, datetime.max.time())
-            date_filter["$lte"] = end_datetime
-        filters["date"] = date_filter
-    
-    # Project only fields necessary for history
-    projection = {
-        "_id": 1,
-        "date": 1,
-        "value": 1,
-        "measurement_type": 1,
-        "unit": 1
-    }
-    
-    cursor = db.measurements.find(
-        filters, 
-        projection
-    ).sort("date", 1).limit(limit)
-    
-    history = []
-    async for measurement_data in cursor:
-        # Convert ObjectId to string
-        measurement_data["_id"] = str(measurement_data["_id"])
-        history.append(measurement_data)
+    series = await get_metric_series(user_id, measurement_type, start_date, end_date)
     
-    return history
+    return downsample_series(series, resolution, points)
 
 
 async def get_latest_measurements(user_id: str) -> Dict[str, Dict[str, Any]]:
     """
-    Get the latest measurement of each type for a user.
+    Get the latest value of each metric for a user.
+    
+    A single read of the snapshot document maintained on every measurement
+    write.
     
     Args:
         user_id: User ID
         
     Returns:
-        Dictionary of measurement types with their latest values
+        Dictionary of metrics with their latest value, date and measurement_id
     """
-    db = await get_database()
-    
-    pipeline = [
-        {"$match": {"user_id": ObjectId(user_id)}},
-        {"$sort": {"date": -1}},
-        {
-            "$group": {
-                "_id": "$measurement_type",
-                "latest": {"$first": "$$ROOT"}
-            }
-        }
-    ]
-    
-    result = await db.measurements.aggregate(pipeline).to_list(length=None)
-    
-    latest_measurements = {}
-    for item in result:
-        measurement_type = item["_id"]
-        measurement = item["latest"]
-        
-        # Convert ObjectId to string
-        measurement["_id"] = str(measurement["_id"])
-        measurement["user_id"] = str(measurement["user_id"])
-        
-        latest_measurements[measurement_type] = measurement
-    
-    return latest_measurements 
\ No newline at end of file
+    return await get_latest_snapshot(user_id)
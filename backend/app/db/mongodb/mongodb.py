@@ -13,6 +13,24 @@ async def connect_to_mongo() -> AsyncIOMotorClient:
     return mongo_client
 
 
+async def connect_to_export_mongo() -> AsyncIOMotorClient:
+    """
+    Create the low-priority MongoDB connection pool used by data exports.
+    
+    The pool is kept small and prefers secondaries, so long-running export
+    cursors don't compete with API requests for connections on the primary.
+    
+    Returns:
+        AsyncIOMotorClient: MongoDB client instance
+    """
+    return AsyncIOMotorClient(
+        settings.MONGODB_URI,
+        maxPoolSize=settings.EXPORT_MONGODB_POOL_SIZE,
+        readPreference=settings.EXPORT_READ_PREFERENCE,
+        appname="dumbbell-diaries-export"
+    )
+
+
 async def close_mongo_connection(client: Optional[AsyncIOMotorClient]) -> None:
     """
     Close MongoDB connection.
@@ -32,4 +50,15 @@ async def get_database():
         MongoDB database instance
     """
     from app.main import app
-    return app.state.mongodb 
\ No newline at end of file
+    return app.state.mongodb
+
+
+async def get_export_database():
+    """
+    Get the MongoDB database instance of the export connection pool.
+    
+    Returns:
+        MongoDB database instance
+    """
+    from app.main import app
+    return app.state.export_mongodb
@@ -1,6 +1,8 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Union
+from datetime import datetime, timedelta
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from app.models.notification import (
     NotificationCreate, 
@@ -10,6 +12,64 @@ from app.models.notification import (
     NotificationSettingsInDB
 )
 from app.db.mongodb.mongodb import get_database
+from app.models.mongodb import compile_document_decoder
+from app.core.cache import TTLCache
+from app.db.mongodb.user_stats import increment_user_stats, bulk_increment_user_stats
+from app.core.signals import notifications_created
+
+decode_notification = compile_document_decoder(("user_id",))
+
+# Notifications written per insert_many call by bulk sends
+NOTIFICATION_INSERT_BATCH_SIZE = 1000
+
+# Condition of notifications waiting for push delivery and not claimed by a
+# worker (or whose claim has expired)
+PUSH_READY = {"push_pending": True}
+
+# Activity on the same target within one window collapses into one notification
+AGGREGATION_WINDOW = timedelta(hours=6)
+
+# Most recent actors kept on an aggregated notification
+AGGREGATED_ACTORS = 5
+
+# Notification settings of a new user (all enabled)
+DEFAULT_NOTIFICATION_SETTINGS = {
+    "workout_reminders": True,
+    "goal_updates": True,
+    "social_interactions": True,
+    "achievement_notifications": True,
+    "system_notifications": True,
+    "email_notifications": True,
+    "push_notifications": True
+}
+
+# Setting that enables each notification type
+NOTIFICATION_TYPE_SETTINGS = {
+    NotificationType.WORKOUT_REMINDER: "workout_reminders",
+    NotificationType.GOAL_UPDATE: "goal_updates",
+    NotificationType.SOCIAL: "social_interactions",
+    NotificationType.ACHIEVEMENT: "achievement_notifications",
+    NotificationType.SYSTEM: "system_notifications"
+}
+
+# Preference flags per user ID. Entries are dropped when the user updates
+# their settings; the TTL only bounds how stale another worker's copy can get.
+notification_settings_cache = TTLCache(maxsize=50000, ttl=300)
+
+
+def notification_enabled(settings: Dict[str, Any], notification_type: NotificationType) -> bool:
+    """
+    Check whether a user's settings allow a notification type.
+    
+    Args:
+        settings: Preference flags keyed by setting name
+        notification_type: Type of notification
+        
+    Returns:
+        True if the type is enabled (types without a setting always are)
+    """
+    setting = NOTIFICATION_TYPE_SETTINGS.get(NotificationType(notification_type))
+    return setting is None or settings.get(setting, DEFAULT_NOTIFICATION_SETTINGS[setting])
 
 
 async def create_notification(notification: NotificationCreate, user_id: str) -> NotificationInDB:
@@ -25,17 +85,19 @@ async def create_notification(notification: NotificationCreate, user_id: str) ->
     """
     db = await get_database()
     
-    notification_in_db = NotificationInDB(
+    notification_data = {
         **notification.dict(),
-        user_id=ObjectId(user_id),
-        created_at=datetime.utcnow(),
-        is_read=False
-    )
+        "user_id": ObjectId(user_id),
+        "created_at": datetime.utcnow(),
+        "is_read": False,
+        "push_pending": True
+    }
     
-    result = await db.notifications.insert_one(notification_in_db.dict(by_alias=True))
-    notification_in_db.id = result.inserted_id
+    await db.notifications.insert_one(notification_data)
+    await increment_user_stats(user_id, {"notifications.unread": 1})
+    await notifications_created.send(notifications=[notification_data])
     
-    return notification_in_db
+    return NotificationInDB(**notification_data)
 
 
 async def get_notification_by_id(notification_id: str) -> Optional[NotificationInDB]:
@@ -57,44 +119,65 @@ async def get_notification_by_id(notification_id: str) -> Optional[NotificationI
     return None
 
 
-async def mark_notification_read(notification_id: str) -> Optional[NotificationInDB]:
+def _notification_filter(notification_id: str, user_id: Optional[str]) -> Dict[str, Any]:
+    filters: Dict[str, Any] = {"_id": ObjectId(notification_id)}
+    if user_id is not None:
+        filters["user_id"] = ObjectId(user_id)
+    return filters
+
+
+async def mark_notification_read(notification_id: str, user_id: Optional[str] = None) -> Optional[NotificationInDB]:
     """
     Mark a notification as read.
     
     Args:
         notification_id: Notification ID
+        user_id: Only match the notification if it belongs to this user
         
     Returns:
         Updated notification or None if not found
     """
     db = await get_database()
     
-    result = await db.notifications.update_one(
-        {"_id": ObjectId(notification_id)},
-        {"$set": {"is_read": True}}
+    # Already-read notifications match too, so the call is idempotent; the
+    # previous state tells whether the unread counter changes
+    previous = await db.notifications.find_one_and_update(
+        _notification_filter(notification_id, user_id),
+        {"$set": {"is_read": True}},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count:
-        return await get_notification_by_id(notification_id)
+    if not previous:
+        return None
     
-    return None
+    if not previous.get("is_read"):
+        await increment_user_stats(str(previous["user_id"]), {"notifications.unread": -1})
+    
+    return NotificationInDB(**{**previous, "is_read": True})
 
 
-async def delete_notification(notification_id: str) -> bool:
+async def delete_notification(notification_id: str, user_id: Optional[str] = None) -> bool:
     """
     Delete a notification.
     
     Args:
         notification_id: Notification ID
+        user_id: Only delete the notification if it belongs to this user
         
     Returns:
         True if notification was deleted, False otherwise
     """
     db = await get_database()
     
-    result = await db.notifications.delete_one({"_id": ObjectId(notification_id)})
+    deleted = await db.notifications.find_one_and_delete(
+        _notification_filter(notification_id, user_id),
+        projection={"user_id": 1, "is_read": 1}
+    )
     
-    return result.deleted_count > 0
+    if deleted and not deleted.get("is_read"):
+        await increment_user_stats(str(deleted["user_id"]), {"notifications.unread": -1})
+    
+    return deleted is not None
 
 
 async def get_user_notifications(
@@ -104,8 +187,9 @@ async def get_user_notifications(
     skip: int = 0,
     limit: int = 50,
     sort_by: str = "created_at",
-    sort_direction: int = -1
-) -> List[NotificationInDB]:
+    sort_direction: int = -1,
+    trusted: bool = False
+) -> Union[List[NotificationInDB], List[Dict[str, Any]]]:
     """
     Get a user's notifications with pagination and filters.
     
@@ -117,12 +201,12 @@ async def get_user_notifications(
         limit: Maximum number of notifications to return
         sort_by: Field to sort by
         sort_direction: Sort direction (1 for ascending, -1 for descending)
+        trusted: Skip model validation and return dicts with string IDs
         
     Returns:
         List of notifications
     """
     db = await get_database()
-    notifications = []
     
     # Build query filters
     filters = {"user_id": ObjectId(user_id)}
@@ -135,6 +219,10 @@ async def get_user_notifications(
     
     cursor = db.notifications.find(filters).sort(sort_by, sort_direction).skip(skip).limit(limit)
     
+    if trusted:
+        return [decode_notification(notification_data) async for notification_data in cursor]
+    
+    notifications = []
     async for notification_data in cursor:
         notifications.append(NotificationInDB(**notification_data))
     
@@ -158,6 +246,11 @@ async def mark_all_notifications_read(user_id: str) -> int:
         {"$set": {"is_read": True}}
     )
     
+    # Decrement by what was marked rather than setting zero, so notifications
+    # created during the update stay counted
+    if result.modified_count:
+        await increment_user_stats(user_id, {"notifications.unread": -result.modified_count})
+    
     return result.modified_count
 
 
@@ -176,13 +269,7 @@ async def create_user_notification_settings(user_id: str) -> NotificationSetting
     # Default settings (all enabled)
     settings = NotificationSettingsInDB(
         user_id=ObjectId(user_id),
-        workout_reminders=True,
-        goal_updates=True,
-        social_interactions=True,
-        achievement_notifications=True,
-        system_notifications=True,
-        email_notifications=True,
-        push_notifications=True,
+        **DEFAULT_NOTIFICATION_SETTINGS,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
@@ -239,17 +326,66 @@ async def update_user_notification_settings(
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Create settings if they don't exist
-    await create_user_notification_settings(user_id)
-    
-    # Update the settings
-    await db.notification_settings.update_one(
+    # Create the settings with defaults if they don't exist, update them and
+    # get the result in one round-trip
+    defaults = {k: v for k, v in DEFAULT_NOTIFICATION_SETTINGS.items() if k not in update_data}
+    settings_data = await db.notification_settings.find_one_and_update(
         {"user_id": ObjectId(user_id)},
-        {"$set": update_data}
+        {
+            "$set": update_data,
+            "$setOnInsert": {**defaults, "created_at": update_data["updated_at"]}
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
     )
     
-    # Get updated settings
-    return await get_user_notification_settings(user_id)
+    notification_settings_cache.delete(user_id)
+    
+    return NotificationSettingsInDB(**settings_data)
+
+
+async def get_notification_settings_bulk(user_ids: List[str]) -> Dict[str, Dict[str, bool]]:
+    """
+    Get the preference flags of many users.
+    
+    Cached users are served from the settings cache and the rest are read
+    with one $in query. Users without stored settings get the defaults,
+    which are not written here.
+    
+    Args:
+        user_ids: User IDs
+        
+    Returns:
+        Preference flags keyed by user ID
+    """
+    settings: Dict[str, Dict[str, bool]] = {}
+    missing: List[ObjectId] = []
+    
+    for user_id in user_ids:
+        cached = notification_settings_cache.get(user_id)
+        if cached is None:
+            missing.append(ObjectId(user_id))
+        else:
+            settings[user_id] = cached
+    
+    if missing:
+        db = await get_database()
+        
+        cursor = db.notification_settings.find(
+            {"user_id": {"$in": missing}},
+            {"_id": 0, "user_id": 1, **{field: 1 for field in DEFAULT_NOTIFICATION_SETTINGS}}
+        )
+        
+        stored = {}
+        async for settings_data in cursor:
+            stored[str(settings_data.pop("user_id"))] = settings_data
+        
+        for user_id in map(str, missing):
+            user_settings = {**DEFAULT_NOTIFICATION_SETTINGS, **stored.get(user_id, {})}
+            notification_settings_cache.set(user_id, user_settings)
+            settings[user_id] = user_settings
+    
+    return settings
 
 
 async def register_device_token(user_id: str, device_token: str, device_type: str) -> bool:
@@ -329,6 +465,141 @@ async def get_user_device_tokens(user_id: str) -> List[Dict[str, Any]]:
     return device_tokens
 
 
+async def get_device_tokens_for_users(user_ids: List[str]) -> Dict[str, List[str]]:
+    """
+    Get the device tokens of many users with one query.
+    
+    Args:
+        user_ids: User IDs
+        
+    Returns:
+        Device tokens keyed by user ID (users without devices are omitted)
+    """
+    db = await get_database()
+    
+    cursor = db.device_tokens.find(
+        {"user_id": {"$in": [ObjectId(user_id) for user_id in user_ids]}},
+        {"_id": 0, "user_id": 1, "device_token": 1}
+    )
+    
+    tokens: Dict[str, List[str]] = {}
+    async for token_data in cursor:
+        tokens.setdefault(str(token_data["user_id"]), []).append(token_data["device_token"])
+    
+    return tokens
+
+
+async def delete_device_tokens(device_tokens: List[str]) -> int:
+    """
+    Delete device tokens the push service reported as invalid.
+    
+    Args:
+        device_tokens: Device tokens
+        
+    Returns:
+        Number of token registrations deleted
+    """
+    if not device_tokens:
+        return 0
+    
+    db = await get_database()
+    
+    result = await db.device_tokens.delete_many({"device_token": {"$in": list(device_tokens)}})
+    
+    return result.deleted_count
+
+
+async def create_notification_indexes() -> None:
+    """Create the indexes used by notification lists, the push queue and device lookups."""
+    db = await get_database()
+    
+    await db.notifications.create_index([("user_id", 1), ("created_at", -1)])
+    await db.notifications.create_index(
+        [("push_available_at", 1), ("created_at", 1)],
+        partialFilterExpression=PUSH_READY
+    )
+    await db.notifications.create_index(
+        [("user_id", 1), ("group_key", 1), ("window_start", 1)],
+        unique=True,
+        partialFilterExpression={"group_key": {"$exists": True}}
+    )
+    await db.device_tokens.create_index([("user_id", 1), ("device_token", 1)])
+    await db.device_tokens.create_index("device_token")
+
+
+async def claim_pending_pushes(limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+    """
+    Claim the oldest notifications waiting for push delivery.
+    
+    Claimed notifications are leased to the caller: other workers skip them
+    until the lease expires, so a worker that dies mid-batch only delays
+    its notifications.
+    
+    Args:
+        limit: Maximum number of notifications to claim
+        lease_seconds: How long the claim holds
+        
+    Returns:
+        Claimed notifications with user_id, title, message, type and metadata
+    """
+    db = await get_database()
+    
+    now = datetime.utcnow()
+    ready = {**PUSH_READY, "$or": [{"push_available_at": None}, {"push_available_at": {"$lte": now}}]}
+    
+    cursor = db.notifications.find(ready, {"_id": 1}).sort("created_at", 1).limit(limit)
+    ids = [notification["_id"] async for notification in cursor]
+    if not ids:
+        return []
+    
+    # Re-check readiness in the update so a concurrent claim wins only once
+    claim = ObjectId()
+    await db.notifications.update_many(
+        {"_id": {"$in": ids}, **ready},
+        {"$set": {"push_claim": claim, "push_available_at": now + timedelta(seconds=lease_seconds)}}
+    )
+    
+    cursor = db.notifications.find(
+        {"push_claim": claim},
+        {"user_id": 1, "title": 1, "message": 1, "type": 1, "metadata": 1}
+    )
+    return await cursor.to_list(length=None)
+
+
+async def finish_pushes(delivered_ids: List[ObjectId], failed_ids: List[ObjectId]) -> None:
+    """
+    Take processed notifications off the push queue.
+    
+    Args:
+        delivered_ids: Notifications handled (pushed, or nothing to push to)
+        failed_ids: Notifications whose push failed on every device
+    """
+    db = await get_database()
+    
+    now = datetime.utcnow()
+    for ids, outcome in ((delivered_ids, {}), (failed_ids, {"push_failed": True})):
+        if ids:
+            await db.notifications.update_many(
+                {"_id": {"$in": ids}},
+                {
+                    "$set": {"push_pending": False, "push_completed_at": now, **outcome},
+                    "$unset": {"push_claim": "", "push_available_at": ""}
+                }
+            )
+
+
+async def count_pending_pushes() -> int:
+    """
+    Count notifications waiting for push delivery.
+    
+    Returns:
+        Push queue depth
+    """
+    db = await get_database()
+    
+    return await db.notifications.count_documents(PUSH_READY)
+
+
 async def send_notification_to_user(
     user_id: str,
     title: str,
@@ -349,21 +620,9 @@ async def send_notification_to_user(
     Returns:
         Created notification or None if user has disabled this type
     """
-    db = await get_database()
-    
-    # Check user's settings
-    settings = await get_user_notification_settings(user_id)
-    
     # Check if this type of notification is enabled
-    if notification_type == NotificationType.WORKOUT_REMINDER and not settings.workout_reminders:
-        return None
-    elif notification_type == NotificationType.GOAL_UPDATE and not settings.goal_updates:
-        return None
-    elif notification_type == NotificationType.SOCIAL and not settings.social_interactions:
-        return None
-    elif notification_type == NotificationType.ACHIEVEMENT and not settings.achievement_notifications:
-        return None
-    elif notification_type == NotificationType.SYSTEM and not settings.system_notifications:
+    settings = await get_notification_settings_bulk([user_id])
+    if not notification_enabled(settings[user_id], notification_type):
         return None
     
     # Create the notification
@@ -377,10 +636,294 @@ async def send_notification_to_user(
     return await create_notification(notification, user_id)
 
 
+async def send_notifications_bulk(
+    user_ids: List[str],
+    title: str,
+    message: str,
+    notification_type: NotificationType,
+    metadata: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Send the same notification to many users.
+    
+    Recipients' settings are loaded in one batch and filtered in memory, and
+    the notifications are written with chunked insert_many calls.
+    
+    Args:
+        user_ids: Recipient user IDs (duplicates are sent once)
+        title: Notification title
+        message: Notification message
+        notification_type: Type of notification
+        metadata: Optional metadata
+        
+    Returns:
+        Number of notifications created
+    """
+    user_ids = list(dict.fromkeys(map(str, user_ids)))
+    if not user_ids:
+        return 0
+    
+    # Validate the shared fields once instead of per recipient
+    notification = NotificationCreate(
+        title=title,
+        message=message,
+        type=notification_type,
+        metadata=metadata or {}
+    ).dict()
+    
+    settings = await get_notification_settings_bulk(user_ids)
+    recipients = [user_id for user_id in user_ids if notification_enabled(settings[user_id], notification_type)]
+    if not recipients:
+        return 0
+    
+    db = await get_database()
+    
+    created_at = datetime.utcnow()
+    created = 0
+    for offset in range(0, len(recipients), NOTIFICATION_INSERT_BATCH_SIZE):
+        documents = [
+            {
+                **notification,
+                "user_id": ObjectId(user_id),
+                "is_read": False,
+                "push_pending": True,
+                "created_at": created_at
+            }
+            for user_id in recipients[offset:offset + NOTIFICATION_INSERT_BATCH_SIZE]
+        ]
+        result = await db.notifications.insert_many(documents, ordered=False)
+        created += len(result.inserted_ids)
+        
+        await bulk_increment_user_stats({
+            str(document["user_id"]): {"notifications.unread": 1}
+            for document in documents
+        })
+        await notifications_created.send(notifications=documents)
+    
+    return created
+
+
+def aggregation_window_start(at: datetime, window: timedelta = AGGREGATION_WINDOW) -> datetime:
+    """
+    Start of the fixed aggregation window containing a time.
+    
+    Args:
+        at: Time of the activity
+        window: Window length
+        
+    Returns:
+        Window start
+    """
+    epoch = datetime(1970, 1, 1)
+    seconds = window.total_seconds()
+    return epoch + timedelta(seconds=(at - epoch).total_seconds() // seconds * seconds)
+
+
+def render_aggregated_message(actors: List[Dict[str, Any]], count: int, verb: str) -> str:
+    """
+    Message of an aggregated notification, e.g. "alice and 12 others liked your post".
+    
+    Args:
+        actors: Most recent actors, newest first
+        count: Total number of activities
+        verb: Action phrase, e.g. "liked your post"
+        
+    Returns:
+        Notification message
+    """
+    names = [actor.get("name") or "Someone" for actor in actors]
+    others = count - 1
+    
+    if others <= 0:
+        subject = names[0]
+    elif others == 1 and len(names) > 1:
+        subject = f"{names[0]} and {names[1]}"
+    else:
+        subject = f"{names[0]} and {others} {'other' if others == 1 else 'others'}"
+    
+    return f"{subject} {verb}"
+
+
+def aggregated_message_expression(verb: str) -> Dict[str, Any]:
+    """
+    Aggregation expression rendering render_aggregated_message from the
+    document's actors and count.
+    
+    Args:
+        verb: Action phrase, e.g. "liked your post"
+        
+    Returns:
+        Expression evaluating to the notification message
+    """
+    def actor_name(variable: str) -> Dict[str, Any]:
+        return {
+            "$let": {
+                "vars": {"name": {"$ifNull": [f"$${variable}.name", ""]}},
+                "in": {"$cond": [{"$eq": ["$$name", ""]}, "Someone", "$$name"]}
+            }
+        }
+    
+    subject = {
+        "$switch": {
+            "branches": [
+                {"case": {"$lte": ["$$others", 0]}, "then": actor_name("first")},
+                {
+                    "case": {"$and": [{"$eq": ["$$others", 1]}, {"$gt": [{"$size": "$actors"}, 1]}]},
+                    "then": {"$concat": [actor_name("first"), " and ", actor_name("second")]}
+                }
+            ],
+            "default": {
+                "$concat": [
+                    actor_name("first"),
+                    " and ",
+                    {"$toString": "$$others"},
+                    {"$cond": [{"$eq": ["$$others", 1]}, " other", " others"]}
+                ]
+            }
+        }
+    }
+    
+    return {
+        "$let": {
+            "vars": {
+                "first": {"$arrayElemAt": ["$actors", 0]},
+                "second": {"$arrayElemAt": ["$actors", 1]},
+                "others": {"$subtract": ["$count", 1]}
+            },
+            "in": {"$concat": [subject, " ", {"$literal": verb}]}
+        }
+    }
+
+
+async def aggregate_notification(
+    user_id: str,
+    notification_type: NotificationType,
+    group_key: str,
+    actor: Dict[str, Any],
+    title: str,
+    verb: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    window: timedelta = AGGREGATION_WINDOW
+) -> Optional[Dict[str, Any]]:
+    """
+    Record activity on a notification that collapses repeats.
+    
+    Activities with the same group key (type and target, e.g.
+    "post:<id>:like") in the same window update one notification with one
+    atomic pipeline upsert: the count is incremented, the actor moves to the
+    front of a list capped at AGGREGATED_ACTORS (a repeat actor is not
+    listed twice) and the message is rendered from both, so the document
+    stays bounded however popular the target is. The notification moves to
+    the top of the list, becomes unread again, and is pushed again only if
+    the user had already read it.
+    
+    Args:
+        user_id: Recipient user ID
+        notification_type: Type of notification
+        group_key: Key of the activity target
+        actor: Who acted, with user_id and name
+        title: Notification title
+        verb: Action phrase for the message, e.g. "liked your post"
+        metadata: Optional metadata, stored when the notification is created
+        window: Aggregation window length
+        
+    Returns:
+        Aggregated notification or None if the user has disabled this type
+    """
+    settings = await get_notification_settings_bulk([user_id])
+    if not notification_enabled(settings[user_id], notification_type):
+        return None
+    
+    db = await get_database()
+    
+    now = datetime.utcnow()
+    actor = {**actor, "user_id": str(actor["user_id"]), "at": now}
+    filters = {
+        "user_id": ObjectId(user_id),
+        "group_key": group_key,
+        "window_start": aggregation_window_start(now, window)
+    }
+    update = [
+        {
+            "$set": {
+                # Pushed again only if the user had already read it
+                "push_pending": {
+                    "$cond": [{"$eq": ["$is_read", True]}, True, {"$ifNull": ["$push_pending", True]}]
+                },
+                # A repeat actor moves to the front instead of appearing twice
+                "actors": {
+                    "$slice": [
+                        {
+                            "$concatArrays": [
+                                [{"$literal": actor}],
+                                {
+                                    "$filter": {
+                                        "input": {"$ifNull": ["$actors", []]},
+                                        "cond": {"$ne": ["$$this.user_id", actor["user_id"]]}
+                                    }
+                                }
+                            ]
+                        },
+                        AGGREGATED_ACTORS
+                    ]
+                },
+                "count": {"$add": [{"$ifNull": ["$count", 0]}, 1]},
+                "is_read": False,
+                "created_at": now,
+                "type": {"$ifNull": ["$type", NotificationType(notification_type).value]},
+                "title": {"$ifNull": ["$title", {"$literal": title}]},
+                "metadata": {"$ifNull": ["$metadata", {"$literal": metadata or {}}]},
+                "first_created_at": {"$ifNull": ["$first_created_at", now]}
+            }
+        },
+        {"$set": {"message": aggregated_message_expression(verb)}}
+    ]
+    
+    # Concurrent first activities race on the unique window index; the
+    # loser retries as an update
+    try:
+        previous = await db.notifications.find_one_and_update(
+            filters, update, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        previous = await db.notifications.find_one_and_update(
+            filters, update, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+    
+    if previous is None:
+        notification = await db.notifications.find_one(filters)
+    else:
+        # Mirror the pipeline instead of reading the document back
+        count = previous.get("count", 0) + 1
+        actors = ([actor] + [
+            previous_actor for previous_actor in previous.get("actors", [])
+            if previous_actor.get("user_id") != actor["user_id"]
+        ])[:AGGREGATED_ACTORS]
+        notification = {
+            **previous,
+            "count": count,
+            "actors": actors,
+            "message": render_aggregated_message(actors, count, verb),
+            "is_read": False,
+            "push_pending": True if previous.get("is_read") else previous.get("push_pending", True),
+            "created_at": now
+        }
+    
+    if previous is None or previous.get("is_read"):
+        await increment_user_stats(user_id, {"notifications.unread": 1})
+    
+    if notification is not None:
+        await notifications_created.send(notifications=[notification])
+    
+    return notification
+
+
 async def get_unread_notification_count(user_id: str) -> int:
     """
     Get count of unread notifications for a user.
     
+    Read from the counter kept in the user's stats document.
+    
     Args:
         user_id: User ID
         
@@ -389,9 +932,9 @@ async def get_unread_notification_count(user_id: str) -> int:
     """
     db = await get_database()
     
-    count = await db.notifications.count_documents({
-        "user_id": ObjectId(user_id),
-        "is_read": False
-    })
+    stats = await db.user_stats.find_one(
+        {"_id": ObjectId(user_id)},
+        {"_id": 0, "notifications.unread": 1}
+    )
     
-    return count 
\ No newline at end of file
+    return max(0, (stats or {}).get("notifications", {}).get("unread", 0))
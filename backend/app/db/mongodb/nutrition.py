@@ -0,0 +1,352 @@
+from typing import List, Optional, Dict, Any
+from datetime import datetime, date, timedelta
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from app.db.mongodb.mongodb import get_database
+
+# Rolled-up fields and the food log field each one is read from
+ROLLUP_FIELDS = {
+    "calories": "total_calories",
+    "protein": "total_protein",
+    "carbs": "total_carbs",
+    "fat": "total_fat",
+    "fiber": "total_fiber",
+    "sugar": "total_sugar",
+    "sodium": "total_sodium",
+    "water_intake": "water_intake"
+}
+
+# Rollup documents written per bulk_write call when rebuilding
+REBUILD_BATCH_SIZE = 500
+
+
+def rollup_day_key(user_id: str, day: date) -> str:
+    """
+    Build the _id of a daily rollup document.
+
+    Keys sort by user and then day, so a date range is an _id range scan.
+
+    Args:
+        user_id: User ID
+        day: Day of the rollup
+
+    Returns:
+        Rollup document ID
+    """
+    return f"{user_id}:{day.isoformat()}"
+
+
+def food_log_rollup_values(food_log: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """
+    Extract the rolled-up totals of a single food log.
+
+    Args:
+        food_log: Food log document
+
+    Returns:
+        Totals keyed by rollup field (None when the log has no value)
+    """
+    return {field: food_log.get(source) for field, source in ROLLUP_FIELDS.items()}
+
+
+def _food_log_day(food_log: Dict[str, Any]) -> date:
+    """Day a food log counts towards (the log date as entered by the user)."""
+    log_date = food_log["date"]
+    return log_date.date() if isinstance(log_date, datetime) else log_date
+
+
+def _recompute_stages() -> List[Dict[str, Any]]:
+    """Update pipeline stages recomputing count, sum, min and max from the per-log totals."""
+    return [
+        {"$set": {"_entries": {"$map": {"input": {"$objectToArray": "$logs"}, "in": "$$this.v"}}}},
+        {
+            "$set": {
+                "count": {"$size": "$_entries"},
+                "sum": {field: {"$sum": f"$_entries.{field}"} for field in ROLLUP_FIELDS},
+                "min": {field: {"$min": f"$_entries.{field}"} for field in ROLLUP_FIELDS},
+                "max": {field: {"$max": f"$_entries.{field}"} for field in ROLLUP_FIELDS},
+                "n": {
+                    field: {
+                        "$size": {
+                            "$filter": {
+                                "input": f"$_entries.{field}",
+                                "cond": {"$ne": ["$$this", None]}
+                            }
+                        }
+                    }
+                    for field in ROLLUP_FIELDS
+                }
+            }
+        },
+        {"$unset": "_entries"}
+    ]
+
+
+def summarize_log_totals(logs: Dict[str, Dict[str, Optional[float]]]) -> Dict[str, Any]:
+    """
+    Compute count, sum, min, max and non-null counts from per-log totals.
+
+    Mirrors the update pipeline used for incremental maintenance.
+
+    Args:
+        logs: Per-log totals keyed by food log ID
+
+    Returns:
+        Rollup statistics
+    """
+    summary = {"count": len(logs), "sum": {}, "min": {}, "max": {}, "n": {}}
+
+    for field in ROLLUP_FIELDS:
+        values = [totals[field] for totals in logs.values() if totals.get(field) is not None]
+        summary["sum"][field] = sum(values)
+        summary["min"][field] = min(values) if values else None
+        summary["max"][field] = max(values) if values else None
+        summary["n"][field] = len(values)
+
+    return summary
+
+
+async def apply_food_log_to_rollups(food_log: Dict[str, Any]) -> None:
+    """
+    Add or replace a food log's totals in its daily rollup.
+
+    The per-log totals and the derived statistics are written by one atomic
+    pipeline update, so concurrent writes to the same day stay consistent.
+
+    Args:
+        food_log: Food log document with _id, user_id, date and totals
+    """
+    db = await get_database()
+
+    user_id = str(food_log["user_id"])
+    food_log_id = str(food_log["_id"])
+    day = _food_log_day(food_log)
+
+    await db.nutrition_daily.update_one(
+        {"_id": rollup_day_key(user_id, day)},
+        [
+            {
+                "$set": {
+                    "user_id": ObjectId(user_id),
+                    "day": datetime.combine(day, datetime.min.time()),
+                    "logs": {
+                        "$mergeObjects": [
+                            {"$ifNull": ["$logs", {}]},
+                            {"$literal": {food_log_id: food_log_rollup_values(food_log)}}
+                        ]
+                    },
+                    "updated_at": datetime.utcnow()
+                }
+            },
+            *_recompute_stages()
+        ],
+        upsert=True
+    )
+
+
+async def remove_food_log_from_rollups(food_log: Dict[str, Any]) -> None:
+    """
+    Remove a food log's totals from its daily rollup.
+
+    Args:
+        food_log: Food log document with _id, user_id and date
+    """
+    db = await get_database()
+
+    rollup_id = rollup_day_key(str(food_log["user_id"]), _food_log_day(food_log))
+    food_log_id = str(food_log["_id"])
+
+    await db.nutrition_daily.update_one(
+        {"_id": rollup_id},
+        [
+            {
+                "$set": {
+                    "logs": {
+                        "$arrayToObject": {
+                            "$filter": {
+                                "input": {"$objectToArray": {"$ifNull": ["$logs", {}]}},
+                                "cond": {"$ne": ["$$this.k", food_log_id]}
+                            }
+                        }
+                    },
+                    "updated_at": datetime.utcnow()
+                }
+            },
+            *_recompute_stages()
+        ]
+    )
+
+    # Drop days that no longer have any logs
+    await db.nutrition_daily.delete_one({"_id": rollup_id, "count": 0})
+
+
+async def get_daily_rollups(
+    user_id: str,
+    start_date: date,
+    end_date: date
+) -> List[Dict[str, Any]]:
+    """
+    Get a user's daily nutrition rollups for a date range.
+
+    Args:
+        user_id: User ID
+        start_date: First day (inclusive)
+        end_date: Last day (inclusive)
+
+    Returns:
+        Daily rollup documents ordered by day
+    """
+    db = await get_database()
+
+    cursor = db.nutrition_daily.find(
+        {
+            "_id": {
+                "$gte": rollup_day_key(user_id, start_date),
+                "$lte": rollup_day_key(user_id, end_date)
+            }
+        },
+        {"logs": 0}
+    ).sort("_id", 1)
+
+    return await cursor.to_list(length=None)
+
+
+def combine_rollups(rollups: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine daily rollups into averages, extremes and totals per field.
+
+    Args:
+        rollups: Daily rollup documents
+
+    Returns:
+        Combined statistics with avg_*, min_*, max_* and sum_* per field
+    """
+    combined: Dict[str, Any] = {
+        "total_logs": sum(rollup["count"] for rollup in rollups),
+        "days_logged": len(rollups)
+    }
+
+    for field in ROLLUP_FIELDS:
+        # Rollups written before a field was tracked have no entry for it
+        total = sum(rollup["sum"].get(field, 0) for rollup in rollups)
+        non_null = sum(rollup["n"].get(field, 0) for rollup in rollups)
+        minimums = [rollup["min"][field] for rollup in rollups if rollup["min"].get(field) is not None]
+        maximums = [rollup["max"][field] for rollup in rollups if rollup["max"].get(field) is not None]
+
+        combined[f"avg_{field}"] = total / non_null if non_null else 0
+        combined[f"min_{field}"] = min(minimums) if minimums else 0
+        combined[f"max_{field}"] = max(maximums) if maximums else 0
+        combined[f"sum_{field}"] = total
+
+    return combined
+
+
+async def get_nutrition_rollups(
+    user_id: str,
+    start_date: date,
+    end_date: date,
+    period: str = "day"
+) -> List[Dict[str, Any]]:
+    """
+    Get nutrition rollups per day, week (starting Monday) or month.
+
+    Week and month rollups are derived from the daily rollups.
+
+    Args:
+        user_id: User ID
+        start_date: First day (inclusive)
+        end_date: Last day (inclusive)
+        period: "day", "week" or "month"
+
+    Returns:
+        List of rollups with period_start and combined statistics
+    """
+    rollups = await get_daily_rollups(user_id, start_date, end_date)
+
+    periods: Dict[date, List[Dict[str, Any]]] = {}
+    for rollup in rollups:
+        day = rollup["day"].date()
+        if period == "week":
+            period_start = day - timedelta(days=day.weekday())
+        elif period == "month":
+            period_start = day.replace(day=1)
+        else:
+            period_start = day
+        periods.setdefault(period_start, []).append(rollup)
+
+    return [
+        {"period_start": period_start, **combine_rollups(period_rollups)}
+        for period_start, period_rollups in periods.items()
+    ]
+
+
+async def rebuild_nutrition_daily(user_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Rebuild daily nutrition rollups from the raw food logs.
+
+    Food logs are streamed in (user, date) order, so only one day is held in
+    memory at a time, and rollups are written with chunked bulk_write calls.
+
+    Args:
+        user_id: Only rebuild this user's rollups (all users when None)
+
+    Returns:
+        Dictionary with the number of food logs read and rollup days written
+    """
+    db = await get_database()
+
+    filters = {"user_id": ObjectId(user_id)} if user_id else {}
+    projection = {"user_id": 1, "date": 1, **{source: 1 for source in ROLLUP_FIELDS.values()}}
+
+    await db.nutrition_daily.delete_many(filters)
+
+    counts = {"food_logs": 0, "days": 0}
+    operations: List[ReplaceOne] = []
+    current_key = None
+    current_day = None
+    current_user_id = None
+    current_logs: Dict[str, Dict[str, Optional[float]]] = {}
+
+    def flush_day() -> None:
+        if current_key is None:
+            return
+        operations.append(ReplaceOne(
+            {"_id": current_key},
+            {
+                "_id": current_key,
+                "user_id": current_user_id,
+                "day": datetime.combine(current_day, datetime.min.time()),
+                "logs": current_logs,
+                **summarize_log_totals(current_logs),
+                "updated_at": datetime.utcnow()
+            },
+            upsert=True
+        ))
+        counts["days"] += 1
+
+    cursor = db.food_logs.find(filters, projection).sort([("user_id", 1), ("date", 1)])
+
+    async for food_log in cursor:
+        day = _food_log_day(food_log)
+        key = rollup_day_key(str(food_log["user_id"]), day)
+
+        if key != current_key:
+            flush_day()
+            current_key = key
+            current_day = day
+            current_user_id = food_log["user_id"]
+            current_logs = {}
+
+            if len(operations) >= REBUILD_BATCH_SIZE:
+                await db.nutrition_daily.bulk_write(operations, ordered=False)
+                operations = []
+
+        current_logs[str(food_log["_id"])] = food_log_rollup_values(food_log)
+        counts["food_logs"] += 1
+
+    flush_day()
+    if operations:
+        await db.nutrition_daily.bulk_write(operations, ordered=False)
+
+    return counts
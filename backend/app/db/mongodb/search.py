@@ -1,8 +1,37 @@
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import asyncio
 from bson import ObjectId
 
 from app.db.mongodb.mongodb import get_database
+from app.core.cache import TTLCache, make_cache_key
+from app.db.vector.sync import search_workout_vectors
+
+# Bucket boundaries for workout facets (duration is stored in seconds)
+DURATION_FACET_BOUNDARIES = [0, 900, 1800, 2700, 3600, 5400, 7200]
+CALORIES_FACET_BOUNDARIES = [0, 100, 200, 300, 500, 750, 1000]
+TOP_EXERCISES_FACET_SIZE = 10
+
+# Facet bucket of documents without a numeric value for the faceted field
+MISSING_FACET_BUCKET = "missing"
+
+# Facet counts are small and change slowly, so they are cached per filter set
+search_cache = TTLCache(maxsize=512, ttl=60)
+
+# Stable order for cursor paging; _id breaks ties between equal scores
+SEARCH_CURSOR_SORT = {"score": {"$meta": "searchScore"}, "_id": 1}
+
+# Vector candidates fetched per requested result, to survive the Mongo filters
+SEMANTIC_CANDIDATE_FACTOR = 5
+
+# Reciprocal rank fusion constant and per-type boosts for blended search
+RRF_K = 60
+BLENDED_TYPE_BOOSTS = {
+    "workouts": 1.0,
+    "users": 0.9,
+    "posts": 1.0,
+    "food_logs": 0.7
+}
 
 
 class MongoDBSearchService:
@@ -16,25 +45,24 @@ class MongoDBSearchService:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Search workouts using Atlas Search.
+        
+        Pages after the first continue from the cursor of the previous page
+        (searchAfter) instead of skipping, so deep pages cost the same.
         """
         db = await get_database()
         
         # Build search pipeline
         pipeline = [
-            {
-                "$search": {
-                    "index": "workouts",  # You'll need to create this index in Atlas
-                    "text": {
-                        "query": query,
-                        "path": ["title", "description", "exercises.name", "exercises.notes"],
-                        "fuzzy": {}
-                    }
-                }
-            }
+            search_stage("workouts", {
+                "query": query,
+                "path": ["title", "description", "exercises.name", "exercises.notes"],
+                "fuzzy": {}
+            }, cursor)
         ]
 
         # Add filters
@@ -57,7 +85,7 @@ class MongoDBSearchService:
 
         # Add pagination
         pipeline.extend([
-            {"$skip": skip},
+            *([] if cursor else [{"$skip": skip}]),
             {"$limit": limit},
             {
                 "$lookup": {
@@ -71,6 +99,7 @@ class MongoDBSearchService:
             {
                 "$project": {
                     "id": {"$toString": "$_id"},
+                    "search_cursor": {"$meta": "searchSequenceToken"},
                     "title": 1,
                     "description": 1,
                     "exercises": 1,
@@ -90,36 +119,286 @@ class MongoDBSearchService:
 
         return {
             "total": total_count,
-            "results": results
+            "results": results,
+            "next_cursor": next_search_cursor(results, limit)
         }
 
     @staticmethod
-    async def search_users(
+    async def search_workouts_semantic(
         query: str,
+        user_id: Optional[str] = None,
+        is_public: Optional[bool] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
         skip: int = 0,
         limit: int = 10
     ) -> Dict[str, Any]:
         """
-        Search users using Atlas Search.
+        Search workouts by embedding similarity using the local vector index.
+        
+        Candidates are ranked by the vector index, then filtered and enriched in
+        MongoDB while keeping the similarity order.
         """
         db = await get_database()
         
+        candidates = await search_workout_vectors(query, k=(skip + limit) * SEMANTIC_CANDIDATE_FACTOR)
+        if not candidates:
+            return {"total": 0, "results": []}
+        
+        similarities = dict(candidates)
+        
+        match_conditions = {"_id": {"$in": [ObjectId(workout_id) for workout_id, _ in candidates]}}
+        if user_id:
+            match_conditions["user_id"] = ObjectId(user_id)
+        if is_public is not None:
+            match_conditions["is_public"] = is_public
+        if date_from or date_to:
+            date_condition = {}
+            if date_from:
+                date_condition["$gte"] = datetime.fromisoformat(date_from)
+            if date_to:
+                date_condition["$lte"] = datetime.fromisoformat(date_to)
+            match_conditions["date"] = date_condition
+        
         pipeline = [
+            {"$match": match_conditions},
             {
-                "$search": {
-                    "index": "users",  # You'll need to create this index in Atlas
-                    "text": {
-                        "query": query,
-                        "path": ["username", "full_name", "bio"],
-                        "fuzzy": {}
-                    }
+                "$lookup": {
+                    "from": "users",
+                    "localField": "user_id",
+                    "foreignField": "_id",
+                    "as": "user"
                 }
             },
+            {"$unwind": "$user"},
+            {
+                "$project": {
+                    "_id": 0,
+                    "id": {"$toString": "$_id"},
+                    "title": 1,
+                    "description": 1,
+                    "exercises": 1,
+                    "date": 1,
+                    "is_public": 1,
+                    "likes_count": {"$size": {"$ifNull": ["$likes", []]}},
+                    "comments_count": {"$size": {"$ifNull": ["$comments", []]}},
+                    "user_name": "$user.username",
+                    "user_profile_picture": "$user.profile_picture"
+                }
+            }
+        ]
+        
+        results = await db.workouts.aggregate(pipeline).to_list(length=None)
+        for workout in results:
+            workout["similarity"] = similarities[workout["id"]]
+        results.sort(key=lambda workout: workout["similarity"], reverse=True)
+        
+        return {
+            "total": len(results),
+            "results": results[skip:skip + limit]
+        }
+
+    @staticmethod
+    async def search_workouts_hybrid(
+        query: str,
+        user_id: Optional[str] = None,
+        is_public: Optional[bool] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Search workouts with full-text and semantic search merged by reciprocal rank fusion.
+        """
+        depth = skip + limit
+        text, semantic = await asyncio.gather(
+            MongoDBSearchService.search_workouts(
+                query, user_id=user_id, is_public=is_public,
+                date_from=date_from, date_to=date_to, limit=depth
+            ),
+            MongoDBSearchService.search_workouts_semantic(
+                query, user_id=user_id, is_public=is_public,
+                date_from=date_from, date_to=date_to, limit=depth
+            )
+        )
+        
+        ranked = reciprocal_rank_fusion(
+            {"text": text["results"], "semantic": semantic["results"]},
+            group_by_type=False
+        )
+        
+        return {
+            "total": len(ranked),
+            "results": ranked[skip:skip + limit]
+        }
+
+    @staticmethod
+    async def browse_workout_facets(
+        exercise: Optional[str] = None,
+        duration_min: Optional[int] = None,
+        duration_max: Optional[int] = None,
+        calories_min: Optional[int] = None,
+        calories_max: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Browse public workouts by filters and return facet counts with the hits.
+        
+        Hits and facets are computed in a single $facet aggregation. Facet counts
+        do not depend on the page, so they are cached per filter set and later
+        pages only run the hits branch.
+        """
+        db = await get_database()
+        
+        match_conditions = {"is_public": True}
+        if exercise:
+            match_conditions["exercises.name"] = exercise
+        if duration_min is not None or duration_max is not None:
+            duration_condition = {}
+            if duration_min is not None:
+                duration_condition["$gte"] = duration_min
+            if duration_max is not None:
+                duration_condition["$lte"] = duration_max
+            match_conditions["duration"] = duration_condition
+        if calories_min is not None or calories_max is not None:
+            calories_condition = {}
+            if calories_min is not None:
+                calories_condition["$gte"] = calories_min
+            if calories_max is not None:
+                calories_condition["$lte"] = calories_max
+            match_conditions["calories_burned"] = calories_condition
+        if date_from or date_to:
+            date_condition = {}
+            if date_from:
+                date_condition["$gte"] = datetime.fromisoformat(date_from)
+            if date_to:
+                date_condition["$lte"] = datetime.fromisoformat(date_to)
+            match_conditions["date"] = date_condition
+        
+        hits_pipeline = [
+            {"$sort": {"created_at": -1, "_id": -1}},
             {"$skip": skip},
             {"$limit": limit},
+            {
+                "$lookup": {
+                    "from": "users",
+                    "localField": "user_id",
+                    "foreignField": "_id",
+                    "as": "user"
+                }
+            },
+            {"$unwind": "$user"},
             {
                 "$project": {
+                    "_id": 0,
                     "id": {"$toString": "$_id"},
+                    "user_id": {"$toString": "$user_id"},
+                    "title": 1,
+                    "description": 1,
+                    "duration": 1,
+                    "calories_burned": 1,
+                    "exercises": 1,
+                    "date": 1,
+                    "created_at": 1,
+                    "likes_count": {"$size": {"$ifNull": ["$likes", []]}},
+                    "comments_count": {"$size": {"$ifNull": ["$comments", []]}},
+                    "user_name": "$user.username",
+                    "user_profile_picture": "$user.profile_picture"
+                }
+            }
+        ]
+        
+        cache_key = make_cache_key(
+            "search:workouts:facets",
+            exercise=exercise,
+            duration_min=duration_min,
+            duration_max=duration_max,
+            calories_min=calories_min,
+            calories_max=calories_max,
+            date_from=date_from,
+            date_to=date_to
+        )
+        cached_facets = search_cache.get(cache_key)
+        
+        if cached_facets is not None:
+            results = await db.workouts.aggregate(
+                [{"$match": match_conditions}, *hits_pipeline]
+            ).to_list(length=None)
+            return {
+                "total": cached_facets["total"],
+                "results": results,
+                "facets": cached_facets["facets"]
+            }
+        
+        pipeline = [
+            {"$match": match_conditions},
+            {
+                "$facet": {
+                    "hits": hits_pipeline,
+                    "total": [{"$count": "count"}],
+                    "exercises": [
+                        {"$unwind": "$exercises"},
+                        {"$sortByCount": "$exercises.name"},
+                        {"$limit": TOP_EXERCISES_FACET_SIZE}
+                    ],
+                    "duration": [range_bucket_stage("$duration", DURATION_FACET_BOUNDARIES)],
+                    "calories": [range_bucket_stage("$calories_burned", CALORIES_FACET_BOUNDARIES)]
+                }
+            }
+        ]
+        
+        result = (await db.workouts.aggregate(pipeline).to_list(length=1))[0]
+        
+        cached_facets = {
+            "total": result["total"][0]["count"] if result["total"] else 0,
+            "facets": {
+                "exercises": [
+                    {"value": bucket["_id"], "count": bucket["count"]}
+                    for bucket in result["exercises"]
+                ],
+                "duration": format_range_buckets(result["duration"], DURATION_FACET_BOUNDARIES),
+                "calories": format_range_buckets(result["calories"], CALORIES_FACET_BOUNDARIES)
+            }
+        }
+        search_cache.set(cache_key, cached_facets)
+        
+        return {
+            "total": cached_facets["total"],
+            "results": result["hits"],
+            "facets": cached_facets["facets"]
+        }
+
+    @staticmethod
+    async def search_users(
+        query: str,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Search users using Atlas Search.
+        
+        Pages after the first continue from the cursor of the previous page
+        (searchAfter) instead of skipping, so deep pages cost the same.
+        """
+        db = await get_database()
+        
+        pipeline = [
+            search_stage("users", {
+                "query": query,
+                "path": ["username", "full_name", "bio"],
+                "fuzzy": {}
+            }, cursor),
+            *([] if cursor else [{"$skip": skip}]),
+            {"$limit": limit},
+            {
+                "$project": {
+                    "id": {"$toString": "$_id"},
+                    "search_cursor": {"$meta": "searchSequenceToken"},
                     "username": 1,
                     "full_name": 1,
                     "profile_picture": 1,
@@ -136,7 +415,8 @@ class MongoDBSearchService:
 
         return {
             "total": total_count,
-            "results": results
+            "results": results,
+            "next_cursor": next_search_cursor(results, limit)
         }
 
     @staticmethod
@@ -146,24 +426,23 @@ class MongoDBSearchService:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Search food logs using Atlas Search.
+        
+        Pages after the first continue from the cursor of the previous page
+        (searchAfter) instead of skipping, so deep pages cost the same.
         """
         db = await get_database()
         
         pipeline = [
-            {
-                "$search": {
-                    "index": "food_logs",  # You'll need to create this index in Atlas
-                    "text": {
-                        "query": query,
-                        "path": ["meals.meal_type", "meals.foods.name", "notes"],
-                        "fuzzy": {}
-                    }
-                }
-            }
+            search_stage("food_logs", {
+                "query": query,
+                "path": ["meals.meal_type", "meals.foods.name", "notes"],
+                "fuzzy": {}
+            }, cursor)
         ]
 
         # Add filters
@@ -184,11 +463,12 @@ class MongoDBSearchService:
 
         # Add pagination and projection
         pipeline.extend([
-            {"$skip": skip},
+            *([] if cursor else [{"$skip": skip}]),
             {"$limit": limit},
             {
                 "$project": {
                     "id": {"$toString": "$_id"},
+                    "search_cursor": {"$meta": "searchSequenceToken"},
                     "date": 1,
                     "meals": 1,
                     "total_calories": 1,
@@ -206,7 +486,66 @@ class MongoDBSearchService:
 
         return {
             "total": total_count,
-            "results": results
+            "results": results,
+            "next_cursor": next_search_cursor(results, limit)
+        }
+
+    @staticmethod
+    async def search_posts(
+        query: str,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Search social posts using Atlas Search.
+        
+        Pages after the first continue from the cursor of the previous page
+        (searchAfter) instead of skipping, so deep pages cost the same.
+        """
+        db = await get_database()
+        
+        pipeline = [
+            search_stage("social_posts", {
+                "query": query,
+                "path": ["content"],
+                "fuzzy": {}
+            }, cursor),
+            *([] if cursor else [{"$skip": skip}]),
+            {"$limit": limit},
+            {
+                "$lookup": {
+                    "from": "users",
+                    "localField": "user_id",
+                    "foreignField": "_id",
+                    "as": "user"
+                }
+            },
+            {"$unwind": "$user"},
+            {
+                "$project": {
+                    "id": {"$toString": "$_id"},
+                    "search_cursor": {"$meta": "searchSequenceToken"},
+                    "user_id": {"$toString": "$user_id"},
+                    "content": 1,
+                    "media_urls": 1,
+                    "created_at": 1,
+                    "likes_count": 1,
+                    "comments_count": 1,
+                    "user_name": "$user.username",
+                    "user_profile_picture": "$user.profile_picture",
+                    "_id": 0
+                }
+            }
+        ]
+
+        results = await db.social_posts.aggregate(pipeline).to_list(length=None)
+        total_count = len(results)
+
+        return {
+            "total": total_count,
+            "results": results,
+            "next_cursor": next_search_cursor(results, limit)
         }
 
     @staticmethod
@@ -229,6 +568,152 @@ class MongoDBSearchService:
             "food_logs": food_logs["results"]
         }
 
+    @staticmethod
+    async def search_blended(
+        query: str,
+        user_id: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Search all collections and merge the results into one ranked page.
+        
+        Each collection is searched for its top skip + limit results and the
+        lists are merged with reciprocal rank fusion, weighted by type boosts.
+        Pages report has_more instead of a total, which fusion cannot know.
+        Pages are cached under the same key scheme as the other searches.
+        """
+        cache_key = make_cache_key("search:blended", query=query, user_id=user_id, skip=skip, limit=limit)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        depth = skip + limit
+        workouts, users, posts, food_logs = await asyncio.gather(
+            MongoDBSearchService.search_workouts(query, user_id=user_id, limit=depth),
+            MongoDBSearchService.search_users(query, limit=depth),
+            MongoDBSearchService.search_posts(query, limit=depth),
+            MongoDBSearchService.search_food_logs(query, user_id=user_id, limit=depth)
+        )
+        
+        searches = {"workouts": workouts, "users": users, "posts": posts, "food_logs": food_logs}
+        ranked = reciprocal_rank_fusion(
+            {result_type: search["results"] for result_type, search in searches.items()},
+            boosts=BLENDED_TYPE_BOOSTS
+        )
+        
+        # Only the top skip + limit results of each collection are fused, so
+        # there is no exact total; a collection that filled its depth may
+        # have more results on later pages
+        result = {
+            "results": ranked[skip:skip + limit],
+            "has_more": len(ranked) > depth or any(
+                len(search["results"]) >= depth for search in searches.values()
+            )
+        }
+        search_cache.set(cache_key, result, ttl=30)
+        
+        return result
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, List[Dict[str, Any]]],
+    boosts: Optional[Dict[str, float]] = None,
+    k: int = RRF_K,
+    group_by_type: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal rank fusion.
+    
+    A result at 1-based rank r in a list of type t scores boost[t] / (k + r).
+    Results appearing in several lists under the same type and id add up.
+    
+    Args:
+        ranked_lists: Ranked results keyed by result type
+        boosts: Optional per-type score multipliers (default 1.0)
+        k: Rank smoothing constant
+        group_by_type: Tag results with their list type and keep equal ids of
+            different types apart; disable to fuse several rankings of one collection
+        
+    Returns:
+        Results sorted by fused score, each tagged with "score" (and "type")
+    """
+    boosts = boosts or {}
+    fused: Dict[Any, Dict[str, Any]] = {}
+    
+    for result_type, results in ranked_lists.items():
+        boost = boosts.get(result_type, 1.0)
+        for rank, result in enumerate(results, start=1):
+            result_id = str(result.get("id", result.get("_id")))
+            key = (result_type, result_id) if group_by_type else result_id
+            entry = fused.get(key)
+            if entry is None:
+                entry = {**result, "score": 0.0}
+                if group_by_type:
+                    entry["type"] = result_type
+                fused[key] = entry
+            entry["score"] += boost / (k + rank)
+    
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)
+
+
+def range_bucket_stage(field: str, boundaries: List[int]) -> Dict[str, Any]:
+    """
+    Build a $bucket stage for a numeric range facet.
+    
+    Values above the last boundary get an open-ended bucket of their own,
+    and missing or non-numeric values (or, invalidly, values below the first
+    boundary) fall into a separate "missing" bucket.
+    
+    Args:
+        field: Field path to bucket (e.g. "$duration")
+        boundaries: Ascending bucket boundaries
+        
+    Returns:
+        $bucket stage
+    """
+    return {
+        "$bucket": {
+            "groupBy": {"$cond": [{"$isNumber": field}, field, None]},
+            "boundaries": [*boundaries, float("inf")],
+            "default": MISSING_FACET_BUCKET,
+            "output": {"count": {"$sum": 1}}
+        }
+    }
+
+
+def format_range_buckets(buckets: List[Dict[str, Any]], boundaries: List[int]) -> List[Dict[str, Any]]:
+    """
+    Format $bucket output as labelled ranges with lower and upper bounds.
+    
+    Args:
+        buckets: Output documents of a range_bucket_stage
+        boundaries: Boundaries the buckets were built with
+        
+    Returns:
+        List of ranges with key, from, to and count ("to" is exclusive, None
+        when unbounded; from and to are both None for the missing bucket)
+    """
+    upper_bounds = dict(zip(boundaries, boundaries[1:]))
+    ranges = []
+    
+    for bucket in buckets:
+        if bucket["_id"] == MISSING_FACET_BUCKET:
+            ranges.append({"key": MISSING_FACET_BUCKET, "from": None, "to": None, "count": bucket["count"]})
+            continue
+        
+        lower = bucket["_id"]
+        upper = upper_bounds.get(lower)
+        ranges.append({
+            "key": f"{lower}-{upper if upper is not None else '*'}",
+            "from": lower,
+            "to": upper,
+            "count": bucket["count"]
+        })
+    
+    return ranges
+
+
 async def sync_post(post_data: Dict[str, Any], operation: str = "index") -> None:
     """
     No longer needed - Atlas Search indexes MongoDB collections automatically
@@ -313,4 +798,39 @@ async def search_content(
             doc["user_id"] = str(doc["user_id"])
         results.append(doc)
     
-    return results 
\ No newline at end of file
+    return results 
+
+
+def search_stage(index: str, text: Dict[str, Any], cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build an Atlas Search text stage in cursor paging order.
+    
+    Args:
+        index: Atlas Search index name (you'll need to create it in Atlas)
+        text: Text operator
+        cursor: Cursor returned with the previous page
+        
+    Returns:
+        $search stage
+    """
+    search = {"index": index, "text": text, "sort": SEARCH_CURSOR_SORT}
+    if cursor:
+        search["searchAfter"] = cursor
+    return {"$search": search}
+
+
+def next_search_cursor(results: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """
+    Strip the per-result search tokens and return the cursor of the next page.
+    
+    Args:
+        results: Results projected with a "search_cursor" token
+        limit: Requested page size
+        
+    Returns:
+        Token of the last result, or None when the page was the last one
+    """
+    tokens = [result.pop("search_cursor", None) for result in results]
+    if results and len(results) >= limit:
+        return tokens[-1]
+    return None
@@ -1,10 +1,13 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.models.social import PostCreate, PostUpdate, PostInDB, CommentCreate, CommentInDB
 from app.db.mongodb.mongodb import get_database
 from app.db.mongodb.search import sync_post
+from app.db.mongodb.user_stats import increment_user_stats
+from app.core.signals import comment_added, post_created, post_liked
 
 
 # async def create_post(post: PostCreate, user_id: str) -> PostInDB:
@@ -58,6 +61,7 @@ async def create_post(post: PostCreate, user_id: str) -> PostInDB:
     
     # Insert into MongoDB
     await db.social_posts.insert_one(mongo_data)
+    await increment_user_stats(user_id, {"posts.count": 1})
     
     # Create response model with string IDs
     post_in_db = PostInDB(
@@ -72,6 +76,7 @@ async def create_post(post: PostCreate, user_id: str) -> PostInDB:
     )
     
     await sync_post(post_in_db.dict(by_alias=True))
+    await post_created.send(user_id=user_id, post=mongo_data)
     return post_in_db.dict(by_alias=True)
 
 
@@ -113,19 +118,18 @@ async def update_post(post_id: str, post_update: PostUpdate) -> Optional[PostInD
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Update the post
-    result = await db.social_posts.update_one(
+    # Update the post and get the updated document in one round-trip
+    post_data = await db.social_posts.find_one_and_update(
         {"_id": ObjectId(post_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
-        # Get the updated post
-        updated_post = await get_post_by_id(post_id)
+    if post_data:
+        updated_post = PostInDB(**post_data).dict(by_alias=True)
         
         # Update in Elasticsearch
-        if updated_post:
-            await sync_post(updated_post.dict(by_alias=True), operation="update")
+        await sync_post(updated_post, operation="update")
             
         return updated_post
     
@@ -144,13 +148,17 @@ async def delete_post(post_id: str) -> bool:
     """
     db = await get_database()
     
-    result = await db.social_posts.delete_one({"_id": ObjectId(post_id)})
+    deleted_post = await db.social_posts.find_one_and_delete(
+        {"_id": ObjectId(post_id)},
+        projection={"user_id": 1}
+    )
     
     # Delete from Elasticsearch
-    if result.deleted_count:
+    if deleted_post:
+        await increment_user_stats(str(deleted_post["user_id"]), {"posts.count": -1})
         await sync_post({"_id": post_id}, operation="delete")
         
-    return result.deleted_count > 0
+    return deleted_post is not None
 
 
 async def like_post(post_id: str, user_id: str) -> Optional[PostInDB]:
@@ -167,7 +175,7 @@ async def like_post(post_id: str, user_id: str) -> Optional[PostInDB]:
     db = await get_database()
     
     # Only add the like if the user hasn't already liked the post
-    result = await db.social_posts.update_one(
+    post_data = await db.social_posts.find_one_and_update(
         {
             "_id": ObjectId(post_id),
             "likes": {"$ne": ObjectId(user_id)}
@@ -176,21 +184,21 @@ async def like_post(post_id: str, user_id: str) -> Optional[PostInDB]:
             "$addToSet": {"likes": ObjectId(user_id)},
             "$inc": {"likes_count": 1},
             "$set": {"updated_at": datetime.utcnow()}
-        }
+        },
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
-        # Get the updated post
-        updated_post = await get_post_by_id((post_id))
+    if post_data:
+        updated_post = PostInDB(**post_data).dict(by_alias=True)
         
         # Update in Elasticsearch
-        if updated_post:
-            await sync_post(updated_post.dict(by_alias=True), operation="update")
+        await sync_post(updated_post, operation="update")
+        await post_liked.send(user_id=user_id, post=post_data)
             
         return updated_post
     
     # Post might exist but user already liked it
-    existing_post = await get_post_by_id((post_id))
+    existing_post = await get_post_by_id(post_id)
     return existing_post
 
 
@@ -208,7 +216,7 @@ async def unlike_post(post_id: str, user_id: str) -> Optional[PostInDB]:
     db = await get_database()
     
     # Only remove the like if the user has liked the post
-    result = await db.social_posts.update_one(
+    post_data = await db.social_posts.find_one_and_update(
         {
             "_id": ObjectId(post_id),
             "likes": ObjectId(user_id)
@@ -217,16 +225,15 @@ async def unlike_post(post_id: str, user_id: str) -> Optional[PostInDB]:
             "$pull": {"likes": ObjectId(user_id)},
             "$inc": {"likes_count": -1},
             "$set": {"updated_at": datetime.utcnow()}
-        }
+        },
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
-        # Get the updated post
-        updated_post = await get_post_by_id(post_id)
+    if post_data:
+        updated_post = PostInDB(**post_data).dict(by_alias=True)
         
         # Update in Elasticsearch
-        if updated_post:
-            await sync_post(updated_post, operation="update")
+        await sync_post(updated_post, operation="update")
             
         return updated_post
     
@@ -261,27 +268,24 @@ async def add_comment(post_id: str, comment: CommentCreate, user_id: str) -> Opt
         "likes_count": 0
     }
     
-    # First check if post exists
-    post = await get_post_by_id(post_id)
-    if not post:
-        return None
-    
-    # Insert comment into comments collection
-    await db.comments.insert_one(comment_data)
-    
-    # Update post to increment comment count
-    await db.social_posts.update_one(
+    # Increment the comment count, which also checks that the post exists
+    post_data = await db.social_posts.find_one_and_update(
         {"_id": ObjectId(post_id)},
         {
             "$inc": {"comments_count": 1},
             "$set": {"updated_at": datetime.utcnow()}
-        }
+        },
+        return_document=ReturnDocument.AFTER
     )
+    if not post_data:
+        return None
+    
+    # Insert comment into comments collection
+    await db.comments.insert_one(comment_data)
+    await comment_added.send(user_id=user_id, post=post_data, comment=dict(comment_data))
     
     # Update in Elasticsearch
-    post = await get_post_by_id(post_id)
-    if post:
-        await sync_post(post, operation="update")
+    await sync_post(PostInDB(**post_data).dict(by_alias=True), operation="update")
     
     # Convert ObjectId to string
     comment_data["_id"] = str(comment_data["_id"])
@@ -442,6 +446,33 @@ async def unfollow_user(follower_id: str, followee_id: str) -> bool:
     return result.deleted_count > 0
 
 
+async def get_followers_among(user_id: str, candidate_ids: List[str]) -> List[str]:
+    """
+    Get which of the given users follow a user.
+    
+    Args:
+        user_id: Followed user ID
+        candidate_ids: User IDs to check
+        
+    Returns:
+        IDs of the candidates following the user
+    """
+    if not candidate_ids:
+        return []
+    
+    db = await get_database()
+    
+    cursor = db.follows.find(
+        {
+            "followee_id": ObjectId(user_id),
+            "follower_id": {"$in": [ObjectId(candidate_id) for candidate_id in candidate_ids]}
+        },
+        {"_id": 0, "follower_id": 1}
+    )
+    
+    return [str(follow["follower_id"]) async for follow in cursor]
+
+
 async def get_social_feed(
     user_id: str,
     feed_type: str = "following",
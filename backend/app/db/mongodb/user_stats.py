@@ -0,0 +1,331 @@
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.db.mongodb.mongodb import get_database
+from app.models.goal import GoalStatus
+
+# Users reconciled per batch
+RECONCILE_BATCH_SIZE = 500
+
+# Write counter bumped by every goal write, keying cached goal indexes
+GOALS_VERSION = "goals"
+
+
+def empty_user_stats() -> Dict[str, Any]:
+    """Counters of a user without any data."""
+    return {
+        "goals": {"total": 0, "by_status": {status.value: 0 for status in GoalStatus}, "progress_sum": 0},
+        "workouts": {"count": 0, "duration": 0, "calories_burned": 0},
+        "posts": {"count": 0},
+        "food_logs": {"count": 0},
+        "notifications": {"unread": 0}
+    }
+
+
+def goal_status_increments(
+    previous_status: Optional[str],
+    status: Optional[str],
+    previous_progress: Optional[float] = None,
+    progress: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    Counter changes for a goal being created, deleted, changing status or
+    (while in progress) changing its progress percentage.
+
+    Args:
+        previous_status: Status before the write (None on create)
+        status: Status after the write (None on delete)
+        previous_progress: Progress percentage before the write
+        progress: Progress percentage after the write
+
+    Returns:
+        $inc document
+    """
+    previous_status = GoalStatus(previous_status).value if previous_status else None
+    status = GoalStatus(status).value if status else None
+
+    increments: Dict[str, float] = {}
+
+    # Sum of the progress of in-progress goals, for their average
+    in_progress = GoalStatus.IN_PROGRESS.value
+    progress_delta = (
+        ((progress or 0) if status == in_progress else 0)
+        - ((previous_progress or 0) if previous_status == in_progress else 0)
+    )
+    if progress_delta:
+        increments["goals.progress_sum"] = progress_delta
+
+    if previous_status == status:
+        return increments
+
+    if previous_status is None:
+        increments["goals.total"] = 1
+    else:
+        increments[f"goals.by_status.{previous_status}"] = -1
+
+    if status is None:
+        increments["goals.total"] = -1
+    else:
+        increments[f"goals.by_status.{status}"] = 1
+
+    return increments
+
+
+def workout_increments(previous: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Counter changes for a workout being created, edited or deleted.
+
+    Args:
+        previous: Workout before the write (None on create)
+        current: Workout after the write (None on delete)
+
+    Returns:
+        $inc document
+    """
+    increments: Dict[str, float] = {}
+    if previous is None:
+        increments["workouts.count"] = 1
+    if current is None:
+        increments["workouts.count"] = -1
+
+    for field in ("duration", "calories_burned"):
+        delta = ((current or {}).get(field) or 0) - ((previous or {}).get(field) or 0)
+        if delta:
+            increments[f"workouts.{field}"] = delta
+
+    return increments
+
+
+async def increment_user_stats(user_id: str, increments: Dict[str, float]) -> None:
+    """
+    Apply counter changes to a user's stats document.
+
+    Args:
+        user_id: User ID
+        increments: $inc document, e.g. {"posts.count": 1}
+    """
+    if not increments:
+        return
+
+    db = await get_database()
+
+    await db.user_stats.update_one(
+        {"_id": ObjectId(user_id)},
+        {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+async def bump_data_version(user_id: str, source: str) -> None:
+    """
+    Advance a user's write counter for a cached data source.
+
+    Caches key their entries by the counter, so a write in one worker makes
+    every worker's cached copy unreachable on its next read.
+
+    Args:
+        user_id: User ID
+        source: Counter name, e.g. "measurements"
+    """
+    await increment_user_stats(user_id, {f"versions.{source}": 1})
+
+
+async def get_data_version(user_id: str, source: str) -> int:
+    """
+    Read a user's write counter for a cached data source with one point read.
+
+    Args:
+        user_id: User ID
+        source: Counter name, e.g. "measurements"
+
+    Returns:
+        Counter value (0 before the first write)
+    """
+    db = await get_database()
+
+    stats = await db.user_stats.find_one({"_id": ObjectId(user_id)}, {f"versions.{source}": 1})
+    return (stats or {}).get("versions", {}).get(source, 0)
+
+
+async def bulk_increment_user_stats(increments_by_user: Dict[str, Dict[str, float]]) -> None:
+    """
+    Apply counter changes for many users in one bulk_write.
+
+    Args:
+        increments_by_user: $inc documents keyed by user ID
+    """
+    operations = [
+        UpdateOne(
+            {"_id": ObjectId(user_id)},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        for user_id, increments in increments_by_user.items()
+        if increments
+    ]
+    if not operations:
+        return
+
+    db = await get_database()
+    await db.user_stats.bulk_write(operations, ordered=False)
+
+
+async def get_user_stats(user_id: str) -> Dict[str, Any]:
+    """
+    Get a user's counters.
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        Stats with goals, workouts, posts, food_logs and notifications counters
+    """
+    db = await get_database()
+
+    stats = empty_user_stats()
+    stored = await db.user_stats.find_one({"_id": ObjectId(user_id)}, {"_id": 0, "updated_at": 0})
+
+    for section, counters in (stored or {}).items():
+        if section in stats:
+            stats[section].update(counters)
+
+    return stats
+
+
+async def compute_user_stats(user_ids: List[ObjectId]) -> Dict[ObjectId, Dict[str, Any]]:
+    """
+    Compute counters from the source collections for a batch of users.
+
+    Args:
+        user_ids: User IDs
+
+    Returns:
+        Stats keyed by user ID
+    """
+    db = await get_database()
+
+    stats = {user_id: empty_user_stats() for user_id in user_ids}
+    match = {"$match": {"user_id": {"$in": user_ids}}}
+
+    goals = db.goals.aggregate([
+        match,
+        {
+            "$group": {
+                "_id": {"user_id": "$user_id", "status": "$status"},
+                "count": {"$sum": 1},
+                "progress_sum": {"$sum": {"$ifNull": ["$progress_percentage", 0]}}
+            }
+        }
+    ])
+    async for group in goals:
+        user_goals = stats[group["_id"]["user_id"]]["goals"]
+        user_goals["total"] += group["count"]
+        user_goals["by_status"][group["_id"]["status"]] = group["count"]
+        if group["_id"]["status"] == GoalStatus.IN_PROGRESS.value:
+            user_goals["progress_sum"] = group["progress_sum"]
+
+    workouts = db.workouts.aggregate([
+        match,
+        {
+            "$group": {
+                "_id": "$user_id",
+                "count": {"$sum": 1},
+                "duration": {"$sum": {"$ifNull": ["$duration", 0]}},
+                "calories_burned": {"$sum": {"$ifNull": ["$calories_burned", 0]}}
+            }
+        }
+    ])
+    async for group in workouts:
+        user_id = group.pop("_id")
+        stats[user_id]["workouts"] = group
+
+    for collection, section in ((db.social_posts, "posts"), (db.food_logs, "food_logs")):
+        async for group in collection.aggregate([match, {"$group": {"_id": "$user_id", "count": {"$sum": 1}}}]):
+            stats[group["_id"]][section]["count"] = group["count"]
+
+    unread = db.notifications.aggregate([
+        {"$match": {"user_id": {"$in": user_ids}, "is_read": False}},
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}}}
+    ])
+    async for group in unread:
+        stats[group["_id"]]["notifications"]["unread"] = group["count"]
+
+    return stats
+
+
+def _flatten(stats: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    flat = {}
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+async def reconcile_user_stats(batch_size: int = RECONCILE_BATCH_SIZE, fix: bool = True) -> Dict[str, Any]:
+    """
+    Recompute user stats from source and report counters that drifted.
+
+    Users are processed in batches of batch_size: one read of the stored
+    stats and one aggregation per source collection per batch, then the
+    drift is corrected in one bulk_write. The stored stats are read first
+    and corrections are written as $inc of the drift, so increments applied
+    while the batch is computed are kept.
+
+    Args:
+        batch_size: Users per batch
+        fix: Correct drifted counters (report only when False)
+
+    Returns:
+        Dictionary with the number of users checked and drifted, the total
+        drift per counter and whether fixes were written
+    """
+    db = await get_database()
+
+    report: Dict[str, Any] = {"users": 0, "drifted": 0, "drift": {}, "fixed": fix}
+
+    async def reconcile_batch(user_ids: List[ObjectId]) -> None:
+        stored = {
+            document.pop("_id"): document
+            async for document in db.user_stats.find({"_id": {"$in": user_ids}}, {"updated_at": 0})
+        }
+        computed = await compute_user_stats(user_ids)
+
+        operations: List[UpdateOne] = []
+        for user_id, expected in computed.items():
+            actual = _flatten(stored.get(user_id, {}))
+            corrections = {}
+
+            for field, value in _flatten(expected).items():
+                delta = actual.get(field, 0) - value
+                # progress_sum is a float sum; ignore rounding noise
+                if abs(delta) > 1e-6:
+                    corrections[field] = -delta
+                    report["drift"][field] = report["drift"].get(field, 0) + delta
+
+            if corrections:
+                report["drifted"] += 1
+                operations.append(UpdateOne(
+                    {"_id": user_id},
+                    {"$inc": corrections, "$set": {"updated_at": datetime.utcnow()}},
+                    upsert=True
+                ))
+
+        report["users"] += len(user_ids)
+        if fix and operations:
+            await db.user_stats.bulk_write(operations, ordered=False)
+
+    batch: List[ObjectId] = []
+    async for user in db.users.find({}, {"_id": 1}).sort("_id", 1):
+        batch.append(user["_id"])
+        if len(batch) >= batch_size:
+            await reconcile_batch(batch)
+            batch = []
+
+    if batch:
+        await reconcile_batch(batch)
+
+    return report
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 
 from app.models.user import UserInDB, UserCreate, UserUpdate, User
@@ -118,13 +119,15 @@ async def update_user(user_id: str, user_update: UserUpdate) -> Optional[UserInD
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Update the user
-    await db.users.update_one(
+    # Update the user and get the updated document in one round-trip
+    user_data = await db.users.find_one_and_update(
         {"_id": ObjectId(user_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
-    
-    return await get_user_by_id(user_id)
+    if user_data:
+        return UserInDB(**user_data)
+    return None
 
 
 async def delete_user(user_id: str) -> bool:
@@ -1,10 +1,32 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.models.workout import WorkoutCreate, WorkoutUpdate, WorkoutInDB, Workout, WorkoutWithUserInfo
 from app.db.mongodb.mongodb import get_database
+from app.models.mongodb import compile_document_decoder
 from app.db.elasticsearch.sync import sync_workout
+from app.db.vector.sync import sync_workout_vector
+from app.core.signals import workout_saved
+from app.db.mongodb.user_stats import increment_user_stats, workout_increments
+
+# Fields of the Workout response model, projected by trusted list reads
+WORKOUT_RESPONSE_PROJECTION = {
+    "user_id": 1,
+    "title": 1,
+    "description": 1,
+    "duration": 1,
+    "calories_burned": 1,
+    "exercises": 1,
+    "date": 1,
+    "created_at": 1,
+    "is_public": 1,
+    "likes_count": {"$size": {"$ifNull": ["$likes", []]}},
+    "comments_count": {"$size": {"$ifNull": ["$comments", []]}}
+}
+
+decode_workout = compile_document_decoder(("user_id",))
 
 
 async def create_workout(workout: WorkoutCreate, user_id: str) -> WorkoutInDB:
@@ -34,8 +56,13 @@ async def create_workout(workout: WorkoutCreate, user_id: str) -> WorkoutInDB:
     result = await db.workouts.insert_one(workout_in_db.dict(by_alias=True))
     workout_in_db.id = result.inserted_id
     
-    # Index in Elasticsearch
-    await sync_workout(workout_in_db.dict(by_alias=True))
+    workout_data = workout_in_db.dict(by_alias=True)
+    await increment_user_stats(user_id, workout_increments(None, workout_data))
+    await workout_saved.send(user_id=user_id, previous=None, current=workout_data)
+    
+    # Index in the vector index and Elasticsearch
+    await sync_workout_vector(workout_data)
+    await sync_workout(workout_data)
     
     return workout_in_db
 
@@ -78,19 +105,26 @@ async def update_workout(workout_id: str, workout_update: WorkoutUpdate) -> Opti
     # Add updated_at timestamp
     update_data["updated_at"] = datetime.utcnow()
     
-    # Update the workout
-    result = await db.workouts.update_one(
+    # Update the workout and get the previous document in one round-trip;
+    # goal progress needs both versions and $set makes the new one exact
+    previous_data = await db.workouts.find_one_and_update(
         {"_id": ObjectId(workout_id)},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count:
-        # Get the updated workout
-        updated_workout = await get_workout_by_id(workout_id)
+    if previous_data:
+        workout_data = {**previous_data, **update_data}
+        updated_workout = WorkoutInDB(**workout_data)
         
-        # Update in Elasticsearch
-        if updated_workout:
-            await sync_workout(updated_workout.dict(by_alias=True), operation="update")
+        await increment_user_stats(str(workout_data["user_id"]), workout_increments(previous_data, workout_data))
+        await workout_saved.send(
+            user_id=str(workout_data["user_id"]), previous=previous_data, current=workout_data
+        )
+        
+        # Update in the vector index and Elasticsearch
+        await sync_workout_vector(workout_data, operation="update")
+        await sync_workout(workout_data, operation="update")
             
         return updated_workout
     
@@ -109,13 +143,20 @@ async def delete_workout(workout_id: str) -> bool:
     """
     db = await get_database()
     
-    result = await db.workouts.delete_one({"_id": ObjectId(workout_id)})
+    deleted_workout = await db.workouts.find_one_and_delete(
+        {"_id": ObjectId(workout_id)},
+        projection={"user_id": 1, "date": 1, "duration": 1, "calories_burned": 1}
+    )
     
-    # Delete from Elasticsearch
-    if result.deleted_count:
+    if deleted_workout:
+        await increment_user_stats(str(deleted_workout["user_id"]), workout_increments(deleted_workout, None))
+        await workout_saved.send(user_id=str(deleted_workout["user_id"]), previous=deleted_workout, current=None)
+        
+        # Delete from the vector index and Elasticsearch
+        await sync_workout_vector({"_id": workout_id}, operation="delete")
         await sync_workout({"_id": workout_id}, operation="delete")
         
-    return result.deleted_count > 0
+    return deleted_workout is not None
 
 
 async def get_user_workouts(
@@ -123,8 +164,9 @@ async def get_user_workouts(
     skip: int = 0, 
     limit: int = 100,
     sort_by: str = "date",
-    sort_direction: int = -1
-) -> List[WorkoutInDB]:
+    sort_direction: int = -1,
+    trusted: bool = False
+) -> Union[List[WorkoutInDB], List[Dict[str, Any]]]:
     """
     Get a user's workouts with pagination.
     
@@ -134,25 +176,67 @@ async def get_user_workouts(
         limit: Maximum number of workouts to return
         sort_by: Field to sort by
         sort_direction: Sort direction (1 for ascending, -1 for descending)
+        trusted: Skip model validation and return projected dicts shaped
+            like the Workout response model
         
     Returns:
         List of workouts
     """
     db = await get_database()
-    workouts = []
     
+    projection = WORKOUT_RESPONSE_PROJECTION if trusted else None
     cursor = db.workouts.find(
-        {"user_id": ObjectId(user_id)}
+        {"user_id": ObjectId(user_id)},
+        projection
     ).sort(
         sort_by, sort_direction
     ).skip(skip).limit(limit)
     
+    if trusted:
+        return [decode_workout(workout_data) async for workout_data in cursor]
+    
+    workouts = []
     async for workout_data in cursor:
         workouts.append(WorkoutInDB(**workout_data))
     
     return workouts
 
 
+async def get_workout_frequency(user_id: str, since: datetime) -> Dict[str, Any]:
+    """
+    Summarize a user's workouts since a date.
+
+    Args:
+        user_id: User ID
+        since: First workout date included
+
+    Returns:
+        Dictionary with the number of workouts, active days, total duration
+        and calories burned
+    """
+    db = await get_database()
+
+    pipeline = [
+        {"$match": {"user_id": ObjectId(user_id), "date": {"$gte": since}}},
+        {
+            "$group": {
+                "_id": None,
+                "count": {"$sum": 1},
+                "days": {"$addToSet": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}},
+                "duration": {"$sum": {"$ifNull": ["$duration", 0]}},
+                "calories_burned": {"$sum": {"$ifNull": ["$calories_burned", 0]}}
+            }
+        },
+        {"$project": {"_id": 0, "count": 1, "active_days": {"$size": "$days"}, "duration": 1, "calories_burned": 1}}
+    ]
+
+    summaries = await db.workouts.aggregate(pipeline).to_list(length=1)
+    if summaries:
+        return summaries[0]
+
+    return {"count": 0, "active_days": 0, "duration": 0, "calories_burned": 0}
+
+
 async def get_public_workouts(
     skip: int = 0, 
     limit: int = 100,
@@ -231,21 +315,20 @@ async def like_workout(workout_id: str, user_id: str) -> bool:
     """
     db = await get_database()
     
-    result = await db.workouts.update_one(
+    workout_data = await db.workouts.find_one_and_update(
         {
             "_id": ObjectId(workout_id),
             "likes": {"$ne": ObjectId(user_id)}
         },
-        {"$addToSet": {"likes": ObjectId(user_id)}}
+        {"$addToSet": {"likes": ObjectId(user_id)}},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
+    if workout_data:
         # Update in Elasticsearch
-        workout = await get_workout_by_id(workout_id)
-        if workout:
-            await sync_workout(workout.dict(by_alias=True), operation="update")
+        await sync_workout(workout_data, operation="update")
             
-    return result.modified_count > 0
+    return workout_data is not None
 
 
 async def unlike_workout(workout_id: str, user_id: str) -> bool:
@@ -261,18 +344,20 @@ async def unlike_workout(workout_id: str, user_id: str) -> bool:
     """
     db = await get_database()
     
-    result = await db.workouts.update_one(
-        {"_id": ObjectId(workout_id)},
-        {"$pull": {"likes": ObjectId(user_id)}}
+    workout_data = await db.workouts.find_one_and_update(
+        {
+            "_id": ObjectId(workout_id),
+            "likes": ObjectId(user_id)
+        },
+        {"$pull": {"likes": ObjectId(user_id)}},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
+    if workout_data:
         # Update in Elasticsearch
-        workout = await get_workout_by_id(workout_id)
-        if workout:
-            await sync_workout(workout.dict(by_alias=True), operation="update")
+        await sync_workout(workout_data, operation="update")
             
-    return result.modified_count > 0
+    return workout_data is not None
 
 
 async def add_comment_to_workout(
@@ -301,16 +386,15 @@ async def add_comment_to_workout(
         "created_at": datetime.utcnow()
     }
     
-    result = await db.workouts.update_one(
+    workout_data = await db.workouts.find_one_and_update(
         {"_id": ObjectId(workout_id)},
-        {"$push": {"comments": comment}}
+        {"$push": {"comments": comment}},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count:
+    if workout_data:
         # Update in Elasticsearch
-        workout = await get_workout_by_id(workout_id)
-        if workout:
-            await sync_workout(workout.dict(by_alias=True), operation="update")
+        await sync_workout(workout_data, operation="update")
             
         # Return the comment with string IDs
         comment["_id"] = str(comment["_id"])
@@ -0,0 +1,111 @@
+import re
+import zlib
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from app.core.config import settings
+
+# Concept lexicon mapping related fitness and food terms onto shared features,
+# so "leg day" and "squats, lunges" land close together without a language model.
+CONCEPT_LEXICON: Dict[str, List[str]] = {
+    "legs": ["leg", "squat", "lunge", "deadlift", "calf", "calve", "hamstring", "quad", "glute",
+             "step", "hip", "thrust", "split"],
+    "chest": ["chest", "bench", "pushup", "push", "fly", "flye", "dip", "pec"],
+    "back": ["back", "row", "pullup", "pull", "lat", "chinup", "chin", "deadlift", "shrug"],
+    "shoulders": ["shoulder", "overhead", "military", "lateral", "raise", "delt", "press"],
+    "arms": ["arm", "curl", "bicep", "tricep", "extension", "skull", "hammer"],
+    "core": ["core", "ab", "abs", "plank", "crunch", "situp", "twist", "oblique"],
+    "cardio": ["cardio", "run", "running", "jog", "sprint", "cycle", "cycling", "bike", "swim",
+               "hiit", "treadmill", "elliptical", "interval", "rowing"],
+    "mobility": ["yoga", "stretch", "mobility", "pilates", "flexibility", "foam"],
+    "strength": ["strength", "powerlifting", "heavy", "max", "pr", "barbell", "dumbbell"],
+    "protein_foods": ["chicken", "beef", "egg", "tuna", "salmon", "turkey", "tofu", "whey",
+                      "protein", "fish", "pork", "shrimp"],
+    "fruit": ["fruit", "banana", "apple", "berry", "berrie", "orange", "mango", "grape"],
+    "vegetables": ["vegetable", "veggie", "broccoli", "spinach", "salad", "carrot", "kale",
+                   "pepper", "tomato"],
+    "grains": ["grain", "rice", "oat", "oatmeal", "bread", "pasta", "quinoa", "toast", "cereal"],
+    "dairy": ["dairy", "milk", "yogurt", "yoghurt", "cheese", "cottage"]
+}
+
+# Weight of concept features relative to plain token features
+CONCEPT_WEIGHT = 2.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_CONCEPTS_BY_TERM: Dict[str, List[str]] = {}
+for _concept, _terms in CONCEPT_LEXICON.items():
+    for _term in _terms:
+        _CONCEPTS_BY_TERM.setdefault(_term, []).append(_concept)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase tokens with a light plural stemming.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        List of tokens
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _hash_feature(feature: str, dim: int) -> tuple:
+    """Map a feature to a (column, sign) pair with a process-independent hash."""
+    value = zlib.crc32(feature.encode())
+    return value % dim, 1.0 if (value >> 31) & 1 else -1.0
+
+
+def embed_text(text: str, dim: int = settings.VECTOR_DIM) -> np.ndarray:
+    """
+    Embed text with a signed hashing vectorizer over tokens, bigrams and concepts.
+    
+    Args:
+        text: Input text
+        dim: Vector dimension
+        
+    Returns:
+        L2-normalized float32 vector (all zeros for empty text)
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    tokens = tokenize(text)
+    
+    features = [(f"t:{token}", 1.0) for token in tokens]
+    features.extend((f"b:{first}_{second}", 0.5) for first, second in zip(tokens, tokens[1:]))
+    for token in tokens:
+        for concept in _CONCEPTS_BY_TERM.get(token, ()):
+            features.append((f"c:{concept}", CONCEPT_WEIGHT))
+    
+    for feature, weight in features:
+        column, sign = _hash_feature(feature, dim)
+        vector[column] += sign * weight
+    
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def embed_texts(texts: Iterable[str], dim: int = settings.VECTOR_DIM) -> np.ndarray:
+    """
+    Embed several texts into a float32 matrix, one row per text.
+    
+    Args:
+        texts: Input texts
+        dim: Vector dimension
+        
+    Returns:
+        Matrix of shape (len(texts), dim)
+    """
+    rows = [embed_text(text, dim) for text in texts]
+    if not rows:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.vstack(rows)
@@ -0,0 +1,262 @@
+import fcntl
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class VectorIndex:
+    """
+    Brute-force cosine similarity index over a memory-mapped float32 matrix.
+
+    Vectors live in "<name>.f32" (one row per document) and the row -> key mapping
+    in an append-only journal "<name>.ids". Each journal line is "<row>\t<key>";
+    an empty key frees the row. Writes touch one matrix row and append one journal
+    line, and readers in other worker processes pick up new rows by replaying the
+    journal tail before searching.
+
+    Worker processes coordinate through an flock on "<name>.lock": writers hold it
+    exclusively across the journal replay, row allocation and journal append, so
+    two processes never claim the same row, and readers hold it shared. The lock
+    file also stores a generation number that clear() bumps, telling the other
+    processes to drop their row mapping. Methods block on file I/O; async callers
+    run them in a thread.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, name: str, dim: int, directory: str):
+        """
+        Args:
+            name: Index name used for the file names
+            dim: Vector dimension
+            directory: Directory holding the index files
+        """
+        self.name = name
+        self.dim = dim
+        self.directory = Path(directory)
+        self.vectors_path = self.directory / f"{name}.f32"
+        self.journal_path = self.directory / f"{name}.ids"
+        self.lock_path = self.directory / f"{name}.lock"
+
+        # Serializes threads of this process; flock only coordinates processes
+        self._lock = threading.RLock()
+        self._generation = ""
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget the mapped matrix and the row mapping."""
+        self._matrix: Optional[np.memmap] = None
+        self._capacity = 0
+        self._keys: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._free_rows: List[int] = []
+        self._journal_offset = 0
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator:
+        """
+        Hold the index lock and catch up with other processes.
+
+        Args:
+            exclusive: Take the write lock instead of the shared read lock
+
+        Yields:
+            The open lock file
+        """
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a+", encoding="utf-8") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    lock_file.seek(0)
+                    generation = lock_file.read().strip()
+                    if generation != self._generation:
+                        # Another process cleared the index since our last access
+                        self._reset()
+                        self._generation = generation
+                    self._ensure_open()
+                    yield lock_file
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _ensure_open(self) -> None:
+        """Open (or create) the index files on first use and catch up with other writers."""
+        if self._matrix is None:
+            if not self.vectors_path.exists():
+                self._resize_file(self.INITIAL_CAPACITY)
+            self.journal_path.touch(exist_ok=True)
+            self._map_matrix()
+        self.refresh()
+
+    def _resize_file(self, capacity: int) -> None:
+        """Grow the vectors file to hold capacity rows (new rows are zero-filled)."""
+        with open(self.vectors_path, "ab") as vectors_file:
+            vectors_file.truncate(capacity * self.dim * 4)
+
+    def _map_matrix(self) -> None:
+        """Memory-map the vectors file at its current size."""
+        size = os.path.getsize(self.vectors_path)
+        self._capacity = size // (self.dim * 4)
+        self._matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r+", shape=(self._capacity, self.dim)
+        )
+
+    def refresh(self) -> None:
+        """Replay journal entries and remap the matrix if another process grew the files."""
+        if os.path.getsize(self.vectors_path) // (self.dim * 4) != self._capacity:
+            self._map_matrix()
+
+        if os.path.getsize(self.journal_path) == self._journal_offset:
+            return
+
+        with open(self.journal_path, "r", encoding="utf-8") as journal:
+            journal.seek(self._journal_offset)
+            for line in journal:
+                if not line.endswith("\n"):
+                    # Partially written line; replay it on the next refresh
+                    break
+                self._journal_offset += len(line.encode("utf-8"))
+                row_text, _, key = line.rstrip("\n").partition("\t")
+                self._apply(int(row_text), key or None)
+
+    def _apply(self, row: int, key: Optional[str]) -> None:
+        """Apply one journal entry to the in-memory row mapping."""
+        while len(self._keys) <= row:
+            self._keys.append(None)
+
+        previous = self._keys[row]
+        if previous is not None and self._rows.get(previous) == row:
+            del self._rows[previous]
+
+        self._keys[row] = key
+        if key is None:
+            self._free_rows.append(row)
+        else:
+            self._rows[key] = row
+            if row in self._free_rows:
+                self._free_rows.remove(row)
+
+    def _journal(self, row: int, key: Optional[str]) -> None:
+        """Append a journal entry and apply it locally."""
+        line = f"{row}\t{key or ''}\n"
+        with open(self.journal_path, "a", encoding="utf-8") as journal:
+            journal.write(line)
+        self._journal_offset += len(line.encode("utf-8"))
+        self._apply(row, key)
+
+    def _upsert(self, key: str, vector: np.ndarray) -> None:
+        """Write a vector; the caller holds the exclusive lock."""
+        row = self._rows.get(key)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows[-1]
+            else:
+                row = len(self._keys)
+                if row >= self._capacity:
+                    self._matrix.flush()
+                    self._resize_file(max(self._capacity * 2, self.INITIAL_CAPACITY))
+                    self._map_matrix()
+
+        self._matrix[row] = vector
+
+        if self._rows.get(key) != row:
+            self._matrix.flush()
+            self._journal(row, key)
+
+    def upsert(self, key: str, vector: np.ndarray) -> None:
+        """
+        Insert or replace the vector stored for a key.
+
+        Args:
+            key: Document key
+            vector: Normalized vector of size dim
+        """
+        with self._locked(exclusive=True):
+            self._upsert(key, vector)
+            self._matrix.flush()
+
+    def upsert_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """
+        Insert or replace several vectors under one lock.
+
+        Args:
+            items: (key, normalized vector) pairs
+        """
+        with self._locked(exclusive=True):
+            for key, vector in items:
+                self._upsert(key, vector)
+            self._matrix.flush()
+
+    def delete(self, key: str) -> bool:
+        """
+        Remove the vector stored for a key.
+
+        Args:
+            key: Document key
+
+        Returns:
+            True if the key was present
+        """
+        with self._locked(exclusive=True):
+            row = self._rows.get(key)
+            if row is None:
+                return False
+
+            self._matrix[row] = 0.0
+            self._matrix.flush()
+            self._journal(row, None)
+            return True
+
+    def search(self, vector: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Find the k stored vectors with the highest cosine similarity.
+
+        Args:
+            vector: Normalized query vector
+            k: Number of results
+
+        Returns:
+            List of (key, similarity) pairs, best first
+        """
+        with self._locked(exclusive=False):
+            used = len(self._keys)
+            if used == 0 or k <= 0 or not vector.any():
+                return []
+
+            scores = np.asarray(self._matrix[:used]) @ vector
+            for row in self._free_rows:
+                scores[row] = -np.inf
+
+            k = min(k, used)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                (self._keys[row], float(scores[row]))
+                for row in top
+                if self._keys[row] is not None and scores[row] > 0
+            ]
+
+    def clear(self) -> None:
+        """Delete the index files so the index can be rebuilt from scratch."""
+        with self._locked(exclusive=True) as lock_file:
+            for path in (self.vectors_path, self.journal_path):
+                if path.exists():
+                    path.unlink()
+
+            generation = str(int(self._generation or 0) + 1)
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(generation)
+            lock_file.flush()
+
+            self._reset()
+            self._generation = generation
+
+    def __len__(self) -> int:
+        with self._locked(exclusive=False):
+            return len(self._rows)
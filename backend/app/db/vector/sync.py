@@ -0,0 +1,139 @@
+import asyncio
+from typing import Dict, List, Any
+
+from app.core.config import settings
+from app.db.vector.embeddings import embed_text
+from app.db.vector.index import VectorIndex
+
+# Memory-mapped vector indices, opened lazily on first use
+workout_vectors = VectorIndex("workouts", settings.VECTOR_DIM, settings.VECTOR_INDEX_DIR)
+food_vectors = VectorIndex("foods", settings.VECTOR_DIM, settings.VECTOR_INDEX_DIR)
+
+
+def workout_text(workout: Dict[str, Any]) -> str:
+    """
+    Build the text embedded for a workout from its title, description and exercise names.
+    
+    Args:
+        workout: Workout document
+        
+    Returns:
+        Text to embed
+    """
+    parts = [workout.get("title") or "", workout.get("description") or ""]
+    for exercise in workout.get("exercises") or []:
+        parts.append(exercise.get("name") or "")
+    return " ".join(part for part in parts if part)
+
+
+def food_key(name: str) -> str:
+    """
+    Normalize a food name into a food vector key.
+    
+    Args:
+        name: Food name
+        
+    Returns:
+        Normalized key
+    """
+    return " ".join(name.lower().split())
+
+
+async def sync_workout_vector(workout: Dict[str, Any], operation: str = "index") -> None:
+    """
+    Sync a workout document to the workout vector index.
+    
+    Args:
+        workout: Workout document
+        operation: Operation type (index, update, delete)
+    """
+    if not workout:
+        return
+    
+    doc_id = str(workout.get("_id", workout.get("id")))
+    if not doc_id:
+        return
+    
+    # Index files are locked and written in a thread to keep the event loop free
+    if operation == "delete":
+        await asyncio.to_thread(workout_vectors.delete, doc_id)
+    else:
+        await asyncio.to_thread(workout_vectors.upsert, doc_id, embed_text(workout_text(workout)))
+
+
+async def sync_food_vectors(food_log: Dict[str, Any]) -> None:
+    """
+    Add the food names of a food log to the food vector index.
+    
+    Foods are keyed by normalized name, so each distinct food is embedded once.
+    
+    Args:
+        food_log: Food log document
+    """
+    if not food_log:
+        return
+    
+    keys = set()
+    for meal in food_log.get("meals") or []:
+        foods = meal.get("foods") if isinstance(meal, dict) else meal.foods
+        for food in foods or []:
+            name = food.get("name")
+            if name:
+                keys.add(food_key(name))
+    
+    if keys:
+        await asyncio.to_thread(food_vectors.upsert_many, [(key, embed_text(key)) for key in keys])
+
+
+async def search_workout_vectors(query: str, k: int = 10) -> List[tuple]:
+    """
+    Find workouts semantically similar to a query.
+    
+    Args:
+        query: Query text
+        k: Number of results
+        
+    Returns:
+        List of (workout_id, similarity) pairs, best first
+    """
+    return await asyncio.to_thread(workout_vectors.search, embed_text(query), k)
+
+
+async def search_similar_foods(query: str, k: int = 10) -> List[Dict[str, Any]]:
+    """
+    Find food names semantically similar to a query.
+    
+    Args:
+        query: Query text
+        k: Number of results
+        
+    Returns:
+        List of foods with name and similarity, best first
+    """
+    matches = await asyncio.to_thread(food_vectors.search, embed_text(query), k)
+    return [{"name": name, "similarity": similarity} for name, similarity in matches]
+
+
+async def rebuild_vector_indices() -> Dict[str, int]:
+    """
+    Rebuild the workout and food vector indices from MongoDB.
+    
+    Returns:
+        Dictionary with count of vectors written for each index
+    """
+    from app.db.mongodb.mongodb import get_database
+    
+    db = await get_database()
+    
+    await asyncio.to_thread(workout_vectors.clear)
+    async for workout in db.workouts.find({}, {"title": 1, "description": 1, "exercises.name": 1}):
+        await sync_workout_vector(workout)
+    
+    await asyncio.to_thread(food_vectors.clear)
+    async for food_log in db.food_logs.find({}, {"meals.foods.name": 1}):
+        await sync_food_vectors(food_log)
+    
+    return {
+        "workouts": await asyncio.to_thread(len, workout_vectors),
+        "foods": await asyncio.to_thread(len, food_vectors)
+    }
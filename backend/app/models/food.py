@@ -22,10 +22,34 @@ class FoodItem(BaseModel):
         populate_by_name = True
 
 
+class CatalogFoodInDB(FoodItem):
+    """Food catalog entry as stored in the database"""
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    brand: Optional[str] = None
+    source: str  # name of the nutrient database the entry was ingested from
+    source_id: str  # entry ID within the source database
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Config:
+        populate_by_name = True
+        json_encoders = {
+            ObjectId: str
+        }
+
+
+class CatalogFood(FoodItem):
+    """Food catalog entry returned to clients"""
+    id: str
+    brand: Optional[str] = None
+    source: str
+
+
 class MealBase(BaseModel):
     """Base meal model"""
     meal_type: str  # breakfast, lunch, dinner, snack
-    foods: List[Dict[str, Any]]  # List of food items with quantity
+    # Food items with quantity; either free-form nutrients or {"food_id", "quantity"}
+    # referencing the food catalog
+    foods: List[Dict[str, Any]]
     notes: Optional[str] = None
     
     class Config:
@@ -52,6 +76,9 @@ class FoodLogBase(BaseModel):
     total_protein: Optional[float] = None
     total_carbs: Optional[float] = None
     total_fat: Optional[float] = None
+    total_fiber: Optional[float] = None
+    total_sugar: Optional[float] = None
+    total_sodium: Optional[float] = None  # in mg
     water_intake: Optional[int] = None  # in milliliters
     notes: Optional[str] = None
     
@@ -71,6 +98,9 @@ class FoodLogUpdate(BaseModel):
     total_protein: Optional[float] = None
     total_carbs: Optional[float] = None
     total_fat: Optional[float] = None
+    total_fiber: Optional[float] = None
+    total_sugar: Optional[float] = None
+    total_sodium: Optional[float] = None  # in mg
     water_intake: Optional[int] = None
     notes: Optional[str] = None
 
@@ -22,6 +22,7 @@ class GoalStatus(str, Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     FAILED = "failed"
+    EXPIRED = "expired"  # Target date passed before completion
 
 
 class GoalBase(BaseModel):
@@ -62,7 +63,10 @@ class GoalInDB(GoalBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     current_value: Optional[float] = None
-    progress_history: List[Dict[str, Union[datetime, float]]] = []  # Track progress over time
+    progress_percentage: Optional[float] = None  # Kept current by the goal maintenance job
+    days_remaining: Optional[int] = None  # Kept current by the goal maintenance job
+    progress_history: List[Dict[str, Union[datetime, float]]] = []  # Latest points; full history in goal_progress
+    progress_stats: Optional[Dict[str, Any]] = None  # count, min, max, first_date, last_date of all points
     
     class Config:
         json_encoders = {
@@ -1,4 +1,4 @@
-from typing import Any, Annotated
+from typing import Any, Annotated, Callable, Dict, Iterable
 from bson import ObjectId
 from pydantic import BeforeValidator, ConfigDict
 
@@ -23,6 +23,33 @@ def validate_object_id(v: Any) -> ObjectId:
 PyObjectId = Annotated[str, BeforeValidator(validate_object_id)]
 
 
+def compile_document_decoder(object_id_fields: Iterable[str] = ("user_id",)) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Build a decoder turning raw documents into response-shaped dicts.
+    
+    Used by trusted reads, which skip per-document model validation: the
+    decoder renames _id to id and converts the given ObjectId fields to str
+    in place, with the field list resolved once instead of per document.
+    
+    Args:
+        object_id_fields: Fields holding an ObjectId, besides _id
+        
+    Returns:
+        Function decoding one document
+    """
+    fields = tuple(object_id_fields)
+    
+    def decode(document: Dict[str, Any]) -> Dict[str, Any]:
+        document["id"] = str(document.pop("_id"))
+        for field in fields:
+            value = document.get(field)
+            if value is not None:
+                document[field] = str(value)
+        return document
+    
+    return decode
+
+
 
 
 # Base class for MongoDB models
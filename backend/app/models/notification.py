@@ -0,0 +1,101 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from bson import ObjectId
+from app.models.user import PyObjectId
+from enum import Enum
+
+
+class NotificationType(str, Enum):
+    """Enum for notification types"""
+    WORKOUT_REMINDER = "workout_reminder"
+    GOAL_UPDATE = "goal_update"
+    SOCIAL = "social"
+    ACHIEVEMENT = "achievement"
+    SYSTEM = "system"
+
+
+class NotificationBase(BaseModel):
+    """Base notification model"""
+    title: str
+    message: str
+    type: NotificationType
+    metadata: Optional[Dict[str, Any]] = None  # Data specific to the notification type
+
+    class Config:
+        populate_by_name = True
+
+
+class NotificationCreate(NotificationBase):
+    """Notification creation model"""
+    pass
+
+
+class NotificationInDB(NotificationBase):
+    """Notification model as stored in the database"""
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    user_id: PyObjectId
+    is_read: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)  # Latest activity of aggregated notifications
+    group_key: Optional[str] = None  # Set on aggregated notifications
+    count: Optional[int] = None  # Activities collapsed into an aggregated notification
+    actors: Optional[List[Dict[str, Any]]] = None  # Most recent actors, newest first
+
+    class Config:
+        json_encoders = {
+            ObjectId: str
+        }
+
+
+class Notification(NotificationBase):
+    """Notification model returned to clients"""
+    id: str
+    user_id: str
+    is_read: bool
+    created_at: datetime
+    count: Optional[int] = None
+    actors: Optional[List[Dict[str, Any]]] = None
+
+    class Config:
+        orm_mode = True
+
+
+class NotificationSettingsBase(BaseModel):
+    """Base notification settings model"""
+    workout_reminders: bool = True
+    goal_updates: bool = True
+    social_interactions: bool = True
+    achievement_notifications: bool = True
+    system_notifications: bool = True
+    email_notifications: bool = True
+    push_notifications: bool = True
+
+
+class NotificationSettingsUpdate(BaseModel):
+    """Notification settings update model"""
+    workout_reminders: Optional[bool] = None
+    goal_updates: Optional[bool] = None
+    social_interactions: Optional[bool] = None
+    achievement_notifications: Optional[bool] = None
+    system_notifications: Optional[bool] = None
+    email_notifications: Optional[bool] = None
+    push_notifications: Optional[bool] = None
+
+
+class NotificationSettingsInDB(NotificationSettingsBase):
+    """Notification settings model as stored in the database"""
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    user_id: PyObjectId
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        populate_by_name = True
+        json_encoders = {
+            ObjectId: str
+        }
+
+
+class NotificationSettings(NotificationSettingsBase):
+    """Notification settings model returned to clients"""
+    updated_at: Optional[datetime] = None
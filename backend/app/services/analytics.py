@@ -0,0 +1,487 @@
+import inspect
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+from app.db.mongodb.export import iter_updated_document_batches
+from app.db.mongodb.food_catalog import ensure_catalog_foods
+from app.services.food import NUTRIENTS, build_nutrient_matrix, catalog_food_ids, meal_foods
+
+WATERMARKS_FILE = "_watermarks.json"
+
+# Watermarks trail the run start by this much, so writes that were in flight
+# (or stamped by an app server with a slightly slow clock) when a run read
+# its window are picked up by the next run. Rows near the boundary are
+# exported twice, which latest_snapshot_rows already drops.
+WATERMARK_SAFETY_MARGIN = timedelta(minutes=5)
+
+WORKOUT_SETS_SCHEMA = pa.schema([
+    ("workout_id", pa.string()),
+    ("user_id", pa.string()),
+    ("date", pa.timestamp("ms")),
+    ("title", pa.string()),
+    ("workout_duration", pa.int64()),
+    ("calories_burned", pa.int64()),
+    ("exercise_index", pa.int32()),
+    ("exercise", pa.string()),
+    ("sets", pa.int64()),
+    ("reps", pa.int64()),
+    ("duration", pa.int64()),
+    ("weight", pa.float64()),
+    ("volume", pa.float64()),
+    ("updated_at", pa.timestamp("ms"))
+])
+
+FOOD_ITEMS_SCHEMA = pa.schema([
+    ("food_log_id", pa.string()),
+    ("user_id", pa.string()),
+    ("date", pa.timestamp("ms")),
+    ("meal_type", pa.string()),
+    ("item_index", pa.int32()),
+    ("name", pa.string()),
+    ("food_id", pa.string()),
+    ("quantity", pa.float64()),
+    *[(nutrient, pa.float64()) for nutrient in NUTRIENTS],
+    ("updated_at", pa.timestamp("ms"))
+])
+
+MEASUREMENTS_SCHEMA = pa.schema([
+    ("measurement_id", pa.string()),
+    ("user_id", pa.string()),
+    ("date", pa.timestamp("ms")),
+    ("weight", pa.float64()),
+    ("height", pa.float64()),
+    ("body_fat", pa.float64()),
+    ("chest", pa.float64()),
+    ("waist", pa.float64()),
+    ("hips", pa.float64()),
+    ("arms_left", pa.float64()),
+    ("arms_right", pa.float64()),
+    ("legs_left", pa.float64()),
+    ("legs_right", pa.float64()),
+    ("updated_at", pa.timestamp("ms"))
+])
+
+GOALS_SCHEMA = pa.schema([
+    ("goal_id", pa.string()),
+    ("user_id", pa.string()),
+    ("date", pa.timestamp("ms")),  # goal creation time
+    ("title", pa.string()),
+    ("goal_type", pa.string()),
+    ("status", pa.string()),
+    ("target_value", pa.float64()),
+    ("start_value", pa.float64()),
+    ("current_value", pa.float64()),
+    ("target_date", pa.timestamp("ms")),
+    ("updated_at", pa.timestamp("ms"))
+])
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    """Convert stored dates to datetimes for timestamp columns."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    return None
+
+
+def _side(value: Any, side: str) -> Optional[float]:
+    """Read one side of a {"left": ..., "right": ...} measurement."""
+    return value.get(side) if isinstance(value, dict) else None
+
+
+def workout_set_rows(workouts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Explode workouts into one row per exercise (set group).
+
+    A workout without exercises gets one row with a null exercise_index,
+    so it still supersedes the rows of its earlier exports.
+
+    Args:
+        workouts: Workout documents
+
+    Returns:
+        Rows matching WORKOUT_SETS_SCHEMA
+    """
+    rows = []
+    for workout in workouts:
+        workout_row = {
+            "workout_id": str(workout["_id"]),
+            "user_id": str(workout.get("user_id")),
+            "date": _timestamp(workout.get("date")),
+            "title": workout.get("title"),
+            "workout_duration": workout.get("duration"),
+            "calories_burned": workout.get("calories_burned"),
+            "updated_at": _timestamp(workout.get("updated_at"))
+        }
+        exercises = workout.get("exercises") or []
+        if not exercises:
+            # Supersedes the rows of earlier exports of the workout
+            rows.append({**workout_row, "exercise_index": None})
+        for index, exercise in enumerate(exercises):
+            sets = exercise.get("sets")
+            reps = exercise.get("reps")
+            weight = exercise.get("weight")
+            rows.append({
+                **workout_row,
+                "exercise_index": index,
+                "exercise": exercise.get("name"),
+                "sets": sets,
+                "reps": reps,
+                "duration": exercise.get("duration"),
+                "weight": weight,
+                "volume": sets * reps * weight if sets and reps and weight else None
+            })
+    return rows
+
+
+async def food_item_rows(food_logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Explode food logs into one row per food item with its nutrient totals.
+
+    Nutrients are computed with the nutrition engine, so items referencing
+    the food catalog get catalog values. A food log without items gets one
+    row with a null item_index, so it still supersedes the rows of its
+    earlier exports.
+
+    Args:
+        food_logs: Food log documents
+
+    Returns:
+        Rows matching FOOD_ITEMS_SCHEMA
+    """
+    await ensure_catalog_foods(
+        catalog_food_ids(meal for food_log in food_logs for meal in food_log.get("meals") or [])
+    )
+
+    items = []
+    for food_log in food_logs:
+        for meal in food_log.get("meals") or []:
+            for index, food in enumerate(meal_foods(meal)):
+                items.append((food_log, meal, index, food))
+
+    matrix, quantities = build_nutrient_matrix([food for _, _, _, food in items])
+    totals = matrix * quantities[:, None]
+
+    itemized = {id(food_log) for food_log, _, _, _ in items}
+    rows = [
+        {
+            "food_log_id": str(food_log["_id"]),
+            "user_id": str(food_log.get("user_id")),
+            "date": _timestamp(food_log.get("date")),
+            "updated_at": _timestamp(food_log.get("updated_at"))
+        }
+        for food_log in food_logs
+        if id(food_log) not in itemized
+    ]
+    for (food_log, meal, index, food), item_totals, quantity in zip(items, totals, quantities):
+        rows.append({
+            "food_log_id": str(food_log["_id"]),
+            "user_id": str(food_log.get("user_id")),
+            "date": _timestamp(food_log.get("date")),
+            "meal_type": meal.get("meal_type"),
+            "item_index": index,
+            "name": food.get("name"),
+            "food_id": str(food["food_id"]) if food.get("food_id") else None,
+            "quantity": float(quantity),
+            **{nutrient: float(value) for nutrient, value in zip(NUTRIENTS, item_totals)},
+            "updated_at": _timestamp(food_log.get("updated_at"))
+        })
+    return rows
+
+
+def measurement_rows(measurements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Flatten measurements into one row each.
+
+    Args:
+        measurements: Measurement documents
+
+    Returns:
+        Rows matching MEASUREMENTS_SCHEMA
+    """
+    return [
+        {
+            "measurement_id": str(measurement["_id"]),
+            "user_id": str(measurement.get("user_id")),
+            "date": _timestamp(measurement.get("date")),
+            "weight": measurement.get("weight"),
+            "height": measurement.get("height"),
+            "body_fat": measurement.get("body_fat"),
+            "chest": measurement.get("chest"),
+            "waist": measurement.get("waist"),
+            "hips": measurement.get("hips"),
+            "arms_left": _side(measurement.get("arms"), "left"),
+            "arms_right": _side(measurement.get("arms"), "right"),
+            "legs_left": _side(measurement.get("legs"), "left"),
+            "legs_right": _side(measurement.get("legs"), "right"),
+            "updated_at": _timestamp(measurement.get("updated_at"))
+        }
+        for measurement in measurements
+    ]
+
+
+def goal_rows(goals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Flatten goals into one row each.
+
+    Args:
+        goals: Goal documents
+
+    Returns:
+        Rows matching GOALS_SCHEMA
+    """
+    return [
+        {
+            "goal_id": str(goal["_id"]),
+            "user_id": str(goal.get("user_id")),
+            "date": _timestamp(goal.get("created_at")),
+            "title": goal.get("title"),
+            "goal_type": goal.get("goal_type"),
+            "status": goal.get("status"),
+            "target_value": goal.get("target_value"),
+            "start_value": goal.get("start_value"),
+            "current_value": goal.get("current_value"),
+            "target_date": _timestamp(goal.get("target_date")),
+            "updated_at": _timestamp(goal.get("updated_at"))
+        }
+        for goal in goals
+    ]
+
+
+# Snapshot tables: name -> (source collection, schema, row builder, row key).
+# The first key column is the source document ID every row is exported with.
+SNAPSHOT_TABLES: Dict[str, Tuple[str, pa.Schema, Callable, Tuple[str, ...]]] = {
+    "workout_sets": ("workouts", WORKOUT_SETS_SCHEMA, workout_set_rows, ("workout_id", "exercise_index")),
+    "food_items": ("food_logs", FOOD_ITEMS_SCHEMA, food_item_rows, ("food_log_id", "item_index")),
+    "measurements": ("measurements", MEASUREMENTS_SCHEMA, measurement_rows, ("measurement_id",)),
+    "goals": ("goals", GOALS_SCHEMA, goal_rows, ("goal_id",))
+}
+
+
+def latest_snapshot_rows(table: pa.Table, key_columns: Tuple[str, ...]) -> pa.Table:
+    """
+    Keep the current rows of a snapshot table read across all its parts.
+
+    Every export of a document writes all of its rows with the document's
+    updated_at, so only the rows carrying the latest updated_at of their
+    document are kept. This also drops exercises or items removed by an
+    edit and rows left in an old partition when the date changed. Rows
+    exported twice by overlapping runs are kept once, and the null-index
+    rows of documents without exercises or items are dropped.
+
+    Args:
+        table: Rows of the table, e.g. pq.read_table of its directory
+        key_columns: Row key of the table in SNAPSHOT_TABLES
+
+    Returns:
+        Current rows, in their original order
+    """
+    document_id = key_columns[0]
+    positions = pa.table({
+        **{column: table[column] for column in key_columns},
+        "_updated_at": pc.fill_null(table["updated_at"], pa.scalar(datetime(1970, 1, 1), pa.timestamp("ms"))),
+        "_row": pa.array(range(table.num_rows), pa.int64())
+    })
+
+    latest = positions.group_by(document_id).aggregate([("_updated_at", "max")])
+    positions = positions.join(latest.select([document_id, "_updated_at_max"]), document_id)
+    positions = positions.filter(pc.equal(positions["_updated_at"], positions["_updated_at_max"]))
+    if len(key_columns) > 1:
+        positions = positions.filter(pc.is_valid(positions[key_columns[1]]))
+
+    rows = positions.group_by(list(key_columns)).aggregate([("_row", "min")])["_row_min"]
+    return table.take(rows.take(pc.sort_indices(rows)))
+
+
+def read_snapshot_table(table: str, output_dir: Optional[str] = None) -> pa.Table:
+    """
+    Read the current rows of a snapshot table.
+
+    Args:
+        table: Table name in SNAPSHOT_TABLES
+        output_dir: Snapshot root directory (defaults to ANALYTICS_EXPORT_DIR)
+
+    Returns:
+        Rows deduplicated by latest_snapshot_rows
+    """
+    root = Path(output_dir or settings.ANALYTICS_EXPORT_DIR)
+    return latest_snapshot_rows(pq.read_table(root / table), SNAPSHOT_TABLES[table][3])
+
+
+class PartitionedParquetWriter:
+    """
+    Write record batches into year/month partitioned Parquet files.
+
+    Each run writes one file per touched partition,
+    "<table>/year=YYYY/month=MM/part-<run_id>.parquet". Files are written
+    under a temporary name and only renamed into place by commit(), so
+    readers never see a partial file. A full run commits with replace=True,
+    which drops the parts of earlier runs once the new ones are in place.
+    """
+
+    def __init__(self, directory: Path, schema: pa.Schema, run_id: str):
+        self.directory = directory
+        self.schema = schema
+        self.run_id = run_id
+        self._writers: Dict[Tuple[int, int], Tuple[pq.ParquetWriter, Path, Path]] = {}
+        self.rows_written = 0
+
+    def _writer(self, partition: Tuple[int, int]) -> pq.ParquetWriter:
+        if partition not in self._writers:
+            year, month = partition
+            partition_dir = self.directory / f"year={year:04d}" / f"month={month:02d}"
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            final_path = partition_dir / f"part-{self.run_id}.parquet"
+            temp_path = partition_dir / f".part-{self.run_id}.parquet.tmp"
+            self._writers[partition] = (pq.ParquetWriter(temp_path, self.schema), temp_path, final_path)
+        return self._writers[partition][0]
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Write rows as one record batch per partition.
+
+        Args:
+            rows: Rows matching the schema; partitioned by their "date" column
+        """
+        partitions: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+        for row in rows:
+            row_date = row.get("date") or row.get("updated_at")
+            partition = (row_date.year, row_date.month) if row_date else (0, 0)
+            partitions.setdefault(partition, []).append(row)
+
+        for partition, partition_rows in partitions.items():
+            batch = pa.RecordBatch.from_pylist(partition_rows, schema=self.schema)
+            self._writer(partition).write_batch(batch)
+            self.rows_written += batch.num_rows
+
+    def commit(self, replace: bool = False) -> None:
+        """
+        Close all files and move them into place.
+
+        Args:
+            replace: Delete the parts of earlier runs in every partition, so
+                the table holds only this run's rows (used by full runs,
+                which is how deleted documents leave the snapshot)
+        """
+        for writer, temp_path, final_path in self._writers.values():
+            writer.close()
+            os.replace(temp_path, final_path)
+        self._writers = {}
+
+        if replace and self.directory.exists():
+            current_part = f"part-{self.run_id}.parquet"
+            for path in self.directory.glob("year=*/month=*/part-*.parquet"):
+                if path.name != current_part:
+                    path.unlink()
+            for partition_dir in [*self.directory.glob("year=*/month=*"), *self.directory.glob("year=*")]:
+                if not any(partition_dir.iterdir()):
+                    partition_dir.rmdir()
+
+    def abort(self) -> None:
+        """Close and delete all files written by this run."""
+        for writer, temp_path, _ in self._writers.values():
+            writer.close()
+            temp_path.unlink(missing_ok=True)
+        self._writers = {}
+
+
+def load_watermarks(output_dir: Path) -> Dict[str, datetime]:
+    """
+    Load the last exported updated_at per table.
+
+    Args:
+        output_dir: Snapshot root directory
+
+    Returns:
+        Dictionary of table name -> watermark
+    """
+    path = output_dir / WATERMARKS_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as watermarks_file:
+        return {table: datetime.fromisoformat(value) for table, value in json.load(watermarks_file).items()}
+
+
+def save_watermarks(output_dir: Path, watermarks: Dict[str, datetime]) -> None:
+    """
+    Atomically save the watermarks of all tables.
+
+    Args:
+        output_dir: Snapshot root directory
+        watermarks: Dictionary of table name -> watermark
+    """
+    path = output_dir / WATERMARKS_FILE
+    temp_path = output_dir / f".{WATERMARKS_FILE}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as watermarks_file:
+        json.dump({table: value.isoformat() for table, value in watermarks.items()}, watermarks_file, indent=2)
+    os.replace(temp_path, path)
+
+
+async def run_analytics_snapshot(
+    tables: Optional[List[str]] = None,
+    output_dir: Optional[str] = None,
+    full: bool = False
+) -> Dict[str, int]:
+    """
+    Export documents changed since the last run into partitioned Parquet files.
+
+    Each table is read from the export connection pool in updated_at order
+    up to the start of the run and written with Arrow record batches. A
+    table's watermark only advances once its files are committed, and only
+    to WATERMARK_SAFETY_MARGIN before the run start. Updated documents are
+    exported again in later parts, with all of their rows, so consumers
+    keep the rows with the latest updated_at per source document ID
+    (workout_id, food_log_id, measurement_id or goal_id), not per row: see
+    latest_snapshot_rows and read_snapshot_table.
+
+    Incremental runs cannot see deleted documents. A full run rewrites
+    every partition of its tables and drops the older parts, so deletions
+    leave the snapshot; schedule one periodically (e.g. weekly).
+
+    Args:
+        tables: Tables to export (all of SNAPSHOT_TABLES when None)
+        output_dir: Snapshot root directory (defaults to ANALYTICS_EXPORT_DIR)
+        full: Ignore the watermarks and rewrite each table from scratch
+
+    Returns:
+        Dictionary of table name -> rows written
+    """
+    root = Path(output_dir or settings.ANALYTICS_EXPORT_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+
+    watermarks = load_watermarks(root)
+    run_started = datetime.utcnow()
+    run_id = run_started.strftime("%Y%m%dT%H%M%S")
+    rows_written = {}
+
+    for table in tables or list(SNAPSHOT_TABLES):
+        collection_name, schema, build_rows, _ = SNAPSHOT_TABLES[table]
+        writer = PartitionedParquetWriter(root / table, schema, run_id)
+        updated_after = None if full else watermarks.get(table)
+
+        try:
+            async for documents in iter_updated_document_batches(collection_name, updated_after, run_started):
+                rows = build_rows(documents)
+                if inspect.isawaitable(rows):
+                    rows = await rows
+                if rows:
+                    writer.write(rows)
+        except Exception:
+            writer.abort()
+            raise
+
+        writer.commit(replace=full)
+        watermarks[table] = run_started - WATERMARK_SAFETY_MARGIN
+        save_watermarks(root, watermarks)
+        rows_written[table] = writer.rows_written
+
+    return rows_written
@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.db.mongodb.export import EXPORT_COLLECTIONS, iter_user_documents
+
+# Encoded bytes buffered before a chunk is sent to the client
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+def json_default(value: Any) -> Any:
+    """
+    Encode BSON values that json.dumps doesn't handle.
+
+    Args:
+        value: Value to encode
+
+    Returns:
+        JSON-serializable value
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_ndjson_line(collection: str, document: Dict[str, Any]) -> str:
+    """
+    Encode a document as one NDJSON line tagged with its collection.
+
+    Args:
+        collection: Export collection name
+        document: Document
+
+    Returns:
+        JSON line ending in a newline
+    """
+    record = {"collection": collection, "id": document.pop("_id")}
+    record.update(document)
+    return json.dumps(record, default=json_default, separators=(",", ":")) + "\n"
+
+
+def csv_cell(value: Any) -> Any:
+    """
+    Convert a document value into a CSV cell; nested values become JSON.
+
+    Args:
+        value: Document value
+
+    Returns:
+        Cell value
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=json_default, separators=(",", ":"))
+    if isinstance(value, (ObjectId, datetime, date)):
+        return json_default(value)
+    return value
+
+
+class CsvLineEncoder:
+    """Encode rows as CSV lines, reusing one small buffer."""
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def encode(self, row: List[Any]) -> str:
+        self._writer.writerow(row)
+        line = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return line
+
+
+async def stream_user_export(
+    user_id: str,
+    collections: List[str],
+    export_format: str = "ndjson",
+    compress: bool = False,
+    batch_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream a user's history as NDJSON or CSV, optionally gzip-compressed.
+
+    Documents are encoded as they arrive from the cursor and flushed in
+    chunks of about EXPORT_CHUNK_SIZE bytes, so memory use doesn't grow with
+    the size of the history. CSV exports have one header per collection and
+    are meant for a single collection.
+
+    Args:
+        user_id: User ID
+        collections: Export collection names
+        export_format: "ndjson" or "csv"
+        compress: Gzip the stream on the fly
+        batch_size: Documents per cursor batch
+
+    Yields:
+        Chunks of encoded bytes
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 writes a gzip container
+    pending: List[str] = []
+    pending_size = 0
+
+    def flush() -> bytes:
+        nonlocal pending, pending_size
+        data = "".join(pending).encode("utf-8")
+        pending = []
+        pending_size = 0
+        return compressor.compress(data) if compressor else data
+
+    for collection in collections:
+        csv_encoder = None
+        columns = EXPORT_COLLECTIONS[collection][1]
+
+        if export_format == "csv":
+            csv_encoder = CsvLineEncoder()
+            pending.append(csv_encoder.encode(["id" if column == "_id" else column for column in columns]))
+
+        async for document in iter_user_documents(collection, user_id, batch_size):
+            if csv_encoder:
+                line = csv_encoder.encode([csv_cell(document.get(column)) for column in columns])
+            else:
+                line = encode_ndjson_line(collection, document)
+
+            pending.append(line)
+            pending_size += len(line)
+
+            if pending_size >= EXPORT_CHUNK_SIZE:
+                chunk = flush()
+                if chunk:
+                    yield chunk
+
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,205 @@
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from app.models.food import MealBase
+
+# Nutrients tracked per food item, in nutrient matrix column order
+NUTRIENTS = ("calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium")
+
+# Food log field holding the total of each nutrient
+TOTAL_FIELDS = tuple(f"total_{nutrient}" for nutrient in NUTRIENTS)
+
+
+def nutrient_vectors(foods: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Stack the nutrient values of food items into a (foods x NUTRIENTS) matrix.
+
+    Args:
+        foods: Food items or catalog foods (missing nutrients count as 0)
+
+    Returns:
+        Nutrient matrix
+    """
+    return np.array(
+        [[food.get(nutrient) or 0 for nutrient in NUTRIENTS] for food in foods],
+        dtype=np.float64
+    ).reshape(len(foods), len(NUTRIENTS))
+
+
+class NutrientCatalog:
+    """
+    In-memory lookup from catalog food ID to per-serving nutrient vector.
+
+    Rows of a (foods x NUTRIENTS) matrix are addressed through an ID -> row
+    index, so the nutrients of many referenced foods are gathered with a
+    single fancy-indexing operation.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.matrix = np.zeros((0, len(NUTRIENTS)), dtype=np.float64)
+
+    def load(self, foods: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replace the catalog contents.
+
+        Args:
+            foods: Catalog food documents
+        """
+        foods = list(foods)
+        self.index = {str(food["_id"]): row for row, food in enumerate(foods)}
+        self.names = [food.get("name") or "" for food in foods]
+        self.matrix = nutrient_vectors(foods)
+
+    def add(self, foods: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add or replace catalog foods.
+
+        Args:
+            foods: Catalog food documents
+        """
+        new_foods = []
+        for food in foods:
+            food_id = str(food["_id"])
+            row = self.index.get(food_id)
+            if row is None:
+                new_foods.append(food)
+            else:
+                self.names[row] = food.get("name") or ""
+                self.matrix[row] = nutrient_vectors([food])[0]
+
+        if new_foods:
+            start = len(self.names)
+            for offset, food in enumerate(new_foods):
+                self.index[str(food["_id"])] = start + offset
+                self.names.append(food.get("name") or "")
+            self.matrix = np.vstack([self.matrix, nutrient_vectors(new_foods)])
+
+    def name(self, food_id: str) -> Optional[str]:
+        """
+        Get the name of a catalog food.
+
+        Args:
+            food_id: Catalog food ID
+
+        Returns:
+            Food name or None if the food is not loaded
+        """
+        row = self.index.get(str(food_id))
+        return self.names[row] if row is not None else None
+
+    def __contains__(self, food_id: str) -> bool:
+        return str(food_id) in self.index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# Catalog nutrients shared by this worker process, loaded at startup
+food_catalog = NutrientCatalog()
+
+
+def meal_foods(meal: Union[MealBase, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Food items of a meal given as a model or a stored document."""
+    foods = meal.get("foods") if isinstance(meal, dict) else meal.foods
+    return foods or []
+
+
+def catalog_food_ids(meals: Iterable[Union[MealBase, Dict[str, Any]]]) -> Set[str]:
+    """
+    Collect the catalog food IDs referenced by a batch of meals.
+
+    Args:
+        meals: Meals as models or stored documents
+
+    Returns:
+        Set of catalog food IDs
+    """
+    return {str(food["food_id"]) for meal in meals for food in meal_foods(meal) if food.get("food_id")}
+
+
+def build_nutrient_matrix(foods: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build the nutrient matrix and quantity vector for a list of food items.
+
+    Items referencing a loaded catalog food by food_id take its nutrients from
+    the catalog; other items use their own values. Missing nutrients count as
+    0 and a missing quantity as 1.
+
+    Args:
+        foods: Food items with per-serving nutrients and an optional quantity
+
+    Returns:
+        Tuple of (food x nutrient matrix, quantity vector)
+    """
+    matrix = nutrient_vectors(foods)
+    quantities = np.array([food.get("quantity", 1) or 0 for food in foods], dtype=np.float64)
+
+    rows = np.array(
+        [food_catalog.index.get(str(food.get("food_id")), -1) for food in foods],
+        dtype=np.intp
+    )
+    referenced = rows >= 0
+    if referenced.any():
+        matrix[referenced] = food_catalog.matrix[rows[referenced]]
+
+    return matrix, quantities
+
+
+def format_totals(totals: np.ndarray) -> Dict[str, Any]:
+    """
+    Convert a nutrient totals vector into food log total fields.
+
+    Args:
+        totals: Vector of nutrient totals in NUTRIENTS order
+
+    Returns:
+        Dictionary of total_* fields (calories rounded to an integer)
+    """
+    result = {field: round(float(value), 2) for field, value in zip(TOTAL_FIELDS, totals)}
+    result["total_calories"] = int(round(float(totals[0])))
+    return result
+
+
+def compute_nutrition_totals(meals: Iterable[Union[MealBase, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Compute the macro and micronutrient totals of a batch of meals.
+
+    Args:
+        meals: Meals as models or stored documents
+
+    Returns:
+        Dictionary of total_* fields
+    """
+    foods = [food for meal in meals for food in meal_foods(meal)]
+    matrix, quantities = build_nutrient_matrix(foods)
+
+    return format_totals(quantities @ matrix)
+
+
+def compute_nutrition_totals_batch(food_logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Compute nutrition totals for many food logs with a single nutrient matrix.
+
+    Args:
+        food_logs: Food log documents with meals
+
+    Returns:
+        Dictionary of total_* fields per food log, in input order
+    """
+    foods = []
+    log_index = []
+    for position, food_log in enumerate(food_logs):
+        for meal in food_log.get("meals") or []:
+            items = meal_foods(meal)
+            foods.extend(items)
+            log_index.extend([position] * len(items))
+
+    matrix, quantities = build_nutrient_matrix(foods)
+
+    totals = np.zeros((len(food_logs), len(NUTRIENTS)), dtype=np.float64)
+    np.add.at(totals, np.array(log_index, dtype=np.intp), matrix * quantities[:, None])
+
+    return [format_totals(row) for row in totals]
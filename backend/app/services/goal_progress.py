@@ -0,0 +1,185 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.cache import TTLCache
+from app.core.signals import food_log_saved, goal_changed, measurement_saved, workout_saved
+from app.db.mongodb.goals import get_active_target_goals, record_goal_progress
+from app.db.mongodb.latest_measurements import get_latest_snapshot
+from app.db.mongodb.measurement_series import measurement_metric_values
+from app.db.mongodb.nutrition import ROLLUP_FIELDS, get_daily_rollups
+from app.db.mongodb.user_stats import GOALS_VERSION, get_data_version
+from app.models.goal import GoalType
+from app.services.measurement import goal_metric
+
+# Goal types whose progress is derived from recorded data
+TRACKED_GOAL_TYPES = [
+    GoalType.WEIGHT,
+    GoalType.BODY_FAT,
+    GoalType.MEASUREMENT,
+    GoalType.WORKOUT,
+    GoalType.NUTRITION
+]
+
+MEASUREMENT_GOAL_TYPES = (GoalType.WEIGHT.value, GoalType.BODY_FAT.value, GoalType.MEASUREMENT.value)
+
+# Fields returned by progress writes to refresh the cached goal index
+PROGRESS_PROJECTION = {"current_value": 1, "status": 1}
+
+# Active tracked goals per user with the goals write counter they were read
+# at. Every goal write, in any worker, bumps the counter, so entries are
+# checked against it with one point read before use.
+goal_index_cache = TTLCache(maxsize=10000, ttl=600)
+
+
+async def get_tracked_goals(user_id: str) -> List[Dict[str, Any]]:
+    """
+    Get a user's active goals whose progress follows recorded data.
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        Cached list of goal documents
+    """
+    # Read the counter before the goals, so a write racing the read leaves
+    # an entry that is already stale rather than one that looks current
+    version = await get_data_version(user_id, GOALS_VERSION)
+
+    cached = goal_index_cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    goals = await get_active_target_goals(user_id, TRACKED_GOAL_TYPES)
+    goal_index_cache.set(user_id, (version, goals))
+    return goals
+
+
+async def _record(user_id: str, goal: Dict[str, Any], value: Optional[float] = None, delta: Optional[float] = None) -> None:
+    """
+    Write a progress point and update the goal dict for the rest of this write.
+
+    The write bumps the goals counter, so the cached index is reloaded on
+    the next read.
+    """
+    updated = await record_goal_progress(str(goal["_id"]), value=value, delta=delta, projection=PROGRESS_PROJECTION)
+    if updated is None:
+        goal_index_cache.delete(user_id)
+        return
+
+    goal["current_value"] = updated.get("current_value")
+    goal["status"] = updated["status"]
+
+
+def _day(value: Any) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def workout_contribution(goal: Dict[str, Any], workout: Optional[Dict[str, Any]]) -> float:
+    """
+    Amount a workout adds to a workout goal.
+
+    Workout goals count workouts by default; custom_data["metric"] can be
+    "duration" (minutes) or "calories" instead. Workouts dated before the
+    goal was created don't count.
+
+    Args:
+        goal: Workout goal document
+        workout: Workout document (None counts as nothing)
+
+    Returns:
+        Contribution to the goal's current value
+    """
+    if not workout or workout.get("date") is None or workout["date"] < goal["created_at"]:
+        return 0.0
+
+    metric = (goal.get("custom_data") or {}).get("metric", "count")
+    if metric == "duration":
+        return (workout.get("duration") or 0) / 60
+    if metric == "calories":
+        return float(workout.get("calories_burned") or 0)
+    return 1.0
+
+
+async def on_measurement_saved(
+    user_id: str,
+    previous: Optional[Dict[str, Any]],
+    current: Optional[Dict[str, Any]]
+) -> None:
+    """Set measurement goals to the latest value of the metrics they track."""
+    goals = [goal for goal in await get_tracked_goals(user_id) if goal["goal_type"] in MEASUREMENT_GOAL_TYPES]
+    if not goals:
+        return
+
+    metrics = set(measurement_metric_values(previous or {})) | set(measurement_metric_values(current or {}))
+    goals = [goal for goal in goals if goal_metric(goal) in metrics]
+    if not goals:
+        return
+
+    latest = await get_latest_snapshot(user_id)
+    for goal in goals:
+        entry = latest.get(goal_metric(goal))
+        if entry is not None and entry["value"] != goal.get("current_value"):
+            await _record(user_id, goal, value=entry["value"])
+
+
+async def on_workout_saved(
+    user_id: str,
+    previous: Optional[Dict[str, Any]],
+    current: Optional[Dict[str, Any]]
+) -> None:
+    """Increment workout goals by the change in the workout's contribution."""
+    for goal in await get_tracked_goals(user_id):
+        if goal["goal_type"] != GoalType.WORKOUT.value:
+            continue
+
+        delta = workout_contribution(goal, current) - workout_contribution(goal, previous)
+        if delta:
+            await _record(user_id, goal, delta=delta)
+
+
+async def on_food_log_saved(
+    user_id: str,
+    previous: Optional[Dict[str, Any]],
+    current: Optional[Dict[str, Any]]
+) -> None:
+    """
+    Set nutrition goals to the current day's total of the nutrient they track
+    (custom_data["metric"], calories by default), read from the daily rollup.
+
+    Nutrition goals track the current (UTC) day, so writes that neither
+    add to nor remove from today's food logs leave them alone.
+    """
+    day = datetime.utcnow().date()
+    if day not in {_day(food_log["date"]) for food_log in (previous, current) if food_log}:
+        return
+
+    goals = [goal for goal in await get_tracked_goals(user_id) if goal["goal_type"] == GoalType.NUTRITION.value]
+    if not goals:
+        return
+
+    rollups = await get_daily_rollups(user_id, day, day)
+
+    for goal in goals:
+        if day < goal["created_at"].date():
+            continue
+
+        metric = (goal.get("custom_data") or {}).get("metric", "calories")
+        if metric not in ROLLUP_FIELDS:
+            continue
+
+        value = rollups[0]["sum"].get(metric, 0) if rollups else 0
+        if value != goal.get("current_value"):
+            await _record(user_id, goal, value=value)
+
+
+async def on_goal_changed(user_id: str, goal_id: str) -> None:
+    """Drop the user's cached goal index (other workers see the bumped counter)."""
+    goal_index_cache.delete(user_id)
+
+
+def register_goal_progress_receivers() -> None:
+    """Connect the goal progress receivers to the write signals."""
+    measurement_saved.connect(on_measurement_saved)
+    workout_saved.connect(on_workout_saved)
+    food_log_saved.connect(on_food_log_saved)
+    goal_changed.connect(on_goal_changed)
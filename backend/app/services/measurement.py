@@ -0,0 +1,268 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.cache import TTLCache, make_cache_key
+from app.db.mongodb.goals import get_active_target_goals
+from app.db.mongodb.measurement_series import MEASUREMENT_METRICS, get_metric_series
+from app.db.mongodb.user_stats import bump_data_version, get_data_version
+from app.models.goal import GoalType
+
+# Half-life of the exponentially smoothed trend line
+TREND_HALF_LIFE_DAYS = 7.0
+
+# Robust z-score above which a sample is flagged as an outlier
+OUTLIER_THRESHOLD = 3.5
+
+# Goal dates projected further out than this are reported as unreachable
+MAX_PROJECTION_DAYS = 5 * 365
+
+SECONDS_PER_DAY = 86400.0
+
+# Trends are keyed by the user's measurement write counter, so a write in
+# any worker makes every worker's copy unreachable; the writer also drops
+# its own entries, and the TTL evicts the others
+TRENDS_VERSION = "measurements"
+trends_cache = TTLCache(maxsize=1024, ttl=3600)
+
+
+def _trends_namespace(user_id: str) -> str:
+    return f"measurements:trends:{user_id}"
+
+
+async def invalidate_measurement_trends(user_id: str) -> None:
+    """
+    Drop a user's cached trends in every worker after a measurement write.
+
+    Args:
+        user_id: User ID
+    """
+    await bump_data_version(user_id, TRENDS_VERSION)
+    trends_cache.delete_prefix(_trends_namespace(user_id) + ":")
+
+
+def ewma_trend(days: np.ndarray, values: np.ndarray, half_life: float = TREND_HALF_LIFE_DAYS) -> np.ndarray:
+    """
+    Exponentially smooth an irregularly sampled series.
+
+    Each trend value is the average of all samples so far, weighted by
+    0.5 ** (age in days / half_life). Weights are taken relative to the last
+    sample, so the whole line is two cumulative sums.
+
+    Args:
+        days: Sample times in days, ascending
+        values: Sample values
+        half_life: Age in days at which a sample's weight halves
+
+    Returns:
+        Trend value at each sample
+    """
+    weights = np.exp(np.log(2.0) * (days - days[-1]) / half_life)
+    return np.cumsum(weights * values) / np.cumsum(weights)
+
+
+def linear_fit(days: np.ndarray, values: np.ndarray) -> Optional[Tuple[float, float, float]]:
+    """
+    Least-squares line through a series.
+
+    Args:
+        days: Sample times in days
+        values: Sample values
+
+    Returns:
+        Tuple of (slope per day, intercept, r squared), or None when the
+        samples don't span more than one day
+    """
+    if len(days) < 2 or np.ptp(days) < 1.0:
+        return None
+
+    slope, intercept = np.polyfit(days, values, 1)
+    residuals = values - (slope * days + intercept)
+    total = np.sum((values - values.mean()) ** 2)
+    r_squared = 1.0 - np.sum(residuals ** 2) / total if total > 0 else 1.0
+
+    return float(slope), float(intercept), float(r_squared)
+
+
+def robust_outliers(residuals: np.ndarray, threshold: float = OUTLIER_THRESHOLD) -> np.ndarray:
+    """
+    Flag samples whose residual has a large robust z-score.
+
+    Uses the median absolute deviation, so a few bad samples don't hide
+    each other by inflating the spread.
+
+    Args:
+        residuals: Differences between samples and the trend
+        threshold: Robust z-score above which a sample is flagged
+
+    Returns:
+        Boolean array, True for outliers
+    """
+    deviations = np.abs(residuals - np.median(residuals))
+    mad = np.median(deviations)
+    if mad == 0:
+        return np.zeros(len(residuals), dtype=bool)
+    return deviations / (1.4826 * mad) > threshold
+
+
+def project_target_date(regression: Optional[Dict[str, Any]], last_date: datetime, target_value: float) -> Optional[date]:
+    """
+    Date at which a fitted trend line reaches a target value.
+
+    Args:
+        regression: Regression returned by compute_metric_trend
+        last_date: Date of the last sample
+        target_value: Value to reach
+
+    Returns:
+        Projected date, or None when the trend is flat, moving away from the
+        target or too slow to get there within MAX_PROJECTION_DAYS
+    """
+    if regression is None or regression["slope_per_week"] == 0:
+        return None
+
+    origin = regression["origin"]
+    slope = regression["slope_per_week"] / 7
+    target_day = (target_value - regression["intercept"]) / slope
+    last_day = (last_date - origin).total_seconds() / SECONDS_PER_DAY
+
+    if target_day < last_day or target_day - last_day > MAX_PROJECTION_DAYS:
+        return None
+
+    return (origin + timedelta(days=target_day)).date()
+
+
+def goal_metric(goal: Dict[str, Any]) -> Optional[str]:
+    """
+    Metric a goal tracks: weight and body fat goals track their own metric,
+    measurement goals name theirs in custom_data["metric"].
+
+    Args:
+        goal: Goal document
+
+    Returns:
+        Metric name or None
+    """
+    if goal["goal_type"] == GoalType.WEIGHT.value:
+        return "weight"
+    if goal["goal_type"] == GoalType.BODY_FAT.value:
+        return "body_fat"
+
+    metric = (goal.get("custom_data") or {}).get("metric")
+    return metric if metric in MEASUREMENT_METRICS else None
+
+
+def compute_metric_trend(points: List[Tuple[datetime, float]]) -> Dict[str, Any]:
+    """
+    Compute the trend line, rate of change, regression and outliers of a series.
+
+    Args:
+        points: (date, value) points, oldest first
+
+    Returns:
+        Dictionary with points (value, trend and outlier flag per sample),
+        latest_trend, weekly_rate and regression (None for a single day)
+    """
+    origin = points[0][0]
+    seconds = np.array([timestamp.timestamp() for timestamp, _ in points], dtype=np.float64)
+    days = (seconds - seconds[0]) / SECONDS_PER_DAY
+    values = np.array([value for _, value in points], dtype=np.float64)
+
+    trend = ewma_trend(days, values)
+    outliers = robust_outliers(values - trend)
+    fit = linear_fit(days, values)
+
+    return {
+        "points": [
+            {"date": timestamp, "value": value, "trend": float(smoothed), "outlier": bool(flag)}
+            for (timestamp, value), smoothed, flag in zip(points, trend, outliers)
+        ],
+        "latest_trend": float(trend[-1]),
+        "weekly_rate": fit[0] * 7 if fit else None,
+        "regression": {
+            "slope_per_week": fit[0] * 7,
+            "intercept": fit[1],
+            "r_squared": fit[2],
+            "origin": origin
+        } if fit else None
+    }
+
+
+def goal_projections(trend: Dict[str, Any], goals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Project when each goal's target will be reached on the current trend.
+
+    Args:
+        trend: Result of compute_metric_trend
+        goals: Unfinished goals tracking the metric
+
+    Returns:
+        List of goals with their projected_date
+    """
+    last_date = trend["points"][-1]["date"]
+    return [
+        {
+            "goal_id": str(goal["_id"]),
+            "title": goal.get("title"),
+            "target_value": goal["target_value"],
+            "target_date": goal.get("target_date"),
+            "projected_date": project_target_date(trend["regression"], last_date, goal["target_value"])
+        }
+        for goal in goals
+    ]
+
+
+async def get_measurement_trends(
+    user_id: str,
+    metrics: Optional[List[str]] = None,
+    days: int = 90
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get trend analytics for a user's measurement metrics.
+
+    The NumPy results are cached per user until the user's next measurement
+    write in any worker, checked with one point read of the write counter.
+    Goal projections are applied on every call, so goal edits show up
+    immediately.
+
+    Args:
+        user_id: User ID
+        metrics: Metrics to analyze (all metrics with samples when None)
+        days: Number of days of history to analyze
+
+    Returns:
+        Trend analytics keyed by metric
+    """
+    metrics = metrics or list(MEASUREMENT_METRICS)
+    start_date = date.today() - timedelta(days=days)
+
+    cache_key = make_cache_key(
+        _trends_namespace(user_id),
+        version=await get_data_version(user_id, TRENDS_VERSION),
+        metrics=",".join(sorted(metrics)),
+        start_date=start_date.isoformat()
+    )
+    trends = trends_cache.get(cache_key)
+    if trends is None:
+        trends = {}
+        for metric in metrics:
+            points = await get_metric_series(user_id, metric, start_date)
+            if points:
+                trends[metric] = compute_metric_trend(points)
+        trends_cache.set(cache_key, trends)
+
+    goals_by_metric: Dict[str, List[Dict[str, Any]]] = {}
+    goals = await get_active_target_goals(
+        user_id,
+        [GoalType.WEIGHT, GoalType.BODY_FAT, GoalType.MEASUREMENT]
+    )
+    for goal in goals:
+        metric = goal_metric(goal)
+        if metric in trends:
+            goals_by_metric.setdefault(metric, []).append(goal)
+
+    return {
+        metric: {**trend, "goals": goal_projections(trend, goals_by_metric.get(metric, []))}
+        for metric, trend in trends.items()
+    }
@@ -0,0 +1,585 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from firebase_admin import exceptions as firebase_exceptions, messaging
+
+from app.core.signals import comment_added, post_liked
+from app.db.mongodb.notifications import (
+    aggregate_notification,
+    claim_pending_pushes,
+    count_pending_pushes,
+    create_notification_indexes,
+    delete_device_tokens,
+    finish_pushes,
+    get_device_tokens_for_users,
+    get_notification_settings_bulk
+)
+from app.db.mongodb.users import get_user_by_id
+from app.models.notification import NotificationType
+
+# Tokens per multicast request (the FCM limit)
+MULTICAST_BATCH_SIZE = 500
+
+# Notifications claimed per drain
+PUSH_CLAIM_BATCH_SIZE = 500
+
+# Multicast requests in flight at once
+PUSH_CONCURRENCY = 4
+
+# Send attempts per token before giving up, and the first retry delay
+PUSH_MAX_ATTEMPTS = 4
+PUSH_RETRY_BASE_DELAY = 0.5
+
+# Seconds a claimed batch is reserved for this worker
+PUSH_LEASE_SECONDS = 300
+
+# Seconds to wait when the queue is empty
+PUSH_POLL_INTERVAL = 2.0
+
+# Seconds of sends used for the throughput metric
+METRICS_WINDOW_SECONDS = 60.0
+
+
+class PushResult:
+    """Outcome of a push to one device token."""
+
+    __slots__ = ("token", "success", "invalid_token", "error")
+
+    def __init__(self, token: str, success: bool, invalid_token: bool = False, error: Optional[str] = None):
+        """
+        Args:
+            token: Device token
+            success: Whether the push service accepted the message
+            invalid_token: The token is unregistered or malformed and should be pruned
+            error: Error message of a failed push
+        """
+        self.token = token
+        self.success = success
+        self.invalid_token = invalid_token
+        self.error = error
+
+
+class PushSender(ABC):
+    """Sends one message to many device tokens."""
+
+    max_batch_size = MULTICAST_BATCH_SIZE
+
+    @abstractmethod
+    async def send_multicast(
+        self,
+        tokens: Sequence[str],
+        title: str,
+        body: str,
+        data: Dict[str, str]
+    ) -> List[PushResult]:
+        """
+        Send a message to device tokens.
+
+        Args:
+            tokens: Device tokens (at most max_batch_size)
+            title: Notification title
+            body: Notification body
+            data: String key-value data delivered with the message
+
+        Returns:
+            One result per token, in order
+        """
+
+
+class FirebasePushSender(PushSender):
+    """Sends pushes through Firebase Cloud Messaging."""
+
+    async def send_multicast(
+        self,
+        tokens: Sequence[str],
+        title: str,
+        body: str,
+        data: Dict[str, str]
+    ) -> List[PushResult]:
+        message = messaging.MulticastMessage(
+            tokens=list(tokens),
+            notification=messaging.Notification(title=title, body=body),
+            data=data
+        )
+        # The Admin SDK is blocking; keep it off the event loop
+        response = await asyncio.to_thread(messaging.send_each_for_multicast, message)
+
+        invalid_errors = (
+            messaging.UnregisteredError,
+            messaging.SenderIdMismatchError,
+            firebase_exceptions.InvalidArgumentError
+        )
+        return [
+            PushResult(
+                token,
+                result.success,
+                invalid_token=isinstance(result.exception, invalid_errors),
+                error=str(result.exception) if result.exception else None
+            )
+            for token, result in zip(tokens, response.responses)
+        ]
+
+
+class FakePushSender(PushSender):
+    """
+    Records pushes in memory instead of sending them, for local development
+    and tests.
+    """
+
+    def __init__(
+        self,
+        invalid_tokens: Sequence[str] = (),
+        transient_failures: Optional[Dict[str, int]] = None,
+        latency: float = 0.0
+    ):
+        """
+        Args:
+            invalid_tokens: Tokens reported as unregistered
+            transient_failures: Number of failed attempts per token before it succeeds
+            latency: Seconds each request takes
+        """
+        self.invalid_tokens = set(invalid_tokens)
+        self.transient_failures = dict(transient_failures or {})
+        self.latency = latency
+        self.sent: List[Dict[str, Any]] = []
+        self.requests = 0
+
+    async def send_multicast(
+        self,
+        tokens: Sequence[str],
+        title: str,
+        body: str,
+        data: Dict[str, str]
+    ) -> List[PushResult]:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        results = []
+        for token in tokens:
+            if token in self.invalid_tokens:
+                results.append(PushResult(token, False, invalid_token=True, error="unregistered"))
+            elif self.transient_failures.get(token, 0) > 0:
+                self.transient_failures[token] -= 1
+                results.append(PushResult(token, False, error="unavailable"))
+            else:
+                self.sent.append({"token": token, "title": title, "body": body, "data": data})
+                results.append(PushResult(token, True))
+        return results
+
+
+class PushMetrics:
+    """Counters, throughput and queue depth of a delivery worker."""
+
+    def __init__(self, window: float = METRICS_WINDOW_SECONDS):
+        """
+        Args:
+            window: Seconds of sends averaged for the throughput
+        """
+        self.window = window
+        self.counters = {
+            "notifications_claimed": 0,
+            "notifications_delivered": 0,
+            "notifications_failed": 0,
+            "notifications_skipped": 0,
+            "pushes_sent": 0,
+            "pushes_failed": 0,
+            "retries": 0,
+            "multicast_requests": 0,
+            "tokens_pruned": 0
+        }
+        self.queue_depth: Optional[int] = None
+        self._sends: Deque[Tuple[float, int]] = deque()
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            counter: Counter name
+            amount: Amount to add
+        """
+        self.counters[counter] += amount
+
+    def record_sent(self, count: int) -> None:
+        """
+        Record successful pushes for the throughput.
+
+        Args:
+            count: Number of pushes accepted
+        """
+        self.counters["pushes_sent"] += count
+        self._sends.append((time.monotonic(), count))
+
+    def throughput(self) -> float:
+        """
+        Pushes sent per second over the metrics window.
+
+        Returns:
+            Pushes per second
+        """
+        cutoff = time.monotonic() - self.window
+        while self._sends and self._sends[0][0] < cutoff:
+            self._sends.popleft()
+        return sum(count for _, count in self._sends) / self.window
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current metrics.
+
+        Returns:
+            Counters with pushes_per_second and queue_depth
+        """
+        return {
+            **self.counters,
+            "pushes_per_second": self.throughput(),
+            "queue_depth": self.queue_depth
+        }
+
+
+def push_data(notification: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Data payload of a notification; FCM only accepts string values.
+
+    Args:
+        notification: Notification document
+
+    Returns:
+        String key-value data with the type and metadata
+    """
+    data = {
+        key: value if isinstance(value, str) else json.dumps(value, default=str)
+        for key, value in (notification.get("metadata") or {}).items()
+    }
+    data["type"] = str(notification["type"])
+    return data
+
+
+class PushDeliveryWorker:
+    """
+    Drains notifications waiting for push delivery.
+
+    Each drain claims a batch of notifications, drops recipients who turned
+    push notifications off, loads all recipients' device tokens with one
+    query, and groups the batch by message so a fan-out to many users is
+    sent as a few multicast requests, each device token once per message.
+    Requests run under a concurrency limit; tokens that fail transiently
+    are retried with exponential backoff and invalid tokens are pruned in
+    one delete.
+    """
+
+    def __init__(
+        self,
+        sender: PushSender,
+        batch_size: int = PUSH_CLAIM_BATCH_SIZE,
+        concurrency: int = PUSH_CONCURRENCY,
+        max_attempts: int = PUSH_MAX_ATTEMPTS,
+        retry_base_delay: float = PUSH_RETRY_BASE_DELAY,
+        poll_interval: float = PUSH_POLL_INTERVAL,
+        lease_seconds: float = PUSH_LEASE_SECONDS
+    ):
+        """
+        Args:
+            sender: Push sender
+            batch_size: Notifications claimed per drain
+            concurrency: Multicast requests in flight at once
+            max_attempts: Send attempts per token
+            retry_base_delay: Delay before the first retry, doubled per attempt
+            poll_interval: Seconds to wait when the queue is empty
+            lease_seconds: Seconds a claimed batch is reserved for this worker
+        """
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.metrics = PushMetrics()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _send_with_retries(self, tokens: List[str], title: str, body: str, data: Dict[str, str]) -> List[PushResult]:
+        """Send to tokens, retrying transient failures with exponential backoff."""
+        final: List[PushResult] = []
+        pending = tokens
+
+        for attempt in range(self.max_attempts):
+            if attempt:
+                self.metrics.increment("retries", len(pending))
+                await asyncio.sleep(self.retry_base_delay * 2 ** (attempt - 1))
+
+            async with self._semaphore:
+                self.metrics.increment("multicast_requests")
+                try:
+                    results = await self.sender.send_multicast(pending, title, body, data)
+                except Exception as e:
+                    results = [PushResult(token, False, error=str(e)) for token in pending]
+
+            retry = []
+            for result in results:
+                if result.success or result.invalid_token:
+                    final.append(result)
+                else:
+                    retry.append(result)
+
+            if not retry:
+                return final
+            pending = [result.token for result in retry]
+
+        return final + retry
+
+    async def deliver(self, notifications: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Push a batch of notifications and take them off the queue.
+
+        Args:
+            notifications: Claimed notification documents
+
+        Returns:
+            Dictionary with the number of notifications delivered, failed and
+            skipped (push disabled, or no valid devices)
+        """
+        user_ids = list({str(notification["user_id"]) for notification in notifications})
+        settings = await get_notification_settings_bulk(user_ids)
+        tokens_by_user = await get_device_tokens_for_users(
+            [user_id for user_id in user_ids if settings[user_id].get("push_notifications", True)]
+        )
+
+        # Group by message: each token is sent a message once, however many
+        # notifications share it
+        groups: Dict[str, Dict[str, Any]] = {}
+        skipped: List[ObjectId] = []
+        for notification in notifications:
+            tokens = tokens_by_user.get(str(notification["user_id"]))
+            if not tokens:
+                skipped.append(notification["_id"])
+                continue
+
+            data = push_data(notification)
+            key = json.dumps([notification["title"], notification["message"], data], sort_keys=True)
+            group = groups.setdefault(key, {
+                "title": notification["title"],
+                "body": notification["message"],
+                "data": data,
+                "notifications_by_token": {}
+            })
+            for token in tokens:
+                group["notifications_by_token"].setdefault(token, []).append(notification["_id"])
+
+        requests = []
+        for group in groups.values():
+            tokens = list(group["notifications_by_token"])
+            for offset in range(0, len(tokens), self.sender.max_batch_size):
+                requests.append((group, tokens[offset:offset + self.sender.max_batch_size]))
+
+        responses = await asyncio.gather(*(
+            self._send_with_retries(tokens, group["title"], group["body"], group["data"])
+            for group, tokens in requests
+        ))
+
+        delivered = set()
+        retryable = set()
+        invalid_tokens = set()
+        sent = failed_pushes = 0
+        for (group, _), results in zip(requests, responses):
+            for result in results:
+                if result.success:
+                    sent += 1
+                    delivered.update(group["notifications_by_token"][result.token])
+                elif result.invalid_token:
+                    invalid_tokens.add(result.token)
+                else:
+                    failed_pushes += 1
+                    retryable.update(group["notifications_by_token"][result.token])
+
+        # Undelivered notifications only fail if a send failed transiently;
+        # recipients whose tokens were all invalid have no devices left, so
+        # they are skipped like recipients without tokens
+        failed = []
+        for notification in notifications:
+            notification_id = notification["_id"]
+            if notification_id in delivered or notification_id in skipped:
+                continue
+            if notification_id in retryable:
+                failed.append(notification_id)
+            else:
+                skipped.append(notification_id)
+
+        await delete_device_tokens(list(invalid_tokens))
+        await finish_pushes(list(delivered) + skipped, failed)
+
+        self.metrics.record_sent(sent)
+        self.metrics.increment("pushes_failed", failed_pushes)
+        self.metrics.increment("tokens_pruned", len(invalid_tokens))
+        self.metrics.increment("notifications_delivered", len(delivered))
+        self.metrics.increment("notifications_failed", len(failed))
+        self.metrics.increment("notifications_skipped", len(skipped))
+
+        return {"delivered": len(delivered), "failed": len(failed), "skipped": len(skipped)}
+
+    async def drain_once(self) -> int:
+        """
+        Claim and deliver one batch.
+
+        Returns:
+            Number of notifications claimed
+        """
+        notifications = await claim_pending_pushes(self.batch_size, self.lease_seconds)
+        self.metrics.increment("notifications_claimed", len(notifications))
+
+        if notifications:
+            await self.deliver(notifications)
+
+        self.metrics.queue_depth = await count_pending_pushes()
+        return len(notifications)
+
+    async def run(self) -> None:
+        """Drain the queue until cancelled, polling while it is empty."""
+        try:
+            await create_notification_indexes()
+        except Exception as e:
+            # Claims still work without the indexes, only slower
+            print(f"Push delivery index creation error: {e}")
+
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Push delivery error: {e}")
+                claimed = 0
+
+            # A full batch means more is probably waiting
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> asyncio.Task:
+        """
+        Run the worker in a background task.
+
+        Returns:
+            The worker task
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to end."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Worker started with the application, when enabled
+push_worker: Optional[PushDeliveryWorker] = None
+
+
+def create_push_sender(name: str) -> PushSender:
+    """
+    Build the push sender selected in settings.
+
+    Args:
+        name: "firebase" or "fake"
+
+    Returns:
+        Push sender
+    """
+    if name == "fake":
+        return FakePushSender()
+    return FirebasePushSender()
+
+
+def start_push_worker(sender: PushSender, **options: Any) -> PushDeliveryWorker:
+    """
+    Start the application's push delivery worker.
+
+    Args:
+        sender: Push sender
+        **options: PushDeliveryWorker options
+
+    Returns:
+        The running worker
+    """
+    global push_worker
+    if push_worker is None:
+        push_worker = PushDeliveryWorker(sender, **options)
+    push_worker.start()
+    return push_worker
+
+
+async def stop_push_worker() -> None:
+    """Stop the application's push delivery worker if it runs."""
+    global push_worker
+    if push_worker is not None:
+        await push_worker.stop()
+        push_worker = None
+
+
+def get_push_metrics() -> Dict[str, Any]:
+    """
+    Metrics of the application's push delivery worker.
+
+    Returns:
+        Whether the worker runs in this process, with its metrics if so
+    """
+    if push_worker is None:
+        return {"running": False}
+    return {"running": True, **push_worker.metrics.snapshot()}
+
+
+async def _actor(user_id: str) -> Dict[str, Any]:
+    user = await get_user_by_id(user_id)
+    return {"user_id": user_id, "name": user.username if user else None}
+
+
+async def on_post_liked(user_id: str, post: Dict[str, Any]) -> None:
+    """Notify the post's author, collapsing likes on the post."""
+    owner_id = str(post["user_id"])
+    if owner_id == user_id:
+        return
+
+    await aggregate_notification(
+        owner_id,
+        NotificationType.SOCIAL,
+        f"post:{post['_id']}:like",
+        await _actor(user_id),
+        title="New likes",
+        verb="liked your post",
+        metadata={"post_id": str(post["_id"]), "activity": "like"}
+    )
+
+
+async def on_comment_added(user_id: str, post: Dict[str, Any], comment: Dict[str, Any]) -> None:
+    """Notify the post's author, collapsing comments on the post."""
+    owner_id = str(post["user_id"])
+    if owner_id == user_id:
+        return
+
+    await aggregate_notification(
+        owner_id,
+        NotificationType.SOCIAL,
+        f"post:{post['_id']}:comment",
+        await _actor(user_id),
+        title="New comments",
+        verb="commented on your post",
+        metadata={"post_id": str(post["_id"]), "activity": "comment"}
+    )
+
+
+def register_notification_receivers() -> None:
+    """Create notifications for likes and comments on a user's posts."""
+    post_liked.connect(on_post_liked)
+    comment_added.connect(on_comment_added)
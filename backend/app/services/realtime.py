@@ -0,0 +1,303 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.signals import comment_added, notifications_created, post_created, post_liked
+from app.db.mongodb.social import get_followers_among
+
+# Events buffered per connection before the client counts as lagging
+CONNECTION_QUEUE_SIZE = 100
+
+# Seconds between heartbeats sent to idle connections
+HEARTBEAT_INTERVAL = 25.0
+
+# Sent instead of the dropped events when a client lags; the client should
+# refetch notifications and the feed
+REFRESH_EVENT = {"type": "refresh"}
+
+BrokerListener = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class Connection:
+    """
+    Outgoing event queue of one connected client.
+
+    When the queue is full the client is lagging: its buffered events are
+    dropped for a single refresh hint, and further events are dropped until
+    the hint has been sent.
+    """
+
+    def __init__(self, user_id: str, maxsize: int = CONNECTION_QUEUE_SIZE):
+        """
+        Args:
+            user_id: Connected user ID
+            maxsize: Events buffered before the client counts as lagging
+        """
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.lagging = False
+        self.dropped = 0
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """
+        Queue an event without blocking the publisher.
+
+        Args:
+            event: Event to send
+        """
+        if self.lagging:
+            self.dropped += 1
+            return
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(REFRESH_EVENT)
+            self.lagging = True
+
+    async def next_event(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event to send.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            The event, or None after the timeout
+        """
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        if event is REFRESH_EVENT:
+            self.lagging = False
+        return event
+
+
+class LocalBroker:
+    """
+    In-process stand-in for a pub/sub broker between workers.
+
+    Every attached hub receives every message, as each worker process would
+    from a shared channel (e.g. Redis pub/sub) in a multi-worker deployment.
+    """
+
+    def __init__(self):
+        self._listeners: List[BrokerListener] = []
+
+    def subscribe(self, listener: BrokerListener) -> None:
+        """
+        Receive every published message.
+
+        Args:
+            listener: Async callable taking the message
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: BrokerListener) -> None:
+        """
+        Stop receiving messages.
+
+        Args:
+            listener: Previously subscribed listener
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        """
+        Deliver a message to every listener.
+
+        Args:
+            message: Message with events (a list of [user_id, event] pairs)
+                or followers_of and event
+        """
+        for listener in list(self._listeners):
+            try:
+                await listener(message)
+            except Exception as e:
+                print(f"Realtime broker listener error: {e}")
+
+
+class RealtimeHub:
+    """
+    Pub/sub hub delivering events to this process's connections, keyed by user ID.
+
+    Events are published through the broker, so users connected to any
+    worker receive them; each hub only delivers to its own connections.
+    """
+
+    def __init__(self, broker: LocalBroker):
+        """
+        Args:
+            broker: Broker connecting the workers' hubs
+        """
+        self.broker = broker
+        self.connections: Dict[str, Set[Connection]] = {}
+        broker.subscribe(self.dispatch)
+
+    def connect(self, user_id: str) -> Connection:
+        """
+        Register a connection for a user.
+
+        Args:
+            user_id: Connected user ID
+
+        Returns:
+            The connection's event queue
+        """
+        connection = Connection(user_id)
+        self.connections.setdefault(user_id, set()).add(connection)
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        """
+        Remove a connection.
+
+        Args:
+            connection: Connection returned by connect
+        """
+        connections = self.connections.get(connection.user_id)
+        if connections is None:
+            return
+
+        connections.discard(connection)
+        if not connections:
+            del self.connections[connection.user_id]
+
+    def deliver(self, user_id: str, event: Dict[str, Any]) -> None:
+        """
+        Queue an event on a user's local connections.
+
+        Args:
+            user_id: Recipient user ID
+            event: Event to send
+        """
+        for connection in self.connections.get(user_id, ()):
+            connection.push(event)
+
+    async def dispatch(self, message: Dict[str, Any]) -> None:
+        """
+        Deliver a broker message to the local connections it targets.
+
+        Follower-targeted messages are resolved against the locally
+        connected users only, so the follow lookup is bounded by this
+        worker's connections rather than the author's follower count.
+
+        Args:
+            message: Broker message
+        """
+        for user_id, event in message.get("events", ()):
+            self.deliver(user_id, event)
+
+        author_id = message.get("followers_of")
+        if author_id and self.connections:
+            candidates = [user_id for user_id in self.connections if user_id != author_id]
+            for user_id in await get_followers_among(author_id, candidates):
+                self.deliver(user_id, message["event"])
+            # The author's other sessions show their own post too
+            self.deliver(author_id, message["event"])
+
+    async def publish(self, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Send events to users on every worker, in one broker message.
+
+        Args:
+            events: (recipient user ID, event) pairs
+        """
+        if events:
+            await self.broker.publish({"events": [[user_id, event] for user_id, event in events]})
+
+    async def publish_to_followers(self, author_id: str, event: Dict[str, Any]) -> None:
+        """
+        Send an event to a user's followers (and the user) on every worker.
+
+        Args:
+            author_id: Followed user ID
+            event: Event to send
+        """
+        await self.broker.publish({"followers_of": author_id, "event": event})
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Connection counts.
+
+        Returns:
+            Dictionary with connected users, connections and lagging connections
+        """
+        connections = [connection for user_connections in self.connections.values() for connection in user_connections]
+        return {
+            "users": len(self.connections),
+            "connections": len(connections),
+            "lagging": sum(connection.lagging for connection in connections)
+        }
+
+
+broker = LocalBroker()
+hub = RealtimeHub(broker)
+
+
+def _post_event(event_type: str, post: Dict[str, Any], **fields: Any) -> Dict[str, Any]:
+    return {
+        "type": event_type,
+        "post_id": str(post["_id"]),
+        "likes_count": post.get("likes_count", 0),
+        "comments_count": post.get("comments_count", 0),
+        **fields
+    }
+
+
+async def on_notifications_created(notifications: List[Dict[str, Any]]) -> None:
+    """Push new notifications to their recipients."""
+    await hub.publish([
+        (
+            str(notification["user_id"]),
+            {
+                "type": "notification",
+                "notification": {
+                    "id": str(notification["_id"]),
+                    "title": notification["title"],
+                    "message": notification["message"],
+                    "notification_type": notification["type"],
+                    "metadata": notification.get("metadata"),
+                    "count": notification.get("count"),
+                    "created_at": notification["created_at"]
+                }
+            }
+        )
+        for notification in notifications
+    ])
+
+
+async def on_post_created(user_id: str, post: Dict[str, Any]) -> None:
+    """Tell the author's followers a new post is in their feed."""
+    await hub.publish_to_followers(user_id, _post_event("feed_post", post, user_id=user_id))
+
+
+async def on_post_liked(user_id: str, post: Dict[str, Any]) -> None:
+    """Tell the post's author about the like."""
+    owner_id = str(post["user_id"])
+    if owner_id != user_id:
+        await hub.publish([(owner_id, _post_event("post_liked", post, user_id=user_id))])
+
+
+async def on_comment_added(user_id: str, post: Dict[str, Any], comment: Dict[str, Any]) -> None:
+    """Tell the post's author about the comment."""
+    owner_id = str(post["user_id"])
+    if owner_id != user_id:
+        await hub.publish([(owner_id, _post_event(
+            "comment_added", post,
+            user_id=user_id,
+            comment={"id": str(comment["_id"]), "content": comment["content"], "created_at": comment["created_at"]}
+        ))])
+
+
+def register_realtime_receivers() -> None:
+    """Connect the realtime hub to the notification and social signals."""
+    notifications_created.connect(on_notifications_created)
+    post_created.connect(on_post_created)
+    post_liked.connect(on_post_liked)
+    comment_added.connect(on_comment_added)
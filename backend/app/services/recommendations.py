@@ -0,0 +1,462 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.core.cache import TTLCache, make_cache_key
+from app.core.signals import food_log_saved, goal_changed, measurement_saved, workout_saved
+from app.db.mongodb.goals import calculate_goal_progress, goal_date_to_datetime
+from app.db.mongodb.latest_measurements import get_latest_snapshot
+from app.db.mongodb.nutrition import ROLLUP_FIELDS, combine_rollups, get_daily_rollups
+from app.db.mongodb.user_stats import bump_data_version, get_data_version
+from app.db.mongodb.workouts import get_workout_frequency
+from app.models.goal import GoalInDB, GoalType
+from app.services.measurement import get_measurement_trends, goal_metric, project_target_date
+
+# Days of measurements the trend is fitted on
+TREND_DAYS = 60
+
+# Days of workouts used for the training frequency
+WORKOUT_WINDOW_DAYS = 28
+
+# Days of nutrition rollups used for intake averages
+NUTRITION_WINDOW_DAYS = 14
+
+# Training sessions per week recommended alongside body composition goals
+TARGET_WORKOUTS_PER_WEEK = 3
+
+# Energy stored per kilogram of body weight change
+KCAL_PER_KG = 7700
+
+# Largest daily intake change the energy balance rule suggests
+MAX_INTAKE_CHANGE = 1000
+
+# Daily protein per kilogram of body weight for body composition goals
+PROTEIN_G_PER_KG = 1.6
+
+# Weekly weight change above this fraction of body weight is flagged
+MAX_WEEKLY_WEIGHT_CHANGE = 0.01
+
+# Measurements older than this are considered stale
+MEASUREMENT_STALE_DAYS = 14
+
+# Goals this close to their target date with this much left get a timeline warning
+DEADLINE_WARNING_DAYS = 7
+DEADLINE_WARNING_PROGRESS = 90.0
+
+BODY_GOAL_TYPES = (GoalType.WEIGHT.value, GoalType.BODY_FAT.value, GoalType.MEASUREMENT.value)
+
+# Recommendations are keyed by a per-user counter bumped on every write that
+# feeds them, so a write in any worker makes every worker's copy unreachable;
+# the writer also drops its own entries. Keys include the day, so date-based
+# rules are re-evaluated daily.
+RECOMMENDATIONS_VERSION = "recommendations"
+recommendations_cache = TTLCache(maxsize=4096, ttl=6 * 3600)
+
+
+def _recommendations_namespace(user_id: str) -> str:
+    return f"goals:recommendations:{user_id}"
+
+
+async def invalidate_goal_recommendations(user_id: str) -> None:
+    """
+    Drop a user's cached recommendations in every worker after a write that feeds them.
+
+    Args:
+        user_id: User ID
+    """
+    await bump_data_version(user_id, RECOMMENDATIONS_VERSION)
+    recommendations_cache.delete_prefix(_recommendations_namespace(user_id) + ":")
+
+
+def _recommendation(
+    kind: str,
+    category: str,
+    score: float,
+    title: str,
+    message: str,
+    **details: Any
+) -> Dict[str, Any]:
+    if score >= 70:
+        priority = "high"
+    elif score >= 40:
+        priority = "medium"
+    else:
+        priority = "low"
+
+    return {
+        "type": kind,
+        "category": category,
+        "priority": priority,
+        "score": score,
+        "title": title,
+        "message": message,
+        "details": details
+    }
+
+
+def _remaining(goal: Dict[str, Any]) -> Optional[float]:
+    if goal.get("target_value") is None or goal.get("current_value") is None:
+        return None
+    return goal["target_value"] - goal["current_value"]
+
+
+def _days_left(goal: Dict[str, Any], today: date) -> int:
+    return (goal_date_to_datetime(goal["target_date"]).date() - today).days
+
+
+def _required_weekly_rate(goal: Dict[str, Any], today: date) -> Optional[float]:
+    remaining = _remaining(goal)
+    if remaining is None:
+        return None
+    return remaining / max(_days_left(goal, today), 1) * 7
+
+
+def deadline_rule(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """Warn about goals close to or past their target date with work left."""
+    progress = calculate_goal_progress(goal.get("start_value"), goal.get("current_value"), goal.get("target_value"))
+    days_left = _days_left(goal, today)
+
+    if goal.get("target_value") is None or progress >= DEADLINE_WARNING_PROGRESS:
+        return []
+
+    if days_left < 0:
+        return [_recommendation(
+            "deadline_passed", "timeline", 85,
+            "Set a new target date",
+            f"The target date passed {-days_left} days ago at {progress:.0f}% progress. "
+            "Pick a new date based on your current pace to keep the goal active.",
+            progress_percentage=progress, days_remaining=days_left
+        )]
+
+    if days_left <= DEADLINE_WARNING_DAYS:
+        return [_recommendation(
+            "deadline_near", "timeline", 80,
+            "Target date is close",
+            f"{days_left} days left at {progress:.0f}% progress. "
+            "Consider extending the target date or adjusting the target value.",
+            progress_percentage=progress, days_remaining=days_left
+        )]
+
+    return []
+
+
+def measurement_pace_rule(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """Compare the fitted measurement trend with the pace the goal needs."""
+    trend = context.get("trend")
+    remaining = _remaining(goal)
+    if goal["goal_type"] not in BODY_GOAL_TYPES or not trend or not remaining or trend["weekly_rate"] is None:
+        return []
+    if _days_left(goal, today) <= 0:
+        return []
+
+    metric = context["metric"]
+    actual = trend["weekly_rate"]
+    required = _required_weekly_rate(goal, today)
+    details = {"metric": metric, "weekly_rate": actual, "required_weekly_rate": required}
+
+    if actual * remaining <= 0:
+        return [_recommendation(
+            "off_track", "progress", 90,
+            f"Your {metric} is moving away from the target",
+            f"Your {metric} trend is {actual:+.2f} per week, but the goal needs {required:+.2f} per week. "
+            "Review your training and nutrition to reverse the trend.",
+            **details
+        )]
+
+    target_date = goal_date_to_datetime(goal["target_date"]).date()
+    projected = project_target_date(trend["regression"], trend["points"][-1]["date"], goal["target_value"])
+
+    if projected is None or projected > target_date:
+        return [_recommendation(
+            "behind_schedule", "progress", 70,
+            "Behind schedule",
+            f"At {actual:+.2f} per week you will reach the target "
+            + (f"on {projected.isoformat()}" if projected else "well after the target date")
+            + f"; {required:+.2f} per week is needed to make {target_date.isoformat()}.",
+            projected_date=projected, **details
+        )]
+
+    return [_recommendation(
+        "on_track", "progress", 10,
+        "On track",
+        f"At {actual:+.2f} per week you are projected to reach the target on {projected.isoformat()}. Keep it up.",
+        projected_date=projected, **details
+    )]
+
+
+def weight_rate_rule(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """Flag weight goals that need more than a sustainable weekly change."""
+    remaining = _remaining(goal)
+    weight = goal.get("current_value")
+    if goal["goal_type"] != GoalType.WEIGHT.value or not remaining or not weight or _days_left(goal, today) <= 0:
+        return []
+
+    required = _required_weekly_rate(goal, today)
+    limit = weight * MAX_WEEKLY_WEIGHT_CHANGE
+    if abs(required) <= limit:
+        return []
+
+    suggested_date = today + timedelta(weeks=abs(remaining) / limit)
+    return [_recommendation(
+        "aggressive_target", "timeline", 60,
+        "Target pace is aggressive",
+        f"Reaching the target needs {abs(required):.2f} kg per week, above the {limit:.2f} kg per week "
+        f"that is sustainable at your weight. Consider moving the target date to {suggested_date.isoformat()}.",
+        required_weekly_rate=required, max_weekly_rate=limit, suggested_target_date=suggested_date
+    )]
+
+
+def energy_balance_rule(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """Translate the gap between actual and required weight change into daily calories."""
+    trend = context.get("trend")
+    if goal["goal_type"] != GoalType.WEIGHT.value or not trend or trend["weekly_rate"] is None:
+        return []
+    if not _remaining(goal) or _days_left(goal, today) <= 0:
+        return []
+
+    # Sustainable pace at most, so the suggestion never exceeds the rate rule
+    required = _required_weekly_rate(goal, today)
+    limit = goal["current_value"] * MAX_WEEKLY_WEIGHT_CHANGE
+    required = max(-limit, min(limit, required))
+
+    change = (required - trend["weekly_rate"]) * KCAL_PER_KG / 7
+    change = max(-MAX_INTAKE_CHANGE, min(MAX_INTAKE_CHANGE, change))
+    if abs(change) < 100:
+        return []
+
+    nutrition = context["nutrition"]
+    details = {"daily_calorie_change": round(change), "weekly_rate": trend["weekly_rate"], "required_weekly_rate": required}
+    message = f"{'Eat' if change > 0 else 'Cut'} about {abs(change):.0f} kcal per day to move at {required:+.2f} kg per week."
+    if nutrition["days_logged"]:
+        suggested = max(0, nutrition["avg_calories"] + change)
+        details["suggested_daily_calories"] = round(suggested)
+        message += f" Based on your logged average of {nutrition['avg_calories']:.0f} kcal, aim for {suggested:.0f} kcal."
+
+    return [_recommendation("calorie_adjustment", "nutrition", 65, "Adjust your calorie intake", message, **details)]
+
+
+def protein_rule(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """Recommend enough protein for body composition goals."""
+    weight = (context["latest"].get("weight") or {}).get("value")
+    nutrition = context["nutrition"]
+    if goal["goal_type"] not in BODY_GOAL_TYPES or not weight or nutrition["days_logged"] < 3:
+        return []
+
+    target = weight * PROTEIN_G_PER_KG
+    if nutrition["avg_protein"] >= target:
+        return []
+
+    return [_recommendation(
+        "protein_intake", "nutrition", 40,
+        "Increase protein",
+        f"You average {nutrition['avg_protein']:.0f} g of protein per day; "
+        f"{target:.0f} g ({PROTEIN_G_PER_KG} g per kg) supports muscle retention and recovery.",
+        avg_protein=nutrition["avg_protein"], target_protein=target
+    )]
+
+
+def workout_rule(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """Compare training frequency with the goal's needs."""
+    workouts = context["workouts"]
+    weeks = WORKOUT_WINDOW_DAYS / 7
+
+    if goal["goal_type"] == GoalType.WORKOUT.value:
+        remaining = _remaining(goal)
+        if not remaining or remaining < 0 or _days_left(goal, today) <= 0:
+            return []
+
+        metric = (goal.get("custom_data") or {}).get("metric", "count")
+        if metric == "duration":
+            done, unit = workouts["duration"] / 60, "minutes"
+        elif metric == "calories":
+            done, unit = workouts["calories_burned"], "kcal"
+        else:
+            done, unit = workouts["count"], "workouts"
+
+        actual = done / weeks
+        required = _required_weekly_rate(goal, today)
+        if actual >= required:
+            return []
+
+        return [_recommendation(
+            "training_volume", "training", 75,
+            "Train more to reach the goal",
+            f"You average {actual:.1f} {unit} per week; {required:.1f} per week is needed by the target date.",
+            weekly_rate=actual, required_weekly_rate=required, metric=metric
+        )]
+
+    if goal["goal_type"] == GoalType.NUTRITION.value:
+        return []
+
+    per_week = workouts["count"] / weeks
+    if per_week >= TARGET_WORKOUTS_PER_WEEK:
+        return []
+
+    return [_recommendation(
+        "training_frequency", "training", 45,
+        "Train more consistently",
+        f"You averaged {per_week:.1f} workouts per week over the last {WORKOUT_WINDOW_DAYS} days. "
+        f"Aim for at least {TARGET_WORKOUTS_PER_WEEK} sessions per week.",
+        workouts_per_week=per_week, active_days=workouts["active_days"]
+    )]
+
+
+def nutrition_target_rule(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """Compare average daily intake with a nutrition goal's daily target."""
+    nutrition = context["nutrition"]
+    metric = (goal.get("custom_data") or {}).get("metric", "calories")
+    target = goal.get("target_value")
+    if goal["goal_type"] != GoalType.NUTRITION.value or metric not in ROLLUP_FIELDS or not target:
+        return []
+    if not nutrition["days_logged"]:
+        return []
+
+    average = nutrition[f"avg_{metric}"]
+    deviation = (average - target) / target
+    if abs(deviation) <= 0.1:
+        return []
+
+    return [_recommendation(
+        "nutrition_target", "nutrition", 55,
+        f"{'Reduce' if deviation > 0 else 'Increase'} your daily {metric}",
+        f"You average {average:.0f} {metric} per day, {abs(deviation) * 100:.0f}% "
+        f"{'above' if deviation > 0 else 'below'} your target of {target:.0f}.",
+        metric=metric, average=average, target=target
+    )]
+
+
+def tracking_rule(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """Ask for the data the other rules need."""
+    recommendations = []
+
+    metric = context.get("metric")
+    if metric:
+        entry = context["latest"].get(metric)
+        age = (today - entry["date"].date()).days if entry else None
+        if age is None or age > MEASUREMENT_STALE_DAYS:
+            recommendations.append(_recommendation(
+                "log_measurement", "tracking", 50,
+                f"Log your {metric}",
+                f"Your last {metric} measurement is {age} days old." if entry
+                else f"You have no {metric} measurements yet.",
+                metric=metric, days_since_measurement=age
+            ))
+
+    if goal["goal_type"] in (GoalType.WEIGHT.value, GoalType.NUTRITION.value):
+        days_logged = context["nutrition"]["days_logged"]
+        if days_logged < NUTRITION_WINDOW_DAYS * 0.7:
+            recommendations.append(_recommendation(
+                "log_food", "tracking", 35,
+                "Log your meals consistently",
+                f"You logged food on {days_logged} of the last {NUTRITION_WINDOW_DAYS} days. "
+                "Consistent logging makes intake recommendations more accurate.",
+                days_logged=days_logged
+            ))
+
+    return recommendations
+
+
+# Evaluated in order; results are ranked by score
+RECOMMENDATION_RULES = [
+    deadline_rule,
+    measurement_pace_rule,
+    weight_rate_rule,
+    energy_balance_rule,
+    protein_rule,
+    workout_rule,
+    nutrition_target_rule,
+    tracking_rule
+]
+
+
+def build_recommendations(goal: Dict[str, Any], context: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    """
+    Run the recommendation rules for a goal and rank the results.
+
+    Args:
+        goal: Goal document
+        context: Inputs gathered by gather_recommendation_context
+        today: Reference day for date-based rules
+
+    Returns:
+        Recommendations ordered by score, highest first
+    """
+    recommendations = []
+    for rule in RECOMMENDATION_RULES:
+        recommendations.extend(rule(goal, context, today))
+
+    recommendations.sort(key=lambda recommendation: recommendation["score"], reverse=True)
+    return recommendations
+
+
+async def gather_recommendation_context(goal: Dict[str, Any], today: date) -> Dict[str, Any]:
+    """
+    Read the measurement trend, workout frequency and nutrition rollups a goal's rules use.
+
+    Args:
+        goal: Goal document
+        today: Reference day
+
+    Returns:
+        Dictionary with metric, trend, latest, workouts and nutrition
+    """
+    user_id = str(goal["user_id"])
+    metric = goal_metric(goal) if goal["goal_type"] in BODY_GOAL_TYPES else None
+
+    trend = None
+    if metric:
+        trend = (await get_measurement_trends(user_id, [metric], TREND_DAYS)).get(metric)
+
+    since = datetime.combine(today - timedelta(days=WORKOUT_WINDOW_DAYS), datetime.min.time())
+    rollups = await get_daily_rollups(user_id, today - timedelta(days=NUTRITION_WINDOW_DAYS - 1), today)
+
+    return {
+        "metric": metric,
+        "trend": trend,
+        "latest": await get_latest_snapshot(user_id),
+        "workouts": await get_workout_frequency(user_id, since),
+        "nutrition": combine_rollups(rollups)
+    }
+
+
+async def get_goal_recommendations(goal: GoalInDB) -> List[Dict[str, Any]]:
+    """
+    Get ranked recommendations for a goal.
+
+    Results are cached per goal until the user's next goal, measurement,
+    workout or food log write in any worker.
+
+    Args:
+        goal: Goal
+
+    Returns:
+        Recommendations ordered by score, highest first
+    """
+    today = date.today()
+    user_id = str(goal.user_id)
+    cache_key = make_cache_key(
+        _recommendations_namespace(user_id),
+        version=await get_data_version(user_id, RECOMMENDATIONS_VERSION),
+        goal_id=str(goal.id),
+        day=today.isoformat()
+    )
+
+    recommendations = recommendations_cache.get(cache_key)
+    if recommendations is None:
+        goal_data = goal.dict(by_alias=True)
+        recommendations = build_recommendations(goal_data, await gather_recommendation_context(goal_data, today), today)
+        recommendations_cache.set(cache_key, recommendations)
+
+    return recommendations
+
+
+async def on_data_saved(user_id: str, **payload: Any) -> None:
+    """Drop the user's cached recommendations."""
+    await invalidate_goal_recommendations(user_id)
+
+
+def register_recommendation_receivers() -> None:
+    """Connect recommendation cache invalidation to the write signals."""
+    measurement_saved.connect(on_data_saved)
+    workout_saved.connect(on_data_saved)
+    food_log_saved.connect(on_data_saved)
+    goal_changed.connect(on_data_saved)
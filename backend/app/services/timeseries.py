@@ -0,0 +1,127 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Points returned for charts when no explicit limit is given
+DEFAULT_CHART_POINTS = 200
+
+RESOLUTIONS = ("auto", "raw", "daily", "weekly", "lttb")
+
+
+def series_arrays(points: List[Tuple[datetime, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert (timestamp, value) points into numeric arrays.
+
+    Args:
+        points: Points ordered by timestamp
+
+    Returns:
+        Tuple of (POSIX seconds, values) float arrays
+    """
+    seconds = np.array([timestamp.timestamp() for timestamp, _ in points], dtype=np.float64)
+    values = np.array([value for _, value in points], dtype=np.float64)
+    return seconds, values
+
+
+def mean_by_period(points: List[Tuple[datetime, float]], period: str) -> List[Tuple[datetime, float]]:
+    """
+    Average points per calendar day or per week (starting Monday).
+
+    Args:
+        points: Points ordered by timestamp
+        period: "daily" or "weekly"
+
+    Returns:
+        One (period start, mean value) point per period
+    """
+    if not points:
+        return []
+
+    ordinals = np.array([timestamp.toordinal() for timestamp, _ in points], dtype=np.int64)
+    if period == "weekly":
+        weekdays = np.array([timestamp.weekday() for timestamp, _ in points], dtype=np.int64)
+        ordinals = ordinals - weekdays
+    values = np.array([value for _, value in points], dtype=np.float64)
+
+    keys, inverse = np.unique(ordinals, return_inverse=True)
+    means = np.bincount(inverse, weights=values) / np.bincount(inverse)
+
+    return [
+        (datetime.combine(date.fromordinal(int(key)), datetime.min.time()), float(mean))
+        for key, mean in zip(keys, means)
+    ]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select points with Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously selected point and the average of the next bucket. This keeps
+    peaks and dips that plain averaging would flatten.
+
+    Args:
+        x: Point x coordinates, ascending
+        y: Point y coordinates
+        threshold: Number of points to keep
+
+    Returns:
+        Indices of the selected points
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    bucket_size = (n - 2) / (threshold - 2)
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def downsample_series(
+    points: List[Tuple[datetime, float]],
+    resolution: str = "auto",
+    max_points: int = DEFAULT_CHART_POINTS
+) -> List[Dict[str, Any]]:
+    """
+    Downsample a measurement series for display.
+
+    Args:
+        points: Points ordered by timestamp
+        resolution: "raw" (no downsampling), "daily" or "weekly" (period
+            means), "lttb" (shape-preserving selection of max_points points)
+            or "auto" (raw when it fits in max_points, LTTB otherwise)
+        max_points: Maximum number of points for "lttb" and "auto"
+
+    Returns:
+        List of {"date", "value"} points
+    """
+    if resolution in ("daily", "weekly"):
+        points = mean_by_period(points, resolution)
+    elif resolution == "lttb" or (resolution == "auto" and len(points) > max_points):
+        x, y = series_arrays(points)
+        points = [points[index] for index in lttb_indices(x, y, max_points)]
+
+    return [{"date": timestamp, "value": value} for timestamp, value in points]
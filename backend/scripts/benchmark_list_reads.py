@@ -0,0 +1,120 @@
+"""
+Benchmark the per-item cost of decoding list reads.
+
+Compares the model path (a WorkoutInDB per document, dumped and validated
+against the Workout response model) with the trusted path (projected
+documents decoded to response-shaped dicts, then validated once against the
+response model, as FastAPI does). Documents are synthetic, so no database is
+needed.
+
+Run from the backend directory:
+
+    python scripts/benchmark_list_reads.py [--repeat N]
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from app.models.mongodb import compile_document_decoder
+from app.models.workout import Workout, WorkoutInDB
+
+PAGE_SIZES = (100, 1000)
+
+decode_workout = compile_document_decoder(("user_id",))
+response_adapter = TypeAdapter(List[Workout])
+
+
+def make_workout_document(user_id: ObjectId) -> Dict[str, Any]:
+    """Build a raw workout document as returned by the driver."""
+    created_at = datetime.utcnow() - timedelta(days=random.randint(0, 365))
+    return {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "title": "Upper body strength",
+        "description": "Push day with accessories",
+        "duration": random.randint(1200, 5400),
+        "calories_burned": random.randint(150, 700),
+        "exercises": [
+            {"name": name, "sets": 4, "reps": 8, "weight": 60.0, "notes": None}
+            for name in ("Bench Press", "Overhead Press", "Dips", "Lateral Raise")
+        ],
+        "date": created_at,
+        "created_at": created_at,
+        "updated_at": created_at,
+        "is_public": True,
+        "likes": [ObjectId() for _ in range(random.randint(0, 20))],
+        "comments": []
+    }
+
+
+def project_workout(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the trusted-read projection client-side."""
+    projected = {
+        key: document[key]
+        for key in (
+            "_id", "user_id", "title", "description", "duration", "calories_burned",
+            "exercises", "date", "created_at", "is_public"
+        )
+    }
+    projected["likes_count"] = len(document["likes"])
+    projected["comments_count"] = len(document["comments"])
+    return projected
+
+
+def model_path(documents: List[Dict[str, Any]]) -> List[Any]:
+    workouts = [WorkoutInDB(**document) for document in documents]
+    return response_adapter.validate_python([workout.model_dump() for workout in workouts])
+
+
+def trusted_path(documents: List[Dict[str, Any]]) -> List[Any]:
+    return response_adapter.validate_python([decode_workout(document) for document in documents])
+
+
+def trusted_decode_only(documents: List[Dict[str, Any]]) -> List[Any]:
+    return [decode_workout(document) for document in documents]
+
+
+def time_per_item(func: Callable, documents: List[Dict[str, Any]], repeat: int) -> float:
+    """Best per-item time in microseconds over repeat runs on fresh copies."""
+    best = float("inf")
+    for _ in range(repeat):
+        batch = copy.deepcopy(documents)
+        start = time.perf_counter()
+        func(batch)
+        best = min(best, time.perf_counter() - start)
+    return best / len(documents) * 1e6
+
+
+def main(repeat: int) -> None:
+    random.seed(42)
+    user_id = ObjectId()
+
+    print(f"{'page size':>10} {'model path':>14} {'trusted path':>14} {'decode only':>14} {'speedup':>9}")
+    for page_size in PAGE_SIZES:
+        documents = [make_workout_document(user_id) for _ in range(page_size)]
+        projected = [project_workout(document) for document in documents]
+
+        model = time_per_item(model_path, documents, repeat)
+        trusted = time_per_item(trusted_path, projected, repeat)
+        decode = time_per_item(trusted_decode_only, projected, repeat)
+
+        print(
+            f"{page_size:>10} {model:>11.1f} us {trusted:>11.1f} us {decode:>11.1f} us "
+            f"{model / trusted:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list read decoding")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement")
+    main(parser.parse_args().repeat)
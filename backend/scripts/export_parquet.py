@@ -0,0 +1,58 @@
+"""
+Export analytics snapshots as partitioned Parquet files.
+
+Only documents updated since the previous run are exported, unless --full is
+given. An updated document is exported again with all of its rows, so
+readers keep only the rows with the latest updated_at of each source
+document (workout_id, food_log_id, measurement_id or goal_id); use
+app.services.analytics.read_snapshot_table. --full rewrites the tables from
+scratch, which is also how deleted documents leave the snapshot. Meant to be
+run on a schedule (e.g. nightly incremental and weekly full cron jobs) from
+the backend directory:
+
+    python scripts/export_parquet.py [--tables workout_sets food_items] [--output-dir DIR] [--full]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.mongodb.mongodb import connect_to_mongo, connect_to_export_mongo, close_mongo_connection
+from app.services.analytics import SNAPSHOT_TABLES, run_analytics_snapshot
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Export analytics snapshots to Parquet",
+        epilog="Rows of updated documents are exported again; keep the rows with the latest updated_at "
+        "per source document ID (see app.services.analytics.read_snapshot_table)"
+    )
+    parser.add_argument("--tables", nargs="+", choices=list(SNAPSHOT_TABLES), help="Tables to export (default: all)")
+    parser.add_argument("--output-dir", help=f"Snapshot directory (default: {settings.ANALYTICS_EXPORT_DIR})")
+    parser.add_argument("--full", action="store_true", help="Ignore watermarks and rewrite the tables, dropping deleted documents")
+    return parser
+
+
+async def main(args: argparse.Namespace) -> None:
+    from app.main import app
+
+    # Snapshot reads go through the export pool; catalog lookups use the main one
+    app.state.mongodb_client = await connect_to_mongo()
+    app.state.mongodb = app.state.mongodb_client[settings.MONGODB_DB_NAME]
+    app.state.export_mongodb_client = await connect_to_export_mongo()
+    app.state.export_mongodb = app.state.export_mongodb_client[settings.MONGODB_DB_NAME]
+
+    try:
+        rows_written = await run_analytics_snapshot(args.tables, args.output_dir, full=args.full)
+        for table, rows in rows_written.items():
+            print(f"{table}: {rows} rows")
+    finally:
+        await close_mongo_connection(app.state.export_mongodb_client)
+        await close_mongo_connection(app.state.mongodb_client)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
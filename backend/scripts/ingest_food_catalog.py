@@ -0,0 +1,196 @@
+"""
+Bulk-ingest a local nutrient database dump into the foods catalog.
+
+Rows are streamed from the file and upserted in chunks, so dumps larger than
+memory can be ingested. Supported formats are CSV (header row) and JSON Lines
+(one object per line); a file holding a single JSON array is also accepted but
+is read into memory at once.
+
+Run from the backend directory, e.g.:
+
+    python scripts/ingest_food_catalog.py foods.csv --source usda
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from typing import Any, Dict, Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.mongodb.mongodb import connect_to_mongo, close_mongo_connection
+
+# Catalog field -> accepted column/key names in the source dump
+FIELD_ALIASES = {
+    "source_id": ("source_id", "id", "fdc_id", "code"),
+    "name": ("name", "description", "food_name", "product_name"),
+    "brand": ("brand", "brands", "brand_owner"),
+    "serving_size": ("serving_size", "serving_quantity"),
+    "serving_unit": ("serving_unit", "serving_size_unit"),
+    "calories": ("calories", "energy_kcal", "kcal", "energy-kcal_100g"),
+    "protein": ("protein", "protein_g", "proteins_100g"),
+    "carbs": ("carbs", "carbohydrates", "carbohydrate_g", "carbohydrates_100g"),
+    "fat": ("fat", "total_fat", "fat_g", "fat_100g"),
+    "fiber": ("fiber", "fiber_g", "fiber_100g"),
+    "sugar": ("sugar", "sugars", "sugars_g", "sugars_100g"),
+    "sodium": ("sodium", "sodium_mg")
+}
+
+NUMERIC_FIELDS = ("serving_size", "calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium")
+
+# Nutrient dumps usually report values per 100 g
+DEFAULT_SERVING_SIZE = 100.0
+DEFAULT_SERVING_UNIT = "g"
+
+
+def read_rows(path: str, file_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream raw rows from a dump file.
+
+    Args:
+        path: Dump file path
+        file_format: "csv" or "json"
+
+    Yields:
+        One dictionary per food
+    """
+    with open(path, "r", encoding="utf-8", newline="") as dump:
+        if file_format == "csv":
+            yield from csv.DictReader(dump)
+            return
+
+        first = dump.read(1)
+        while first and first.isspace():
+            first = dump.read(1)
+        dump.seek(0)
+
+        if first == "[":
+            yield from json.load(dump)
+            return
+
+        for line in dump:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _pick(row: Dict[str, Any], field: str) -> Any:
+    """First non-empty value among a field's aliases."""
+    for key in FIELD_ALIASES[field]:
+        value = row.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_row(row: Dict[str, Any], source: str) -> Optional[Dict[str, Any]]:
+    """
+    Map a raw row onto a catalog food document.
+
+    Args:
+        row: Raw row from the dump
+        source: Source database name
+
+    Returns:
+        Catalog food document or None if the row lacks an ID, name or calories
+    """
+    food = {field: _pick(row, field) for field in FIELD_ALIASES}
+    for field in NUMERIC_FIELDS:
+        food[field] = _number(food[field])
+
+    if food["source_id"] is None or not food["name"] or food["calories"] is None:
+        return None
+
+    food["source"] = source
+    food["source_id"] = str(food["source_id"])
+    food["name"] = str(food["name"]).strip()
+    food["calories"] = int(round(food["calories"]))
+    food["serving_size"] = food["serving_size"] or DEFAULT_SERVING_SIZE
+    food["serving_unit"] = food["serving_unit"] or DEFAULT_SERVING_UNIT
+
+    return food
+
+
+async def ingest(path: str, file_format: str, source: str, chunk_size: int) -> Dict[str, int]:
+    """
+    Ingest a dump file into the foods catalog.
+
+    Args:
+        path: Dump file path
+        file_format: "csv" or "json"
+        source: Source database name
+        chunk_size: Foods per bulk_write call
+
+    Returns:
+        Dictionary of inserted, updated, unchanged and skipped counts
+    """
+    from app.db.mongodb.food_catalog import create_catalog_indexes, bulk_upsert_catalog_foods
+
+    await create_catalog_indexes()
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    chunk = []
+
+    async def flush_chunk() -> None:
+        result = await bulk_upsert_catalog_foods(chunk)
+        for key, value in result.items():
+            counts[key] += value
+        print(f"Ingested {counts['inserted'] + counts['updated'] + counts['unchanged']} foods")
+
+    for row in read_rows(path, file_format):
+        food = normalize_row(row, source)
+        if food is None:
+            counts["skipped"] += 1
+            continue
+
+        chunk.append(food)
+        if len(chunk) >= chunk_size:
+            await flush_chunk()
+            chunk = []
+
+    if chunk:
+        await flush_chunk()
+
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ingest a nutrient database dump into the food catalog")
+    parser.add_argument("path", help="CSV or JSON Lines dump file")
+    parser.add_argument("--source", required=True, help="Source database name, e.g. usda")
+    parser.add_argument("--format", choices=("csv", "json"), help="Dump format (default: from file extension)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Foods per bulk write")
+    return parser
+
+
+async def main(args: argparse.Namespace) -> None:
+    from app.main import app
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "json")
+
+    # Share the connection with the repository modules, as the app does on startup
+    app.state.mongodb_client = await connect_to_mongo()
+    app.state.mongodb = app.state.mongodb_client[settings.MONGODB_DB_NAME]
+
+    try:
+        counts = await ingest(args.path, file_format, args.source, args.chunk_size)
+        print(
+            f"Done: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['skipped']} skipped"
+        )
+    finally:
+        await close_mongo_connection(app.state.mongodb_client)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
@@ -0,0 +1,197 @@
+"""
+Maintenance commands for derived data.
+
+Run from the backend directory, e.g.:
+
+    python scripts/maintenance.py rebuild-nutrition-rollups [--user-id ID]
+    python scripts/maintenance.py recompute-food-totals [--user-id ID] [--food-name NAME] [--food-id ID]
+    python scripts/maintenance.py rebuild-measurement-series [--user-id ID]
+    python scripts/maintenance.py rebuild-latest-measurements [--user-id ID]
+    python scripts/maintenance.py refresh-goals [--batch-size N]
+    python scripts/maintenance.py migrate-goal-history
+    python scripts/maintenance.py reconcile-user-stats [--batch-size N] [--dry-run]
+    python scripts/maintenance.py rebuild-vector-indices
+    python scripts/maintenance.py drop-goal-previous-status
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.mongodb.mongodb import connect_to_mongo, close_mongo_connection
+
+
+async def rebuild_nutrition_rollups(args: argparse.Namespace) -> None:
+    """Rebuild daily nutrition rollups from the raw food logs."""
+    from app.db.mongodb.nutrition import rebuild_nutrition_daily
+
+    counts = await rebuild_nutrition_daily(user_id=args.user_id)
+    print(f"Rebuilt {counts['days']} nutrition rollup days from {counts['food_logs']} food logs")
+
+
+async def recompute_food_totals(args: argparse.Namespace) -> None:
+    """Recompute stored food log totals from their meals."""
+    from app.db.mongodb.food import recompute_food_log_totals
+
+    recomputed = await recompute_food_log_totals(
+        user_id=args.user_id,
+        food_name=args.food_name,
+        food_id=args.food_id
+    )
+    print(f"Recomputed nutrition totals of {recomputed} food logs")
+
+
+async def rebuild_measurement_series(args: argparse.Namespace) -> None:
+    """Rebuild monthly measurement buckets from the raw measurements."""
+    from app.db.mongodb.measurement_series import rebuild_measurement_series as rebuild
+
+    counts = await rebuild(user_id=args.user_id)
+    print(f"Rebuilt {counts['buckets']} measurement buckets from {counts['measurements']} measurements")
+
+
+async def rebuild_latest_measurements(args: argparse.Namespace) -> None:
+    """Rebuild latest measurement snapshots from the raw measurements."""
+    from app.db.mongodb.latest_measurements import rebuild_latest_measurements as rebuild
+
+    counts = await rebuild(user_id=args.user_id)
+    print(f"Rebuilt {counts['snapshots']} latest measurement snapshots from {counts['measurements']} measurements")
+
+
+async def refresh_goals(args: argparse.Namespace) -> None:
+    """Recompute days remaining, progress and expiry of active goals."""
+    from app.db.mongodb.goals import refresh_goal_status
+
+    counts = await refresh_goal_status(batch_size=args.batch_size)
+    print(
+        f"Processed {counts['processed']} active goals: "
+        f"{counts['changed']} changed, {counts['expired']} expired"
+    )
+
+
+async def migrate_goal_history(args: argparse.Namespace) -> None:
+    """Move embedded goal progress histories into history buckets."""
+    from app.db.mongodb.goal_history import migrate_embedded_progress_history
+
+    counts = await migrate_embedded_progress_history()
+    print(f"Migrated {counts['goals']} goals into {counts['buckets']} progress history buckets")
+
+
+async def reconcile_user_stats(args: argparse.Namespace) -> None:
+    """Recompute user stats from source and report drift."""
+    from app.db.mongodb.user_stats import reconcile_user_stats as reconcile
+
+    report = await reconcile(batch_size=args.batch_size, fix=not args.dry_run)
+    action = "fixed" if report["fixed"] else "found (dry run)"
+    print(f"Checked {report['users']} users, {report['drifted']} with drifted stats {action}")
+    for field, drift in sorted(report["drift"].items()):
+        print(f"  {field}: {drift:+}")
+
+
+async def rebuild_vector_indices(args: argparse.Namespace) -> None:
+    """Rebuild the workout and food vector indices from MongoDB."""
+    from app.db.vector.sync import rebuild_vector_indices as rebuild
+
+    counts = await rebuild()
+    print(f"Rebuilt vector indices with {counts['workouts']} workouts and {counts['foods']} foods")
+
+
+async def drop_goal_previous_status(args: argparse.Namespace) -> None:
+    """Remove the previous_status field earlier progress writes left on goals."""
+    from app.db.mongodb.goals import drop_goal_previous_status as drop
+
+    updated = await drop()
+    print(f"Removed previous_status from {updated} goals")
+
+
+COMMANDS = {
+    "rebuild-nutrition-rollups": rebuild_nutrition_rollups,
+    "recompute-food-totals": recompute_food_totals,
+    "rebuild-measurement-series": rebuild_measurement_series,
+    "rebuild-latest-measurements": rebuild_latest_measurements,
+    "refresh-goals": refresh_goals,
+    "migrate-goal-history": migrate_goal_history,
+    "reconcile-user-stats": reconcile_user_stats,
+    "rebuild-vector-indices": rebuild_vector_indices,
+    "drop-goal-previous-status": drop_goal_previous_status
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Dumbbell Diaries maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rollups = subparsers.add_parser(
+        "rebuild-nutrition-rollups",
+        help="Rebuild daily nutrition rollups from food logs"
+    )
+    rollups.add_argument("--user-id", help="Only rebuild this user's rollups")
+
+    totals = subparsers.add_parser(
+        "recompute-food-totals",
+        help="Recompute food log nutrition totals from their meals"
+    )
+    totals.add_argument("--user-id", help="Only recompute this user's food logs")
+    totals.add_argument("--food-name", help="Only recompute food logs containing this food")
+    totals.add_argument("--food-id", help="Only recompute food logs referencing this catalog food")
+
+    series = subparsers.add_parser(
+        "rebuild-measurement-series",
+        help="Rebuild monthly measurement buckets from measurements"
+    )
+    series.add_argument("--user-id", help="Only rebuild this user's buckets")
+
+    latest = subparsers.add_parser(
+        "rebuild-latest-measurements",
+        help="Rebuild latest measurement snapshots from measurements"
+    )
+    latest.add_argument("--user-id", help="Only rebuild this user's snapshot")
+
+    goals = subparsers.add_parser(
+        "refresh-goals",
+        help="Recompute days remaining, progress and expiry of active goals (run daily)"
+    )
+    goals.add_argument("--batch-size", type=int, default=1000, help="Goal updates per bulk write")
+
+    subparsers.add_parser(
+        "migrate-goal-history",
+        help="Move embedded goal progress histories into bucket documents (run once before deploying)"
+    )
+
+    stats = subparsers.add_parser(
+        "reconcile-user-stats",
+        help="Recompute user stats counters from source and report drift"
+    )
+    stats.add_argument("--batch-size", type=int, default=500, help="Users per batch")
+    stats.add_argument("--dry-run", action="store_true", help="Only report drift, don't fix it")
+
+    subparsers.add_parser(
+        "rebuild-vector-indices",
+        help="Rebuild the semantic search vector indices from workouts and food logs"
+    )
+
+    subparsers.add_parser(
+        "drop-goal-previous-status",
+        help="Remove the previous_status field from goals (run once after deploying)"
+    )
+
+    return parser
+
+
+async def main(args: argparse.Namespace) -> None:
+    from app.main import app
+
+    # Share the connection with the repository modules, as the app does on startup
+    app.state.mongodb_client = await connect_to_mongo()
+    app.state.mongodb = app.state.mongodb_client[settings.MONGODB_DB_NAME]
+
+    try:
+        await COMMANDS[args.command](args)
+    finally:
+        await close_mongo_connection(app.state.mongodb_client)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))